@@ -42,6 +42,7 @@ DJANGO_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.admin',
+    'django.contrib.postgres',
 ]
 
 THIRD_PARTY_APPS = [
@@ -160,18 +161,35 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERYD_TASK_TIME_LIMIT = 5 * 60
 CELERYD_TASK_SOFT_TIME_LIMIT = 60
 
+# Rides
+# Finished rides older than this are moved to the archive tables.
+RIDES_ARCHIVE_AFTER = timedelta(days=env.int('RIDES_ARCHIVE_AFTER_DAYS', default=90))
+
+# Circles
+# Seconds circles and membership checks are cached across requests.
+CIRCLES_CACHE_TIMEOUT = env.int('CIRCLES_CACHE_TIMEOUT', default=300)
+
+# Counters
+COUNTERS_BACKEND = 'cride.utils.counters.RedisCounters'
+COUNTERS_REDIS_URL = env('REDIS_URL', default='redis://localhost:6379/0')
+
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'cride.utils.renderers.ORJSONRenderer',
         # 'rest_framework.renderers.BrowsableAPIRenderer',
     ),
+    'DEFAULT_PARSER_CLASSES': (
+        'cride.utils.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
         # 'rest_framework.authentication.TokenAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS':
-        'rest_framework.pagination.LimitOffsetPagination',
+        'cride.utils.pagination.CRidePagination',
         'PAGE_SIZE': 10
 }
 
@@ -19,6 +19,13 @@ CACHES = {
     }
 }
 
+# Counters
+COUNTERS_BACKEND = "cride.utils.counters.LocalCounters"
+
+# Circles
+# Rolled back test data never invalidates the cache, tests enable it explicitly.
+CIRCLES_CACHE_TIMEOUT = 0
+
 # Passwords
 PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
 
@@ -1,18 +1,51 @@
 """Circles admin."""
 
 # Django
+from django import forms
 from django.contrib import admin
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
+from django.template.response import TemplateResponse
 
 # Models
 from cride.circles.models import Circle
-from cride.rides.models import Ride
+from cride.rides.models import Ride, ArchivedRide
 
 # Utilities
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
+from itertools import chain
 import csv
 
+class Echo:
+  """File-like object that returns what is written to it."""
+
+  def write(self, value):
+    """Return the written value instead of buffering it."""
+    return value
+
+class RidesExportForm(forms.Form):
+  """Rides export date range form."""
+
+  start = forms.DateField(help_text='First day, inclusive.')
+  end = forms.DateField(help_text='Last day, inclusive.')
+
+  def clean(self):
+    """Verify the range isn't reversed."""
+    data = super(RidesExportForm, self).clean()
+    if data.get('start') and data.get('end') and data['start'] > data['end']:
+      raise forms.ValidationError('The first day must not be after the last one.')
+    return data
+
+  def get_range(self):
+    """Return the aware datetimes bounding the days in TIME_ZONE."""
+    tz = timezone.get_default_timezone()
+    start = timezone.make_aware(datetime.combine(self.cleaned_data['start'], time.min), tz)
+    end = timezone.make_aware(
+      datetime.combine(self.cleaned_data['end'] + timedelta(days=1), time.min),
+      tz
+    )
+    return start, end
+
 @admin.register(Circle)
 class CircleAdmin(admin.ModelAdmin):
   """Circle admin."""
@@ -22,8 +55,10 @@ class CircleAdmin(admin.ModelAdmin):
     'is_public',
     'verified',
     'is_limited',
-    'members_limit'
+    'members_limit',
+    'members_count'
   )
+  readonly_fields = ('members_count',)
   search_fields = ('slug_name', 'name')
   list_filter = (
     'is_public',
@@ -31,7 +66,7 @@ class CircleAdmin(admin.ModelAdmin):
     'is_limited'
   )
 
-  actions = ['make_verified', 'make_unverified', 'download_todays_rides']
+  actions = ['make_verified', 'make_unverified', 'download_rides']
 
   def make_verified(self, request, queryset):
     """Make circles verified."""
@@ -43,22 +78,61 @@ class CircleAdmin(admin.ModelAdmin):
     queryset.update(verified=False)
   make_unverified.short_description = 'Make selected circles unverified'
 
-  def download_todays_rides(self, request, queryset):
-    """Return todya's rides."""
-    now = timezone.now()
-    start = datetime(now.year, now.month, now.day, 0, 0, 0)
-    end = start + timedelta(days=1)
-    rides = Ride.objects.filter(
-      offered_in__in=queryset.values_list('id'),
+  def download_rides(self, request, queryset):
+    """Return the rides of the selected circles in a date range.
+
+      Ask for the range first, then stream the CSV, archived rides
+      first. Passenger counts are read from the rides themselves,
+      which are read in chunks through a server-side cursor.
+    """
+    today = timezone.localdate()
+    if 'apply' not in request.POST:
+      form = RidesExportForm(initial={'start': today, 'end': today})
+    else:
+      form = RidesExportForm(request.POST)
+      if form.is_valid():
+        start, end = form.get_range()
+        rides = [
+          self.get_rides(model, queryset, start, end)
+          for model in (ArchivedRide, Ride)
+        ]
+        filename = f'rides_{form.cleaned_data["start"]}_{form.cleaned_data["end"]}.csv'
+        response = StreamingHttpResponse(self.stream_rides(*rides), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    context = {
+      **self.admin_site.each_context(request),
+      'title': 'Download rides',
+      'form': form,
+      'queryset': queryset,
+      'time_zone': timezone.get_default_timezone_name(),
+      'opts': self.model._meta,
+    }
+    return TemplateResponse(request, 'admin/circles/export_rides.html', context)
+  download_rides.short_description = 'Download rides of selected circles'
+
+  def get_rides(self, model, queryset, start, end):
+    """Return the CSV rows of the model rides of the circles in range."""
+    return model.objects.filter(
+      offered_in__in=queryset.values('id'),
       departure_date__gte=start,
       arrival_date__lte=end
-    ).order_by('departure_date')
+    ).order_by('departure_date', 'pk').values_list(
+      'pk',
+      'passengers_count',
+      'departure_location',
+      'departure_date',
+      'arrival_location',
+      'arrival_date',
+      'rating',
+      named=True
+    )
 
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="somefilename.csv"'
-  
-    writer = csv.writer(response)
-    writer.writerow([
+  def stream_rides(self, *querysets):
+    """Yield the CSV lines of the rides of querysets."""
+    writer = csv.writer(Echo())
+    yield writer.writerow([
       'id', 
       'passengers',
       'departure_location',
@@ -67,15 +141,14 @@ class CircleAdmin(admin.ModelAdmin):
       'arrival_date',
       'rating'
     ])
+    rides = chain.from_iterable(rides.iterator(chunk_size=2000) for rides in querysets)
     for ride in rides:
-      writer.writerow([
+      yield writer.writerow([
         ride.pk,
-        ride.passengers.count(),
+        ride.passengers_count,
         ride.departure_location,
-        str(ride.departure_date),
+        timezone.localtime(ride.departure_date).isoformat(),
         ride.arrival_location,
-        str(ride.arrival_date),
+        timezone.localtime(ride.arrival_date).isoformat(),
         ride.rating
       ])
-
-    return response
\ No newline at end of file
@@ -7,4 +7,8 @@ class CircleAppConfig(AppConfig):
   """Circles app config."""
 
   name = 'cride.circles'
-  verbose_name = 'Circles'
\ No newline at end of file
+  verbose_name = 'Circles'
+
+  def ready(self):
+    """Connect signals."""
+    import cride.circles.signals  # noqa F401
\ No newline at end of file
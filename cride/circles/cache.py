@@ -0,0 +1,202 @@
+"""Circle lookups cache.
+
+Circles by slug name and the active membership of a user in a circle
+are cached across requests in two tiers: a small in-process LRU in
+front of the shared cache (Redis in production). Saving or deleting a
+circle or a membership drops its entries from both tiers, right away
+and again once the transaction commits. Entries of other processes'
+LRU can't be reached and expire by themselves after LOCAL_TIMEOUT
+seconds, which bounds how long they may serve a revoked membership.
+
+Instances are cached as their field values and rebuilt on every hit,
+so requests never share model instances.
+
+Members' invitations breakdowns are cached in the shared tier only,
+per circle and member, and dropped when the member issues or one of
+their invitations is redeemed.
+"""
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.fields.files import FieldFile
+
+# Models
+from cride.circles.models import Circle, Membership
+
+# Utilities
+from collections import OrderedDict
+import threading
+import time
+
+LOCAL_SIZE = 1024
+LOCAL_TIMEOUT = 5
+INVITATIONS_TIMEOUT = 60
+
+# Cached in place of the membership of users who aren't active members.
+NO_MEMBERSHIP = ()
+
+
+class LocalLRU:
+  """In-process least recently used cache with expiring entries."""
+
+  def __init__(self, size, timeout):
+    self.size = size
+    self.timeout = timeout
+    self.lock = threading.Lock()
+    self.entries = OrderedDict()
+
+  def get(self, key):
+    """Return the value of key, None if missing or expired."""
+    with self.lock:
+      entry = self.entries.get(key)
+      if entry is None:
+        return None
+      expires, value = entry
+      if expires <= time.monotonic():
+        del self.entries[key]
+        return None
+      self.entries.move_to_end(key)
+      return value
+
+  def set(self, key, value, timeout):
+    """Store value under key, evicting the least recently used entries."""
+    with self.lock:
+      self.entries[key] = (time.monotonic() + min(timeout, self.timeout), value)
+      self.entries.move_to_end(key)
+      while len(self.entries) > self.size:
+        self.entries.popitem(last=False)
+
+  def delete_many(self, keys):
+    """Drop keys."""
+    with self.lock:
+      for key in keys:
+        self.entries.pop(key, None)
+
+  def clear(self):
+    """Drop every entry."""
+    with self.lock:
+      self.entries.clear()
+
+
+local = LocalLRU(LOCAL_SIZE, LOCAL_TIMEOUT)
+
+
+def get_timeout():
+  """Return seconds entries are cached for, 0 disables the cache."""
+  return settings.CIRCLES_CACHE_TIMEOUT
+
+
+def fetch(key):
+  """Return the cached value of key, promoting shared hits to the LRU."""
+  timeout = get_timeout()
+  if not timeout:
+    return None
+  value = local.get(key)
+  if value is None:
+    value = cache.get(key)
+    if value is not None:
+      local.set(key, value, timeout)
+  return value
+
+
+def store(key, value):
+  """Cache value under key in both tiers."""
+  timeout = get_timeout()
+  if timeout:
+    cache.set(key, value, timeout)
+    local.set(key, value, timeout)
+
+
+def delete(*keys):
+  """Drop keys from both tiers now and once the transaction commits."""
+  def drop():
+    local.delete_many(keys)
+    cache.delete_many(keys)
+  drop()
+  transaction.on_commit(drop)
+
+
+def clear():
+  """Drop the in-process tier."""
+  local.clear()
+
+
+def dump(instance):
+  """Return the concrete field values of instance, files by name."""
+  values = []
+  for field in instance._meta.concrete_fields:
+    value = getattr(instance, field.attname)
+    values.append(value.name if isinstance(value, FieldFile) else value)
+  return tuple(values)
+
+
+def load(model, values):
+  """Rebuild a model instance from its dumped field values."""
+  names = [field.attname for field in model._meta.concrete_fields]
+  return model.from_db('default', names, values)
+
+
+def circle_key(slug_name):
+  """Return the cache key of the circle of slug_name."""
+  return f'circles:slug:{slug_name}'
+
+
+def membership_key(user_id, circle_id):
+  """Return the cache key of a user's active membership of a circle."""
+  return f'circles:membership:{circle_id}:{user_id}'
+
+
+def get_circle(slug_name):
+  """Return the cached circle of slug_name, None if not cached."""
+  values = fetch(circle_key(slug_name))
+  return load(Circle, values) if values is not None else None
+
+
+def set_circle(circle):
+  """Cache circle by its slug name."""
+  store(circle_key(circle.slug_name), dump(circle))
+
+
+def get_membership(user_id, circle_id):
+  """Return (cached, membership) of a user in a circle.
+
+    Membership is None when the user is cached as not being an
+    active member of the circle.
+  """
+  values = fetch(membership_key(user_id, circle_id))
+  if values is None:
+    return False, None
+  if values == NO_MEMBERSHIP:
+    return True, None
+  return True, load(Membership, values)
+
+
+def set_membership(user_id, circle_id, membership):
+  """Cache the active membership of a user in a circle, None if there's none."""
+  value = dump(membership) if membership is not None else NO_MEMBERSHIP
+  store(membership_key(user_id, circle_id), value)
+
+
+def invitations_key(circle_id, user_id):
+  """Return the cache key of a member's invitations breakdown."""
+  return f'circles:invitations:{circle_id}:{user_id}'
+
+
+def get_invitations(circle_id, user_id):
+  """Return the cached invitations breakdown of a member, or None."""
+  return cache.get(invitations_key(circle_id, user_id))
+
+
+def set_invitations(circle_id, user_id, data):
+  """Cache the invitations breakdown of a member."""
+  cache.set(invitations_key(circle_id, user_id), data, INVITATIONS_TIMEOUT)
+
+
+def invalidate_invitations(circle_id, *user_ids):
+  """Drop the invitations breakdowns of members now and on commit."""
+  keys = [invitations_key(circle_id, user_id) for user_id in user_ids if user_id is not None]
+  if keys:
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,81 @@
+"""Invitation minting benchmark."""
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+# Models
+from cride.circles.models import Circle, Invitation
+from cride.users.models import User
+
+# Utilities
+import json
+import time
+
+
+class Rollback(Exception):
+  """Raised to discard the seeded data."""
+
+
+class Command(BaseCommand):
+  """Benchmark invitation minting.
+
+    For each batch size, create that many invitations one by one
+    through `Invitation.objects.create`, then mint the same amount
+    in bulk, counting queries and timing both. Everything runs
+    inside a transaction that is rolled back.
+  """
+
+  help = 'Compare creating invitations one by one against minting them in bulk.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='Write the report as JSON to this path.')
+
+  def handle(self, *args, **options):
+    report = {}
+    try:
+      with transaction.atomic():
+        user = User.objects.create(username='benchmark-invitations', email='benchmark-invitations@cride.com')
+        circle = Circle.objects.create(name='benchmark-invitations', slug_name='benchmark-invitations')
+        modes = {
+          'create': lambda size: [
+            Invitation.objects.create(issued_by=user, circle=circle) for _ in range(size)
+          ],
+          'mint': lambda size: Invitation.objects.mint(size, issued_by=user, circle=circle),
+        }
+        for size in options['sizes']:
+          report[size] = {mode: self.measure(mint, size, options) for mode, mint in modes.items()}
+          report[size]['speedup'] = report[size]['create']['ms'] / report[size]['mint']['ms']
+        raise Rollback
+    except Rollback:
+      pass
+
+    for size, result in report.items():
+      self.stdout.write(self.style.MIGRATE_HEADING(f'{size} invitations'))
+      for mode in ('create', 'mint'):
+        self.stdout.write(
+          f'  {mode}: {result[mode]["ms"]:.1f} ms, {result[mode]["queries"]} queries, '
+          f'{result[mode]["codes_per_second"]:.0f} codes/s'
+        )
+      self.stdout.write(f'  speedup: {result["speedup"]:.1f}x')
+    if options['output']:
+      with open(options['output'], 'w') as output:
+        json.dump(report, output, indent=2)
+
+  def measure(self, mint, size, options):
+    """Return the mean time and queries of minting size invitations."""
+    elapsed = 0
+    for _ in range(options['repeat']):
+      with CaptureQueriesContext(connection) as context:
+        start = time.perf_counter()
+        mint(size)
+        elapsed += time.perf_counter() - start
+    elapsed /= options['repeat']
+    return {
+      'ms': elapsed * 1000,
+      'queries': len(context.captured_queries),
+      'codes_per_second': size / elapsed,
+    }
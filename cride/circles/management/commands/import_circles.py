@@ -0,0 +1,193 @@
+"""Circles CSV importer."""
+
+# Django
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_slug
+from django.db import connection, transaction
+from django.utils import timezone
+
+# Models
+from cride.circles.models import Circle, Membership
+from cride.users.models import User
+
+# Cache
+from cride.circles import cache as circles_cache
+
+# Utilities
+from itertools import islice
+import csv
+import time
+
+COLUMNS = ('name', 'slug_name', 'is_public', 'verified', 'members_limit')
+BOOLEANS = {'1': True, 'true': True, 'yes': True, '0': False, 'false': False, 'no': False}
+UPDATE_FIELDS = ('name', 'is_public', 'verified', 'is_limited', 'members_limit', 'modified')
+# Rows per INSERT statement, within the bound parameters limits.
+INSERT_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+  """Import circles from a CSV file.
+
+    The file is streamed in batches of rows, so memory use doesn't
+    depend on its size. Each batch is validated, then upserted on
+    `slug_name` in its own transaction with multi-row INSERT ... ON
+    CONFLICT statements. Invalid rows are reported and skipped. New
+    circles may get an admin membership for a given user.
+  """
+
+  help = 'Create or update circles from a CSV file with the columns of circles.csv.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('path', help='CSV file with name, slug_name, is_public, verified and members_limit columns.')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--admin', help='Username of the admin of new circles.')
+    parser.add_argument('--remaining-invitations', type=int, default=10)
+    parser.add_argument('--skip-existing', action='store_true', help='Leave existing circles untouched.')
+
+  def handle(self, *args, **options):
+    self.admin = self.get_admin(options['admin'])
+    self.options = options
+    self.stats = {'created': 0, 'updated': 0, 'skipped': 0, 'invalid': 0}
+
+    start = time.perf_counter()
+    rows = 0
+    with open(options['path'], newline='', encoding='utf-8') as source:
+      reader = csv.DictReader(source)
+      missing = set(COLUMNS) - set(reader.fieldnames or ())
+      if missing:
+        raise CommandError(f'Missing columns: {", ".join(sorted(missing))}.')
+
+      while True:
+        batch = list(islice(reader, options['batch_size']))
+        if not batch:
+          break
+        self.import_batch(batch, first=rows + 1)
+        rows += len(batch)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f'{rows} rows, {rows / elapsed:.0f} rows/s')
+
+    elapsed = time.perf_counter() - start
+    self.stdout.write(self.style.SUCCESS(
+      f'Imported {rows} rows in {elapsed:.1f} s ({rows / elapsed if elapsed else 0:.0f} rows/s): '
+      + ', '.join(f'{count} {name}' for name, count in self.stats.items())
+    ))
+
+  def get_admin(self, username):
+    """Return the admin user of new circles, if any."""
+    if username is None:
+      return None
+    try:
+      return User.objects.select_related('profile').get(username=username)
+    except User.DoesNotExist:
+      raise CommandError(f'User {username} does not exist.')
+
+  def parse_row(self, row):
+    """Return the circle fields of a row or raise ValidationError."""
+    name = (row['name'] or '').strip()
+    if not name or len(name) > Circle._meta.get_field('name').max_length:
+      raise ValidationError('invalid name')
+
+    slug_name = (row['slug_name'] or '').strip()
+    validate_slug(slug_name)
+    if len(slug_name) > Circle._meta.get_field('slug_name').max_length:
+      raise ValidationError('slug_name too long')
+
+    flags = {}
+    for field in ('is_public', 'verified'):
+      value = (row[field] or '').strip().lower()
+      if value not in BOOLEANS:
+        raise ValidationError(f'invalid {field}')
+      flags[field] = BOOLEANS[value]
+
+    try:
+      members_limit = int((row['members_limit'] or '0').strip())
+    except ValueError:
+      raise ValidationError('invalid members_limit')
+    if members_limit < 0:
+      raise ValidationError('invalid members_limit')
+
+    return {
+      'name': name,
+      'slug_name': slug_name,
+      'is_limited': members_limit > 0,
+      'members_limit': members_limit,
+      **flags,
+    }
+
+  def import_batch(self, batch, first):
+    """Validate and upsert a batch of rows, first being the number of its first row."""
+    circles = {}
+    for number, row in enumerate(batch, start=first):
+      try:
+        fields = self.parse_row(row)
+      except ValidationError as error:
+        self.stats['invalid'] += 1
+        self.stderr.write(f'Row {number}: {"; ".join(error.messages)}.')
+        continue
+      # Later rows of the same slug name win.
+      circles[fields['slug_name']] = fields
+
+    now = timezone.now()
+    with transaction.atomic():
+      existing = set(Circle.objects.filter(slug_name__in=circles).values_list('slug_name', flat=True))
+      new = [slug_name for slug_name in circles if slug_name not in existing]
+      rows = [
+        Circle(
+          created=now,
+          modified=now,
+          about='',
+          members_count=1 if self.admin and fields['slug_name'] not in existing else 0,
+          **fields
+        )
+        for fields in circles.values()
+      ]
+      for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        self.upsert(rows[start:start + INSERT_BATCH_SIZE])
+
+      self.stats['created'] += len(new)
+      self.stats['skipped' if self.options['skip_existing'] else 'updated'] += len(existing)
+      if existing and not self.options['skip_existing']:
+        circles_cache.delete(*(circles_cache.circle_key(slug_name) for slug_name in existing))
+
+      if self.admin and new:
+        created = Circle.objects.filter(slug_name__in=new)
+        Membership.objects.bulk_create([
+          Membership(
+            user=self.admin,
+            profile=self.admin.profile,
+            circle_id=circle_id,
+            is_admin=True,
+            remaining_invitations=self.options['remaining_invitations']
+          )
+          for circle_id in created.values_list('pk', flat=True)
+        ])
+
+  def upsert(self, circles):
+    """Insert circles, updating the ones whose slug_name already exists.
+
+      A single INSERT ... ON CONFLICT statement, understood by both
+      PostgreSQL and SQLite, replaces a bulk_update whose CASE
+      expressions grow with the batch.
+    """
+    quote = connection.ops.quote_name
+    fields = [field for field in Circle._meta.concrete_fields if not field.primary_key]
+    if self.options['skip_existing']:
+      conflict = 'DO NOTHING'
+    else:
+      conflict = 'DO UPDATE SET ' + ', '.join(
+        f'{quote(column)} = EXCLUDED.{quote(column)}'
+        for column in (Circle._meta.get_field(name).column for name in UPDATE_FIELDS)
+      )
+    placeholders = '(' + ', '.join(['%s'] * len(fields)) + ')'
+    sql = (
+      f'INSERT INTO {quote(Circle._meta.db_table)} ({", ".join(quote(field.column) for field in fields)}) '
+      f'VALUES {", ".join([placeholders] * len(circles))} '
+      f'ON CONFLICT ({quote(Circle._meta.get_field("slug_name").column)}) {conflict}'
+    )
+    params = [
+      field.get_db_prep_save(getattr(circle, field.attname), connection)
+      for circle in circles for field in fields
+    ]
+    with connection.cursor() as cursor:
+      cursor.execute(sql, params)
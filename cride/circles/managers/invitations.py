@@ -1,10 +1,10 @@
 """Circle invitation managers."""
 
 # Django
-from django.db import models
+from django.db import models, transaction, IntegrityError
 
 # Utilities
-import random
+import secrets
 from string import ascii_uppercase, digits
 
 class InvitationManager(models.Manager):
@@ -12,13 +12,40 @@ class InvitationManager(models.Manager):
     Use to handle code creation.
   """
 
-  CODE_LENGTH = 10
+  CODE_LENGTH = 16
+  CODE_POOL = ascii_uppercase + digits + '.-'
+  MINT_ATTEMPTS = 5
+
+  def generate_code(self):
+    """Return a random code from the system's secure source."""
+    return ''.join(secrets.choice(self.CODE_POOL) for _ in range(self.CODE_LENGTH))
 
   def create(self, **kwargs):
     """Handle code creations"""
-    pool = ascii_uppercase + digits + '.-'
-    code = kwargs.get('code', ''.join(random.choices(pool, k=self.CODE_LENGTH)))
+    code = kwargs.get('code', self.generate_code())
     while self.filter(code=code).exists():
-      code = ''.join(random.choices(pool, k=self.CODE_LENGTH))
+      code = self.generate_code()
     kwargs['code'] = code
-    return super(InvitationManager, self).create(**kwargs)
\ No newline at end of file
+    return super(InvitationManager, self).create(**kwargs)
+
+  def mint(self, count, **kwargs):
+    """Create count invitations with random codes in one bulk insert.
+
+      Codes are long enough for collisions to be rare, so none are
+      checked up front. If the unique constraint rejects the batch,
+      only the codes already taken are replaced and the insert is
+      retried.
+    """
+    if count < 1:
+      return []
+    codes = set()
+    for _ in range(self.MINT_ATTEMPTS):
+      while len(codes) < count:
+        codes.add(self.generate_code())
+      invitations = [self.model(code=code, **kwargs) for code in codes]
+      try:
+        with transaction.atomic():
+          return self.bulk_create(invitations)
+      except IntegrityError:
+        codes -= set(self.filter(code__in=codes).values_list('code', flat=True))
+    raise IntegrityError('Could not mint unique invitation codes.')
\ No newline at end of file
@@ -0,0 +1,50 @@
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+from django.db import migrations
+
+
+SEARCH_CONFIG = """
+CREATE TEXT SEARCH CONFIGURATION cride_search (COPY = pg_catalog.simple);
+ALTER TEXT SEARCH CONFIGURATION cride_search
+  ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple;
+"""
+
+INDEXES = """
+CREATE INDEX circle_search_vector_idx ON circles_circle USING gin (
+  to_tsvector('cride_search'::regconfig, COALESCE(slug_name, '') || ' ' || COALESCE(name, ''))
+);
+CREATE INDEX circle_slug_name_trgm_idx ON circles_circle USING gin (slug_name gin_trgm_ops);
+CREATE INDEX circle_name_trgm_idx ON circles_circle USING gin (name gin_trgm_ops);
+"""
+
+DROP = """
+DROP INDEX IF EXISTS circle_search_vector_idx;
+DROP INDEX IF EXISTS circle_slug_name_trgm_idx;
+DROP INDEX IF EXISTS circle_name_trgm_idx;
+DROP TEXT SEARCH CONFIGURATION IF EXISTS cride_search;
+"""
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(SEARCH_CONFIG)
+    schema_editor.execute(INDEXES)
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(DROP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('circles', '0002_auto_20210113_2050'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        UnaccentExtension(),
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.1.5 on 2026-10-18 19:52
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill(apps, schema_editor):
+    """Count the active members of existing circles."""
+    Circle = apps.get_model('circles', 'Circle')
+    Membership = apps.get_model('circles', 'Membership')
+    counts = Membership.objects.filter(
+        circle=OuterRef('pk'),
+        is_active=True
+    ).order_by().values('circle').annotate(count=Count('pk')).values('count')
+    Circle.objects.update(members_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('circles', '0003_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='circle',
+            name='members_count',
+            field=models.PositiveIntegerField(default=0, help_text='Active members, kept up to date by admissions and deactivations.'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
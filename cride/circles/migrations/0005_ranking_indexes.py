@@ -0,0 +1,29 @@
+# Generated by Django 3.1.5 on 2026-10-18 19:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('circles', '0004_members_count'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='circle',
+            options={'get_latest_by': 'created', 'ordering': ['-members_count', '-rides_offered', '-rides_taken']},
+        ),
+        migrations.AddIndex(
+            model_name='circle',
+            index=models.Index(condition=models.Q(is_public=True), fields=['-members_count', '-rides_offered', '-rides_taken'], name='circle_ranking_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='circle',
+            index=models.Index(condition=models.Q(is_public=True), fields=['verified', '-members_count', '-rides_offered', '-rides_taken'], name='circle_verified_ranking_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='circle',
+            index=models.Index(condition=models.Q(is_public=True), fields=['is_limited', '-members_count', '-rides_offered', '-rides_taken'], name='circle_limited_ranking_idx'),
+        ),
+    ]
@@ -27,6 +27,10 @@ class Circle(CRideModel):
   # Stats
   rides_offered = models.PositiveIntegerField(default=0)
   rides_taken = models.PositiveIntegerField(default=0)
+  members_count = models.PositiveIntegerField(
+    default=0,
+    help_text='Active members, kept up to date by admissions and deactivations.'
+  )
 
   verified = models.BooleanField(
     'verified circle',
@@ -55,4 +59,25 @@ class Circle(CRideModel):
 
   class Meta(CRideModel.Meta):
     """Meta class"""
-    ordering = ['-rides_taken', '-rides_offered']
\ No newline at end of file
+    # Ranking: most members first, then the most active.
+    ordering = ['-members_count', '-rides_offered', '-rides_taken']
+    indexes = [
+      # Public circles listing walked in ranking order. Filtering by
+      # verified or is_limited walks its own index, filtering by both
+      # walks one of them.
+      models.Index(
+        fields=['-members_count', '-rides_offered', '-rides_taken'],
+        condition=models.Q(is_public=True),
+        name='circle_ranking_idx'
+      ),
+      models.Index(
+        fields=['verified', '-members_count', '-rides_offered', '-rides_taken'],
+        condition=models.Q(is_public=True),
+        name='circle_verified_ranking_idx'
+      ),
+      models.Index(
+        fields=['is_limited', '-members_count', '-rides_offered', '-rides_taken'],
+        condition=models.Q(is_public=True),
+        name='circle_limited_ranking_idx'
+      ),
+    ]
\ No newline at end of file
@@ -3,21 +3,13 @@
 # Django REST Framework
 from rest_framework.permissions import BasePermission
 
-# Models
-from cride.circles.models import Membership
+# Resolvers
+from cride.circles.resolvers import get_resolver
 
 class IsCircleAdmin(BasePermission):
   """Allow access only to circle admins."""
 
   def has_object_permission(self, request, view, obj):
     """Verify user have a membership in the obj."""
-    try:
-      Membership.objects.get(
-        user=request.user,
-        circle=obj,
-        is_admin=True,
-        is_active=True
-      )
-    except Membership.DoesNotExist:
-      return False
-    return True
\ No newline at end of file
+    membership = get_resolver(request).get_membership(obj)
+    return membership is not None and membership.is_admin
\ No newline at end of file
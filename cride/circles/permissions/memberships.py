@@ -3,8 +3,8 @@
 # Django REST Framework 
 from rest_framework.permissions import BasePermission
 
-# Models
-from cride.circles.models import Membership
+# Resolvers
+from cride.circles.resolvers import get_resolver
 
 class IsActiveCircleMember(BasePermission):
   """Allow access only to circle members.
@@ -15,15 +15,19 @@ class IsActiveCircleMember(BasePermission):
   
   def has_permission(self, request, view):
     """Verify user is an active member of the circle."""
-    try:
-      Membership.objects.get(
-        user=request.user,
-        circle=view.circle,
-        is_active=True
-      )
-    except Membership.DoesNotExist:
-      return False
-    return True
+    return get_resolver(request).get_membership(view.circle) is not None
+
+class IsActiveCircleAdmin(BasePermission):
+  """Allow access only to circle admins.
+
+    Excpect that the view implementing this permission
+    have a 'circle' attribute assigned.
+  """
+
+  def has_permission(self, request, view):
+    """Verify user is an active admin of the circle."""
+    membership = get_resolver(request).get_membership(view.circle)
+    return membership is not None and membership.is_admin
 
 class IsAdminOrMembershipOwner(BasePermission):
   """
@@ -32,26 +36,20 @@ class IsAdminOrMembershipOwner(BasePermission):
   """
 
   def has_permission(self, request, view):
-    if view.get_object().user == request.user:
+    if view.kwargs.get('pk') == request.user.username:
       return True
-    try:
-      Membership.objects.get(
-        circle=view.circle,
-        user=request.user,
-        is_active=True,
-        is_admin=True
-      )
-    except Membership.DoesNotExist:
-      return False
-    return True
+    membership = get_resolver(request).get_membership(view.circle)
+    return membership is not None and membership.is_admin
 
 class IsSelfMember(BasePermission):
   """Allow access only to the owners."""
 
   def has_permission(self, request, view):
-    """Let object permission grant access."""
-    return self.has_object_permission(request, view, view.get_object())
+    """Allow access only to the requesting user's own membership."""
+    if view.kwargs.get('pk') != request.user.username:
+      return False
+    return get_resolver(request).get_membership(view.circle) is not None
   
   def has_object_permission(self, request, view, obj):
     """Allow access only if member is owned by the requesting user."""
-    return request.user == obj.user
\ No newline at end of file
+    return request.user.pk == obj.user_id
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""Circle and membership resolution."""
+
+# Django
+from django.db.models import FilteredRelation, Q
+from django.http import Http404
+
+# Models
+from cride.circles.models import Circle, Membership
+
+# Cache
+from cride.circles import cache
+
+
+class CircleResolver:
+  """Request-scoped circle and membership resolver.
+
+    Loads a circle by slug together with the requesting user's
+    active membership in a single joined query, and memoizes both
+    so views, permissions and serializers of the same request share
+    them instead of querying again. Across requests both are served
+    from the circles cache when warm.
+  """
+
+  def __init__(self, request):
+    self.request = request
+    self.circles = {}
+    self.memberships = {}
+
+  @property
+  def user(self):
+    """Return the requesting user, None if anonymous."""
+    user = self.request.user
+    return user if user.is_authenticated else None
+
+  def get_circle(self, slug_name):
+    """Return the circle of slug_name or raise Http404."""
+    if slug_name not in self.circles:
+      circle = cache.get_circle(slug_name)
+      if circle is None:
+        circle = self.load_circle(slug_name)
+      self.circles[slug_name] = circle
+    return self.circles[slug_name]
+
+  def load_circle(self, slug_name):
+    """Query the circle of slug_name joined with the user's membership."""
+    queryset = Circle.objects.filter(slug_name=slug_name).order_by()
+    user = self.user
+    if user is not None:
+      queryset = queryset.annotate(active_membership=FilteredRelation(
+        'membership',
+        condition=Q(membership__user=user, membership__is_active=True)
+      )).select_related('active_membership')
+
+    circle = queryset.first()
+    if circle is None:
+      raise Http404('No Circle matches the given query.')
+    cache.set_circle(circle)
+    if user is not None:
+      membership = getattr(circle, 'active_membership', None)
+      cache.set_membership(user.pk, circle.pk, membership)
+      self.remember(circle, membership)
+    return circle
+
+  def get_membership(self, circle):
+    """Return the requesting user's active membership of circle, or None."""
+    if circle.pk not in self.memberships:
+      user = self.user
+      membership = None
+      if user is not None:
+        cached, membership = cache.get_membership(user.pk, circle.pk)
+        if not cached:
+          membership = Membership.objects.filter(
+            user=user,
+            circle=circle,
+            is_active=True
+          ).first()
+          cache.set_membership(user.pk, circle.pk, membership)
+      self.remember(circle, membership)
+    return self.memberships[circle.pk]
+
+  def remember(self, circle, membership):
+    """Memoize the user's membership of circle, with its relations."""
+    if membership is not None:
+      membership.user = self.user
+      membership.circle = circle
+    self.memberships[circle.pk] = membership
+
+
+def get_resolver(request):
+  """Return the resolver of request, shared by every wrapper of it."""
+  http_request = getattr(request, '_request', request)
+  resolver = getattr(http_request, 'circle_resolver', None)
+  if resolver is None:
+    resolver = http_request.circle_resolver = CircleResolver(request)
+  return resolver
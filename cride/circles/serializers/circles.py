@@ -6,7 +6,10 @@ from rest_framework import serializers
 # Model
 from cride.circles.models import Circle
 
-class CircleModelSerializer(serializers.ModelSerializer):
+# Utilities
+from cride.utils.counters import PendingCountersMixin, PendingCountersListSerializer
+
+class CircleModelSerializer(PendingCountersMixin, serializers.ModelSerializer):
   """Circle model serializer."""
   
   members_limit = serializers.IntegerField(
@@ -19,10 +22,12 @@ class CircleModelSerializer(serializers.ModelSerializer):
   class Meta:
     """Meta class."""
     model = Circle
+    list_serializer_class = PendingCountersListSerializer
     fields = (
       'name', 'slug_name',
       'about', 'picture',
       'rides_offered', 'rides_taken',
+      'members_count',
       'verified', 'is_public', 
       'is_limited', 'members_limit'
     )
@@ -30,7 +35,8 @@ class CircleModelSerializer(serializers.ModelSerializer):
       'is_public',
       'verified',
       'rides_offered',
-      'rides_taken'
+      'rides_taken',
+      'members_count'
     )
 
   def validate(self, data):
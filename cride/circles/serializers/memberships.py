@@ -1,28 +1,44 @@
 """Memberships serializers."""
 
 # Django
+from django.db import transaction
+from django.db.models import F, Q
 from django.utils import timezone
 
 # Dajngo REST Framework
 from rest_framework import serializers
 
 # Models
-from cride.circles.models import Membership, Invitation
+from cride.circles.models import Circle, Membership, Invitation
 
 # Serializers
 from cride.users.serializers import UserModelSerializer
 
-class MembershipModelSerializer(serializers.ModelSerializer):
-  """Membership model Serializer."""
+# Utilities
+from cride.utils.counters import PendingCountersMixin, PendingCountersListSerializer
+from cride.utils.serializers import DynamicFieldsMixin
+
+class MembershipModelSerializer(PendingCountersMixin, DynamicFieldsMixin, serializers.ModelSerializer):
+  """Membership model Serializer.
+
+    The inviting user is rendered by username, in full with
+    `?expand=invited_by`.
+  """
   
   user = UserModelSerializer(read_only=True)
   invited_by = serializers.StringRelatedField()
+
+  expandable_fields = {
+    'invited_by': lambda: UserModelSerializer(read_only=True),
+  }
+  string_sources = {'invited_by': 'invited_by__username'}
   joined_at = serializers.DateTimeField(source='created', read_only=True)
 
   class Meta:
     """Meta class."""
 
     model = Membership
+    list_serializer_class = PendingCountersListSerializer
     fields = (
       'user',
       'is_admin', 'is_active',
@@ -71,39 +87,56 @@ class AddMemberSerializer(serializers.Serializer):
     self.context['invitation'] = invitation
     return data
 
-  def validate(self, data):
-    """Verify circle is capable of accepting a new member."""
-    circle = self.context['circle']
-    if circle.is_limited and circle.members.count() >= circle.member_limit:
-      raise serializers.ValidationError('Circle has reached its member limit :(')
-    return data
-
   def create(self, data):
-    """Create new circle member."""
+    """Admit the new circle member.
+
+      The member limit, the invitation and the issuer's counters are
+      checked and updated by conditional UPDATEs in one transaction,
+      so parallel redemptions can neither overfill a limited circle
+      nor use the same invitation twice.
+    """
     circle = self.context['circle']
     invitation = self.context['invitation']
     user = data['user']
 
     now = timezone.now()
 
-    # Member creation
-    member = Membership.objects.create(
-      user=user,
-      profile=user.profile,
-      circle=circle,
-      invited_by=invitation.issued_by
-    )
-
-    # Update Invitation
-    invitation.used_by = user
-    invitation.used = True
-    invitation.used_at = now
-    invitation.save()
+    with transaction.atomic():
+      # Take a place in the circle
+      admitted = Circle.objects.filter(
+        Q(is_limited=False) | Q(members_count__lt=F('members_limit')),
+        pk=circle.pk
+      ).update(members_count=F('members_count') + 1, modified=now)
+      if not admitted:
+        raise serializers.ValidationError('Circle has reached its member limit :(')
+
+      # Consume invitation
+      redeemed = Invitation.objects.filter(pk=invitation.pk, used=False).update(
+        used_by=user,
+        used=True,
+        used_at=now,
+        modified=now
+      )
+      if not redeemed:
+        raise serializers.ValidationError({'invitation_code': ['Invalid invitation code.']})
+
+      # Update issuer data
+      Membership.objects.filter(
+        user_id=invitation.issued_by_id,
+        circle=circle,
+        remaining_invitations__gt=0
+      ).update(
+        used_invitations=F('used_invitations') + 1,
+        remaining_invitations=F('remaining_invitations') - 1,
+        modified=now
+      )
 
-    # Update issuer data
-    issuer = Membership.objects.get(user=invitation.issued_by, circle=circle)
-    issuer.used_invitations += 1
-    issuer.remaining_invitations -= 1
-    issuer.save()
+      # Member creation
+      member = Membership.objects.create(
+        user=user,
+        profile=user.profile,
+        circle=circle,
+        invited_by_id=invitation.issued_by_id
+      )
 
-    return member
+    return member
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""Circles signals."""
+
+# Django
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+# Models
+from cride.circles.models import Circle, Membership, Invitation
+
+# Cache
+from cride.circles import cache
+
+
+@receiver(pre_save, sender=Circle)
+def circle_saving(sender, instance, raw, **kwargs):
+  """Remember the slug name a circle is cached under before renames."""
+  if instance.pk is not None and not raw:
+    instance._cached_slug_name = Circle.objects.filter(
+      pk=instance.pk
+    ).values_list('slug_name', flat=True).first()
+
+
+@receiver(post_save, sender=Circle)
+@receiver(post_delete, sender=Circle)
+def circle_changed(sender, instance, **kwargs):
+  """Drop the cached circle, under its previous slug name too."""
+  slug_names = {instance.slug_name, instance.__dict__.pop('_cached_slug_name', None)}
+  cache.delete(*(cache.circle_key(slug_name) for slug_name in slug_names if slug_name))
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def membership_changed(sender, instance, **kwargs):
+  """Drop the cached membership on joins, updates and deactivations.
+
+    The member's invitations breakdown and the one of the member who
+    invited them, which lists them, are dropped too.
+  """
+  cache.delete(cache.membership_key(instance.user_id, instance.circle_id))
+  cache.invalidate_invitations(instance.circle_id, instance.user_id, instance.invited_by_id)
+
+
+@receiver(post_save, sender=Invitation)
+@receiver(post_delete, sender=Invitation)
+def invitation_changed(sender, instance, **kwargs):
+  """Drop the invitations breakdown of the issuer."""
+  cache.invalidate_invitations(instance.circle_id, instance.issued_by_id)
@@ -0,0 +1,78 @@
+"""Circles admin tests."""
+
+# Django
+from django.test import TestCase
+from django.utils import timezone
+
+# Models
+from cride.circles.models import Circle
+from cride.rides.models import Ride
+from cride.users.models import User
+
+# Utilities
+from cride.rides.tests.test_rides import create_member
+from datetime import datetime, time, timedelta
+import csv
+
+
+class DownloadRidesAdminTestCase(TestCase):
+  """Circle admin rides download test case."""
+
+  def setUp(self):
+    """Test case setup."""
+    self.admin = User.objects.create_superuser(
+      email='admin@cride.com',
+      username='admin',
+      password='admin123',
+      first_name='Admin',
+      last_name='Cride'
+    )
+    self.client.force_login(self.admin)
+
+    self.circle = Circle.objects.create(
+      name='Facultad de Ciencias',
+      slug_name='fciencias',
+      about='Grupo oficial de la Facultad de Ciencias de la UNAM',
+    )
+    driver = create_member(self.circle, 'driver')
+    passengers = [create_member(self.circle, f'passenger{i}') for i in range(3)]
+
+    # Rides leave at 8:00 TIME_ZONE, today, tomorrow and in three days
+    tz = timezone.get_default_timezone()
+    today = timezone.make_aware(datetime.combine(timezone.localdate(), time(8)), tz)
+    for day, count in ((0, 2), (0, 0), (1, 3), (3, 1)):
+      departure = today + timedelta(days=day)
+      ride = Ride.objects.create(
+        offered_by=driver,
+        offered_in=self.circle,
+        departure_location='Ciudad Universitaria',
+        departure_date=departure,
+        arrival_location='Polanco',
+        arrival_date=departure + timedelta(hours=1)
+      )
+      ride.passengers.add(*passengers[:count])
+
+  def download(self, **data):
+    """Run the download action on the circle."""
+    return self.client.post('/admin/circles/circle/', {
+      'action': 'download_rides',
+      '_selected_action': [self.circle.pk],
+      **data
+    })
+
+  def test_asks_for_range(self):
+    """The action first renders the date range form."""
+    response = self.download()
+    self.assertEqual(response.status_code, 200)
+    self.assertContains(response, 'name="start"')
+
+  def test_streams_range(self):
+    """Rides in the range are streamed with their passenger count."""
+    today = timezone.localdate()
+    response = self.download(apply='1', start=today, end=today + timedelta(days=1))
+    self.assertTrue(response.streaming)
+    content = b''.join(response.streaming_content).decode()
+
+    rows = list(csv.reader(content.splitlines()))
+    self.assertEqual(rows[0][:2], ['id', 'passengers'])
+    self.assertEqual([row[1] for row in rows[1:]], ['2', '0', '3'])
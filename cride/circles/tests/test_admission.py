@@ -0,0 +1,146 @@
+"""Member admission tests."""
+
+# Django
+from django.db import connection
+from django.test import TransactionTestCase
+
+# Django REST Framework
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+# Models
+from cride.circles.models import Circle, Membership, Invitation
+from cride.users.models import User, Profile
+
+# Utilities
+import threading
+import unittest
+
+
+def create_user(username):
+  """Create a user with its profile."""
+  user = User.objects.create(
+    email=f'{username}@cride.com',
+    username=username,
+    password='admin123'
+  )
+  Profile.objects.create(user=user)
+  return user
+
+
+class AdmissionMixin:
+  """Limited circle with an admin holding invitations."""
+
+  LIMIT = 3
+  INVITATIONS = 10
+
+  def setUp(self):
+    """Test case setup."""
+    self.circle = Circle.objects.create(
+      name='Facultad de Ciencias',
+      slug_name='fciencias',
+      about='Grupo oficial de la Facultad de Ciencias de la UNAM',
+      is_limited=True,
+      members_limit=self.LIMIT,
+      members_count=1
+    )
+    self.admin = create_user('ezioaud')
+    Membership.objects.create(
+      user=self.admin,
+      profile=self.admin.profile,
+      circle=self.circle,
+      is_admin=True,
+      remaining_invitations=self.INVITATIONS
+    )
+    self.codes = [
+      invitation.code
+      for invitation in Invitation.objects.mint(self.INVITATIONS, issued_by=self.admin, circle=self.circle)
+    ]
+    self.url = f'/circles/{self.circle.slug_name}/members/'
+
+  def redeem(self, user, code, client=None):
+    """Redeem an invitation code as user, return the response."""
+    client = client or APIClient()
+    client.force_authenticate(user=user)
+    return client.post(self.url, {'invitation_code': code})
+
+
+class AdmissionAPITestCase(AdmissionMixin, APITestCase):
+  """Member admission test case."""
+
+  def test_admission(self):
+    """Admissions count the member, consume the invitation and update the issuer."""
+    user = create_user('member0')
+    response = self.redeem(user, self.codes[0])
+    self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    self.circle.refresh_from_db()
+    self.assertEqual(self.circle.members_count, 2)
+    invitation = Invitation.objects.get(code=self.codes[0])
+    self.assertTrue(invitation.used)
+    self.assertEqual(invitation.used_by, user)
+    issuer = Membership.objects.get(user=self.admin)
+    self.assertEqual(issuer.used_invitations, 1)
+    self.assertEqual(issuer.remaining_invitations, self.INVITATIONS - 1)
+
+  def test_member_limit(self):
+    """Full circles reject admissions and keep the invitation."""
+    Circle.objects.filter(pk=self.circle.pk).update(members_count=self.LIMIT)
+    response = self.redeem(create_user('member0'), self.codes[0])
+    self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    self.assertFalse(Invitation.objects.get(code=self.codes[0]).used)
+    self.assertEqual(Membership.objects.count(), 1)
+
+  def test_deactivation_releases_place(self):
+    """Deactivated members free their place once."""
+    member = create_user('member0')
+    self.redeem(member, self.codes[0])
+
+    client = APIClient()
+    client.force_authenticate(user=self.admin)
+    response = client.delete(f'{self.url}member0/')
+    self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+    self.circle.refresh_from_db()
+    self.assertEqual(self.circle.members_count, 1)
+
+    response = client.delete(f'{self.url}member0/')
+    self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    self.circle.refresh_from_db()
+    self.assertEqual(self.circle.members_count, 1)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Concurrent writes require PostgreSQL.')
+class ConcurrentAdmissionTestCase(AdmissionMixin, TransactionTestCase):
+  """Concurrent admission test case."""
+
+  def test_limit_holds(self):
+    """Parallel redemptions never overfill a limited circle."""
+    users = [create_user(f'member{i}') for i in range(self.INVITATIONS)]
+    barrier = threading.Barrier(self.INVITATIONS)
+    codes = []
+
+    def redeem(user, code):
+      barrier.wait()
+      try:
+        codes.append(self.redeem(user, code).status_code)
+      finally:
+        connection.close()
+
+    threads = [
+      threading.Thread(target=redeem, args=(user, code))
+      for user, code in zip(users, self.codes)
+    ]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+
+    admitted = self.LIMIT - 1
+    self.assertEqual(codes.count(status.HTTP_201_CREATED), admitted)
+    self.assertEqual(codes.count(status.HTTP_400_BAD_REQUEST), self.INVITATIONS - admitted)
+    self.circle.refresh_from_db()
+    self.assertEqual(self.circle.members_count, self.LIMIT)
+    self.assertEqual(Membership.objects.filter(circle=self.circle, is_active=True).count(), self.LIMIT)
+    self.assertEqual(Invitation.objects.filter(used=True).count(), admitted)
+    issuer = Membership.objects.get(user=self.admin)
+    self.assertEqual(issuer.used_invitations, admitted)
@@ -0,0 +1,127 @@
+"""Circle lookups cache tests."""
+
+# Django
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+# Django REST Framework
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+# Models
+from cride.circles.models import Circle, Membership
+from cride.users.models import User, Profile
+
+# Cache
+from cride.circles import cache as circles_cache
+
+# Utilities
+from unittest import mock
+
+
+class LocalLRUTestCase(TestCase):
+  """In-process tier test case."""
+
+  def test_evicts_least_recently_used(self):
+    """Entries beyond the size evict the least recently used."""
+    lru = circles_cache.LocalLRU(size=2, timeout=60)
+    lru.set('a', 1, 60)
+    lru.set('b', 2, 60)
+    lru.get('a')
+    lru.set('c', 3, 60)
+    self.assertEqual(lru.get('a'), 1)
+    self.assertIsNone(lru.get('b'))
+    self.assertEqual(lru.get('c'), 3)
+
+  def test_expires(self):
+    """Entries expire after the smallest of both timeouts."""
+    lru = circles_cache.LocalLRU(size=2, timeout=5)
+    with mock.patch('cride.circles.cache.time.monotonic', return_value=100):
+      lru.set('a', 1, 60)
+    with mock.patch('cride.circles.cache.time.monotonic', return_value=104):
+      self.assertEqual(lru.get('a'), 1)
+    with mock.patch('cride.circles.cache.time.monotonic', return_value=105):
+      self.assertIsNone(lru.get('a'))
+
+
+@override_settings(CIRCLES_CACHE_TIMEOUT=300)
+class CircleCacheAPITestCase(APITestCase):
+  """Cross-request circle and membership cache test case."""
+
+  def setUp(self):
+    """Test case setup."""
+    cache.clear()
+    circles_cache.clear()
+    self.addCleanup(circles_cache.clear)
+
+    self.circle = Circle.objects.create(
+      name='Facultad de Ciencias',
+      slug_name='fciencias',
+      about='Grupo oficial de la Facultad de Ciencias de la UNAM',
+    )
+    self.admin = self.create_member('ezioaud', is_admin=True)
+    self.member = self.create_member('member0', invited_by=self.admin)
+    self.url = f'/circles/{self.circle.slug_name}/members/'
+
+  def create_member(self, username, **kwargs):
+    """Create an active member of the circle."""
+    user = User.objects.create(
+      email=f'{username}@cride.com',
+      username=username,
+      password='admin123'
+    )
+    profile = Profile.objects.create(user=user)
+    Membership.objects.create(user=user, profile=profile, circle=self.circle, **kwargs)
+    return user
+
+  def test_warm_checks_skip_database(self):
+    """Warm requests don't query the circle nor the membership check."""
+    self.client.force_authenticate(user=self.member)
+    self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+    circles_cache.clear()
+
+    with CaptureQueriesContext(connection) as context:
+      response = self.client.get(self.url)
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertFalse(any('"circles_circle"' in query['sql'] for query in context.captured_queries))
+
+  def test_deactivation_revokes_access(self):
+    """Deactivated members are denied right away."""
+    self.client.force_authenticate(user=self.member)
+    self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+    self.client.force_authenticate(user=self.admin)
+    response = self.client.delete(f'{self.url}member0/')
+    self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    self.client.force_authenticate(user=self.member)
+    self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+  def test_new_member_allowed(self):
+    """Users cached as outsiders are allowed once they join."""
+    outsider = User.objects.create(
+      email='outsider@cride.com',
+      username='outsider',
+      password='admin123'
+    )
+    self.client.force_authenticate(user=outsider)
+    self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    Membership.objects.create(
+      user=outsider,
+      profile=Profile.objects.create(user=outsider),
+      circle=self.circle
+    )
+    self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+  def test_renamed_circle(self):
+    """Renamed circles aren't found by their previous slug name."""
+    self.client.force_authenticate(user=self.member)
+    self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+    self.circle.slug_name = 'ciencias'
+    self.circle.save()
+    self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+    self.assertEqual(self.client.get('/circles/ciencias/members/').status_code, status.HTTP_200_OK)
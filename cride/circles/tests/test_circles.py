@@ -0,0 +1,86 @@
+"""Circle tests."""
+
+# Django
+from django.db import connection
+
+# Django REST Framework
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+# Models
+from cride.circles.models import Circle
+from cride.users.models import User
+
+# Views
+from cride.circles.views.circles import CircleViewSet
+
+
+class CircleRankingAPITestCase(APITestCase):
+  """Circle listing ranking test case."""
+
+  def setUp(self):
+    """Test case setup."""
+    rows = [
+      ('ciencias', 40, 5, 1, True, False),
+      ('ingenieria', 40, 9, 2, True, True),
+      ('medicina', 80, 0, 0, True, False),
+      ('privado', 500, 0, 0, False, False),
+      ('derecho', 10, 50, 30, False, True),
+    ]
+    for slug_name, members, offered, taken, verified, limited in rows:
+      Circle.objects.create(
+        name=slug_name.title(),
+        slug_name=slug_name,
+        members_count=members,
+        rides_offered=offered,
+        rides_taken=taken,
+        verified=verified,
+        is_limited=limited,
+        members_limit=100 if limited else 0,
+        is_public=slug_name != 'privado'
+      )
+    user = User.objects.create(email='ezio@cride.com', username='ezioaud', password='admin123')
+    self.client.force_authenticate(user=user)
+
+  def slugs(self, response):
+    """Return the slug names of a list response."""
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    return [circle['slug_name'] for circle in response.data['results']]
+
+  def test_ranking(self):
+    """Public circles are listed by members, then rides."""
+    response = self.client.get('/circles/')
+    self.assertEqual(self.slugs(response), ['medicina', 'ingenieria', 'ciencias', 'derecho'])
+
+  def test_filtered_ranking(self):
+    """Filters keep the ranking order."""
+    response = self.client.get('/circles/', {'verified': 'true'})
+    self.assertEqual(self.slugs(response), ['medicina', 'ingenieria', 'ciencias'])
+    response = self.client.get('/circles/', {'is_limited': 'true'})
+    self.assertEqual(self.slugs(response), ['ingenieria', 'derecho'])
+
+  def test_cursor_pages(self):
+    """Cursor pages follow the newest circles, whatever their counters."""
+    response = self.client.get('/circles/', {'pagination': 'cursor', 'limit': 2})
+    self.assertEqual(self.slugs(response), ['derecho', 'medicina'])
+
+    Circle.objects.filter(slug_name='ingenieria').update(members_count=1000)
+    response = self.client.get(response.data['next'])
+    self.assertEqual(self.slugs(response), ['ingenieria', 'ciencias'])
+
+  def test_cursor_pages_refuse_ordering(self):
+    """Cursor pages can't be reordered."""
+    response = self.client.get('/circles/', {'pagination': 'cursor', 'ordering': 'name'})
+    self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    self.assertIn('ordering', response.data)
+
+  def test_index_scan(self):
+    """The listing reads the ranking index without joins nor sorting."""
+    queryset = Circle.objects.filter(is_public=True).order_by(*CircleViewSet.ordering)
+    sql = str(queryset.query)
+    self.assertNotIn('JOIN', sql)
+    self.assertNotIn('GROUP BY', sql)
+    if connection.vendor == 'sqlite':
+      plan = queryset.explain()
+      self.assertIn('circle_ranking_idx', plan)
+      self.assertNotIn('TEMP B-TREE', plan)
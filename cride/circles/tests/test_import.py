@@ -0,0 +1,97 @@
+"""Circles importer tests."""
+
+# Django
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+
+# Models
+from cride.circles.models import Circle, Membership
+from cride.users.models import User, Profile
+
+# Utilities
+from io import StringIO
+import os
+import tempfile
+
+CIRCLES_CSV = str(settings.ROOT_DIR('circles.csv'))
+
+
+class ImportCirclesTestCase(TestCase):
+  """Circles CSV importer test case."""
+
+  def write_csv(self, content):
+    """Write a CSV file, return its path."""
+    handle, path = tempfile.mkstemp(suffix='.csv')
+    with os.fdopen(handle, 'w', encoding='utf-8') as output:
+      output.write(content)
+    self.addCleanup(os.remove, path)
+    return path
+
+  def run_import(self, path, *args):
+    """Run the importer, return its stdout and stderr."""
+    stdout, stderr = StringIO(), StringIO()
+    call_command('import_circles', path, *args, stdout=stdout, stderr=stderr)
+    return stdout.getvalue(), stderr.getvalue()
+
+  def test_import_shipped_file(self):
+    """The shipped circles.csv loads in batches."""
+    stdout, stderr = self.run_import(CIRCLES_CSV, '--batch-size', '7')
+    self.assertEqual(Circle.objects.count(), 21)
+    self.assertIn('21 created', stdout)
+    self.assertEqual(stderr, '')
+
+    circle = Circle.objects.get(slug_name='unam-fciencias')
+    self.assertEqual(circle.name, 'Facultad de Ciencias, UNAM')
+    self.assertTrue(circle.is_public and circle.verified)
+    self.assertFalse(circle.is_limited)
+    circle = Circle.objects.get(slug_name='inventive')
+    self.assertFalse(circle.is_public)
+    self.assertTrue(circle.is_limited)
+    self.assertEqual(circle.members_limit, 30)
+
+  def test_upsert(self):
+    """Existing circles are updated on slug_name, later rows win."""
+    Circle.objects.create(name='Old', slug_name='sable', about='Kept')
+    path = self.write_csv(
+      'name,slug_name,is_public,verified,members_limit\n'
+      'Sable,sable,1,0,0\n'
+      'Nuevo,nuevo,1,0,0\n'
+      'Sable Digital,sable,0,1,30\n'
+    )
+    stdout, _ = self.run_import(path)
+    self.assertIn('1 created, 1 updated', stdout)
+    circle = Circle.objects.get(slug_name='sable')
+    self.assertEqual(
+      (circle.name, circle.about, circle.is_public, circle.members_limit),
+      ('Sable Digital', 'Kept', False, 30)
+    )
+
+    self.run_import(path, '--skip-existing')
+    self.assertEqual(Circle.objects.count(), 2)
+
+  def test_invalid_rows(self):
+    """Invalid rows are reported and skipped."""
+    path = self.write_csv(
+      'name,slug_name,is_public,verified,members_limit\n'
+      'Valid,valid,1,0,0\n'
+      'Bad slug,bad slug,1,0,0\n'
+      'Bad flag,bad-flag,maybe,0,0\n'
+      'Bad limit,bad-limit,1,0,-1\n'
+    )
+    stdout, stderr = self.run_import(path)
+    self.assertIn('3 invalid', stdout)
+    self.assertIn('Row 2:', stderr)
+    self.assertEqual(list(Circle.objects.values_list('slug_name', flat=True)), ['valid'])
+
+  def test_admin_memberships(self):
+    """New circles get an admin membership and count it."""
+    user = User.objects.create(email='ezio@cride.com', username='ezioaud', password='admin123')
+    Profile.objects.create(user=user)
+    Circle.objects.create(name='Existing', slug_name='sable', about='')
+    self.run_import(CIRCLES_CSV, '--admin', 'ezioaud')
+
+    memberships = Membership.objects.filter(user=user, is_admin=True)
+    self.assertEqual(memberships.count(), 20)
+    self.assertFalse(memberships.filter(circle__slug_name='sable').exists())
+    self.assertEqual(Circle.objects.get(slug_name='inventive').members_count, 1)
@@ -16,6 +16,7 @@ from cride.circles.models import Circle, Membership
 from cride.users.views.users import UserLoginAPIView 
 
 # Utils
+from unittest import mock
 import json
 
 class InvitationsManagerTestCase(TestCase):
@@ -72,6 +73,23 @@ class InvitationsManagerTestCase(TestCase):
 
     self.assertNotEqual(code, invitation.code)
 
+  def test_mint(self):
+    """Minted invitations are inserted at once with unique codes."""
+    with self.assertNumQueries(3):
+      invitations = Invitation.objects.mint(20, issued_by=self.user, circle=self.circle)
+    codes = {invitation.code for invitation in invitations}
+    self.assertEqual(len(codes), 20)
+    self.assertEqual(Invitation.objects.filter(code__in=codes, issued_by=self.user).count(), 20)
+
+  def test_mint_replaces_collisions(self):
+    """Only the codes already taken are replaced."""
+    taken = Invitation.objects.create(issued_by=self.user, circle=self.circle).code
+    generated = iter([taken, 'FRESH1', 'FRESH2'])
+    with mock.patch.object(Invitation.objects, 'generate_code', side_effect=lambda: next(generated)):
+      invitations = Invitation.objects.mint(2, issued_by=self.user, circle=self.circle)
+    self.assertEqual({invitation.code for invitation in invitations}, {'FRESH1', 'FRESH2'})
+    self.assertEqual(Invitation.objects.count(), 3)
+
 class MemberInvitationsAPITestCase(APITestCase):
   """Member invitation API test case."""
 
@@ -0,0 +1,221 @@
+"""Membership tests."""
+
+# Django
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Django REST Framework
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+# Models
+from cride.circles.models import Circle, Membership, Invitation
+from cride.users.models import User, Profile
+
+# Utilities
+from cride.utils import counters
+from unittest import mock
+
+
+class MembershipFieldsAPITestCase(APITestCase):
+  """Membership sparse fieldsets test case."""
+
+  def setUp(self):
+    """Test case setup."""
+    self.circle = Circle.objects.create(
+      name='Facultad de Ciencias',
+      slug_name='fciencias',
+      about='Grupo oficial de la Facultad de Ciencias de la UNAM',
+    )
+    self.admin = self.create_member('ezioaud', is_admin=True)
+    for i in range(3):
+      self.create_member(f'member{i}', invited_by=self.admin)
+
+    self.client.force_authenticate(user=self.admin)
+    self.url = f'/circles/{self.circle.slug_name}/members/'
+
+  def create_member(self, username, **kwargs):
+    """Create an active member of the circle."""
+    user = User.objects.create(
+      first_name=username.title(),
+      last_name='Cride',
+      email=f'{username}@cride.com',
+      username=username,
+      password='admin123'
+    )
+    profile = Profile.objects.create(user=user)
+    Membership.objects.create(user=user, profile=profile, circle=self.circle, **kwargs)
+    return user
+
+  def test_list_queries(self):
+    """Users, profiles and inviting users are joined."""
+    with self.assertNumQueries(6):
+      response = self.client.get(self.url)
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(len(response.data['results']), 4)
+    self.assertIsNotNone(response.data['results'][0]['user']['profile'])
+
+  def test_compiled_list(self):
+    """Compiled list pages render the same JSON, pending counters included."""
+    membership = Membership.objects.get(user=self.admin)
+    counters.get_counters().incr(counters.make_key(Membership, membership.pk), {'rides_taken': 2})
+    counters.get_counters().incr(counters.make_key(Profile, membership.profile_id), {'rides_offered': 1})
+    self.addCleanup(counters.get_counters().clear)
+
+    compiled = self.client.get(self.url)
+    with mock.patch('cride.utils.views.get_compiled_serializer', return_value=None):
+      regular = self.client.get(self.url)
+    self.assertEqual(compiled.content, regular.content)
+
+    member = next(m for m in compiled.data['results'] if m['user']['username'] == 'ezioaud')
+    self.assertEqual(member['rides_taken'], 2)
+    self.assertEqual(member['user']['profile']['rides_offered'], 1)
+
+  def test_list_pending_counters_at_once(self):
+    """Regular list pages fetch the pending counters of every member at once."""
+    backend = counters.get_counters()
+    self.addCleanup(backend.clear)
+    for membership in Membership.objects.all():
+      backend.incr(counters.make_key(Profile, membership.profile_id), {'rides_offered': 1})
+
+    with mock.patch('cride.utils.views.get_compiled_serializer', return_value=None):
+      with mock.patch.object(backend, 'get', wraps=backend.get) as get:
+        with mock.patch.object(backend, 'get_many', wraps=backend.get_many) as get_many:
+          response = self.client.get(self.url)
+    self.assertEqual(get.call_count, 0)
+    self.assertEqual(get_many.call_count, 1)
+    self.assertEqual({m['user']['profile']['rides_offered'] for m in response.data['results']}, {1})
+
+  def test_sparse_fields(self):
+    """Members render only the requested fields."""
+    response = self.client.get(self.url, {'fields': 'user.username,rides_taken'})
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    member = response.data['results'][0]
+    self.assertEqual(member['user'], {'username': member['user']['username']})
+    self.assertEqual(set(member), {'user', 'rides_taken'})
+
+  def test_expand_invited_by(self):
+    """Inviting users render in full when expanded."""
+    response = self.client.get(
+      f'{self.url}member0/',
+      {'fields': 'invited_by.username,invited_by.profile', 'expand': 'invited_by'}
+    )
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(response.data['invited_by']['username'], 'ezioaud')
+    self.assertEqual(set(response.data['invited_by']), {'username', 'profile'})
+
+  def test_non_member_forbidden(self):
+    """Users without an active membership are denied."""
+    outsider = User.objects.create(
+      email='outsider@cride.com',
+      username='outsider',
+      password='admin123'
+    )
+    self.client.force_authenticate(user=outsider)
+    response = self.client.get(self.url)
+    self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+  def test_unknown_circle(self):
+    """Unknown circles are not found."""
+    response = self.client.get('/circles/unknown/members/')
+    self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+  def test_circle_and_membership_joined(self):
+    """The circle and the requesting membership load in one query."""
+    with CaptureQueriesContext(connection) as context:
+      response = self.client.get(f'{self.url}ezioaud/', {'fields': 'is_admin'})
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    circle_queries = [
+      query['sql'] for query in context.captured_queries
+      if 'FROM "circles_circle"' in query['sql']
+    ]
+    self.assertEqual(len(circle_queries), 1)
+    self.assertIn('JOIN "circles_membership"', circle_queries[0])
+
+
+class MemberInvitationsBreakdownTestCase(APITestCase):
+  """Member invitations breakdown test case."""
+
+  INVITATIONS = 5
+
+  def setUp(self):
+    """Test case setup."""
+    cache.clear()
+    self.circle = Circle.objects.create(
+      name='Facultad de Ciencias',
+      slug_name='fciencias',
+      about='Grupo oficial de la Facultad de Ciencias de la UNAM',
+    )
+    self.admin = self.create_member('ezioaud', is_admin=True, remaining_invitations=self.INVITATIONS)
+    self.client.force_authenticate(user=self.admin)
+    self.url = f'/circles/{self.circle.slug_name}/members/ezioaud/inivitations/'
+
+  def create_member(self, username, **kwargs):
+    """Create an active member of the circle."""
+    user = User.objects.create(
+      email=f'{username}@cride.com',
+      username=username,
+      password='admin123'
+    )
+    profile = Profile.objects.create(user=user)
+    Membership.objects.create(user=user, profile=profile, circle=self.circle, **kwargs)
+    return user
+
+  def count_queries(self):
+    """Return the queries of an uncached breakdown request."""
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+      response = self.client.get(self.url)
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    return len(context.captured_queries)
+
+  def test_constant_queries(self):
+    """Queries don't grow with the invited members nor the invitations minted."""
+    for i in range(2):
+      self.create_member(f'member{i}', invited_by=self.admin)
+    few = self.count_queries()
+
+    for i in range(2, 8):
+      self.create_member(f'member{i}', invited_by=self.admin)
+    Membership.objects.filter(user=self.admin).update(remaining_invitations=20)
+    Invitation.objects.all().delete()
+    self.assertEqual(self.count_queries(), few)
+
+  def test_breakdown(self):
+    """Invited members render with their profiles, missing invitations are minted."""
+    self.create_member('member0', invited_by=self.admin)
+    response = self.client.get(self.url)
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(len(response.data['invitations']), self.INVITATIONS)
+    self.assertEqual(Invitation.objects.filter(issued_by=self.admin).count(), self.INVITATIONS)
+    invited = response.data['used_invitations']
+    self.assertEqual([member['user']['username'] for member in invited], ['member0'])
+    self.assertIsNotNone(invited[0]['user']['profile'])
+
+  def test_cached_until_redeemed(self):
+    """Breakdowns are cached until an invitation is redeemed."""
+    first = self.client.get(self.url)
+    with self.assertNumQueries(3):
+      self.assertEqual(self.client.get(self.url).data, first.data)
+
+    user = User.objects.create(email='member0@cride.com', username='member0', password='admin123')
+    Profile.objects.create(user=user)
+    self.client.force_authenticate(user=user)
+    response = self.client.post(
+      f'/circles/{self.circle.slug_name}/members/',
+      {'invitation_code': first.data['invitations'][0]}
+    )
+    self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    self.client.force_authenticate(user=self.admin)
+    response = self.client.get(self.url)
+    self.assertEqual([member['user']['username'] for member in response.data['used_invitations']], ['member0'])
+    self.assertNotIn(first.data['invitations'][0], response.data['invitations'])
+    self.assertEqual(len(response.data['invitations']), self.INVITATIONS - 1)
+
+  def test_other_members_forbidden(self):
+    """Members can only see their own breakdown."""
+    self.client.force_authenticate(user=self.create_member('member0'))
+    response = self.client.get(self.url)
+    self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -15,22 +15,35 @@ from cride.circles.permissions.circles import IsCircleAdmin
 from rest_framework.permissions import IsAuthenticated
 
 # Filters
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
+from cride.utils.filters import FullTextSearchFilter
 
-class CircleViewSet(viewsets.ModelViewSet):
-  """Circle view set."""
+# Utilities
+from cride.utils.views import ConditionalListMixin, ConditionalRetrieveMixin
+
+class CircleViewSet(ConditionalListMixin, ConditionalRetrieveMixin, viewsets.ModelViewSet):
+  """Circle view set.
+
+    Circles are listed by their ranking, or by `?ordering=`. Cursor
+    pages (`?pagination=cursor`) list the newest circles first
+    instead, ignoring the ranking, and refuse `?ordering=`.
+  """
   
   serializer_class = CircleModelSerializer
   lookup_field = 'slug_name'
 
   # Filters
-  filter_backends = (SearchFilter, OrderingFilter, DjangoFilterBackend)
+  filter_backends = (OrderingFilter, FullTextSearchFilter, DjangoFilterBackend)
   search_fields = ('slug_name', 'name')
-  ordering_fields = ('rides_offered', 'rides_taken', 'name', 'create')
-  ordering = ('-members__count', '-rides_offered', '-rides_taken')
+  ordering_fields = ('members_count', 'rides_offered', 'rides_taken', 'name', 'created')
+  ordering = tuple(Circle._meta.ordering)
   filter_fields = ('verified', 'is_limited')
 
+  # Pagination: the ranking counters tie and change as people join,
+  # cursors follow the immutable, unique primary key instead.
+  cursor_ordering = ('-pk',)
+
   def get_permissions(self):
     """Asing permissions based on action."""
     permissions = [IsAuthenticated]
@@ -51,7 +64,7 @@ class CircleViewSet(viewsets.ModelViewSet):
 
   def perform_create(self, serializer):
     """Assign circle admin."""
-    circle = serializer.save()
+    circle = serializer.save(members_count=1)
     user = self.request.user
     profile = user.profile
     Membership.objects.create(
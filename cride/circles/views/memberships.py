@@ -1,5 +1,10 @@
 """Circle membership views."""
 
+# Django
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
 # Django REST Framework
 from rest_framework import mixins, viewsets, status
 from rest_framework.generics import get_object_or_404
@@ -15,8 +20,19 @@ from cride.circles.serializers import MembershipModelSerializer, AddMemberSerial
 # Permissions
 from rest_framework.permissions import IsAuthenticated
 from cride.circles.permissions.memberships import IsActiveCircleMember, IsAdminOrMembershipOwner, IsSelfMember
+from cride.circles.resolvers import get_resolver
+
+# Cache
+from cride.circles import cache as circles_cache
 
-class MembershipViewSet(mixins.ListModelMixin, 
+# Utilities
+from cride.utils.views import CompiledListMixin, ConditionalListMixin, ConditionalRetrieveMixin, make_etag
+from cride.utils.serializers import compile_serializer, get_field_trees, is_requested
+
+class MembershipViewSet(ConditionalListMixin,
+                        ConditionalRetrieveMixin,
+                        CompiledListMixin,
+                        mixins.ListModelMixin, 
                         mixins.RetrieveModelMixin,
                         mixins.DestroyModelMixin,
                         mixins.CreateModelMixin,
@@ -24,19 +40,33 @@ class MembershipViewSet(mixins.ListModelMixin,
   """Circle membership view set."""
   
   serializer_class = MembershipModelSerializer
+  cursor_ordering = ('-pk',)
+  conditional_fields = ('modified', 'user__modified', 'profile__modified')
 
-  def dispatch(self, request, *args, **kwargs):
-    """Verify that the circle exists."""
-    slug_name = kwargs['slug_name']
-    self.circle = get_object_or_404(Circle, slug_name=slug_name)
-    return super(MembershipViewSet, self).dispatch(request, *args, **kwargs)
+  def initial(self, request, *args, **kwargs):
+    """Verify that the circle exists before checking permissions."""
+    self.circle = get_resolver(request).get_circle(kwargs['slug_name'])
+    super(MembershipViewSet, self).initial(request, *args, **kwargs)
 
   def get_queryset(self):
-    """Return circle members."""
-    return Membership.objects.filter(
+    """Return circle members.
+
+      Users, their profiles and inviting users are joined only when
+      requested through `?fields=`.
+    """
+    queryset = Membership.objects.filter(
       circle=self.circle,
       is_active=True
     )
+    fields, _ = get_field_trees(self.request)
+    related = [
+      path.replace('.', '__')
+      for path in ('user.profile', 'user', 'invited_by')
+      if is_requested(fields, path)
+    ]
+    if related:
+      queryset = queryset.select_related(*related)
+    return queryset
 
   def get_permissions(self):
     """Assing permissions based on action."""
@@ -44,23 +74,37 @@ class MembershipViewSet(mixins.ListModelMixin,
     if self.action != 'create':
       permissions.append(IsActiveCircleMember)
       # permissions.append(IsAdminOrMembershipOwner)
-    if self.action == 'invitations':
+    if self.action == 'inivitations':
       permissions.append(IsSelfMember)
     return [p() for p in permissions]
 
   def get_object(self):
     """Return the circle member by using the user's username."""
     return get_object_or_404(
-      Membership,
+      Membership.objects.select_related('user__profile'),
       user__username=self.kwargs['pk'],
       circle=self.circle,
       is_active=True
     )
 
+  def get_object_validators(self, instance):
+    """Include the nested user and profile in the validators."""
+    user = instance.user
+    last_modified = max(instance.modified, user.modified, user.profile.modified)
+    return make_etag(instance.pk, last_modified), last_modified
+
   def perform_destroy(self, instance):
-    """Disable membership."""
-    instance.is_active = False
-    instance.save()
+    """Disable membership and release its place in the circle."""
+    with transaction.atomic():
+      active = Membership.objects.select_for_update().filter(pk=instance.pk, is_active=True)
+      if not active.exists():
+        return
+      instance.is_active = False
+      instance.save()
+      Circle.objects.filter(pk=instance.circle_id, members_count__gt=0).update(
+        members_count=F('members_count') - 1,
+        modified=timezone.now()
+      )
 
   @action(detail=True, methods=['GET'])
   def inivitations(self, request, *args, **kwargs):
@@ -69,38 +113,50 @@ class MembershipViewSet(mixins.ListModelMixin,
       Will return a list containing all the members that have}
       used its invitations and another list containing the
       invitation that haven´t being used yet.
+
+      Only the member itself is allowed, so breakdowns are cached
+      by requesting user until one of their invitations is issued
+      or redeemed.
     """
 
-    member = self.get_object()
+    data = circles_cache.get_invitations(self.circle.pk, request.user.pk)
+    if data is None:
+      member = self.get_object()
+      data = self.get_invitations_breakdown(member)
+      circles_cache.set_invitations(self.circle.pk, member.user_id, data)
+    return Response(data)
+
+  def get_invitations_breakdown(self, member):
+    """Return the invitations breakdown of member.
+
+      Runs a constant number of queries: invited members are read
+      with their users and profiles as rows for the compiled
+      serializer, and missing invitations are minted in bulk.
+    """
+    user = member.user
 
     invited_members = Membership.objects.filter(
       circle=self.circle,
-      invited_by=request.user,
+      invited_by=user,
       is_active=True
     )
+    compiled = compile_serializer(MembershipModelSerializer)
+    used_invitations = compiled.render_many(invited_members.values(*compiled.paths), self.request)
 
-    unused_invitations = Invitation.objects.filter(
-      circle = self.circle,
-      issued_by=request.user,
+    invitations = list(Invitation.objects.filter(
+      circle=self.circle,
+      issued_by=user,
       used=False
-    ).values_list('code')
-
-    diff = member.remaining_invitations - len(unused_invitations)
+    ).values_list('code', flat=True))
 
-    invitations = [x[0] for x in unused_invitations]
-    for i in range(0, diff):
-      invitations.append(
-        Invitation.objects.create(
-          issued_by=request.user,
-          circle=self.circle
-        ).code
-      )
+    diff = member.remaining_invitations - len(invitations)
+    minted = Invitation.objects.mint(diff, issued_by=user, circle=self.circle)
+    invitations.extend(invitation.code for invitation in minted)
 
-    data = {
-      'used_invitations': MembershipModelSerializer(invited_members, many=True).data,
+    return {
+      'used_invitations': used_invitations,
       'invitations': invitations
     }
-    return Response(data)
 
   def create(self, request, *args, **kwargs):
     """Handle member creation from invitation code."""
@@ -7,3 +7,7 @@ class RidesAppConfig(AppConfig):
 
   name = 'cride.rides'
   verbose_name = 'Rides'
+
+  def ready(self):
+    """Connect signals."""
+    import cride.rides.signals  # noqa F401
@@ -0,0 +1,100 @@
+"""Rides archiver.
+
+Finished rides older than RIDES_ARCHIVE_AFTER are moved, with their
+passengers and ratings, from the rides tables to the archive tables
+in bounded batches. Every batch is copied and deleted in a single
+transaction so a ride is always in exactly one of both tables.
+"""
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+# Models
+from cride.rides.models import Ride, Rating, ArchivedRide, ArchivedPassenger, ArchivedRating
+
+# Utilities
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = 'rides:archiver:lock'
+LOCK_TIMEOUT = 30 * 60
+
+RIDE_FIELDS = [field.attname for field in Ride._meta.concrete_fields]
+RATING_FIELDS = [field.attname for field in Rating._meta.concrete_fields if not field.primary_key]
+
+
+def archive_batch(cutoff, batch_size):
+  """Move a batch of rides finished before cutoff, return its size."""
+  with transaction.atomic():
+    ids = list(
+      Ride.objects.filter(is_active=False, arrival_date__lt=cutoff)
+      .order_by('arrival_date', 'pk')
+      .select_for_update()
+      .values_list('pk', flat=True)[:batch_size]
+    )
+    if not ids:
+      return 0
+
+    now = timezone.now()
+    ArchivedRide.objects.bulk_create([
+      ArchivedRide(archived_at=now, **ride)
+      for ride in Ride.objects.filter(pk__in=ids).values(*RIDE_FIELDS)
+    ])
+    ArchivedPassenger.objects.bulk_create([
+      ArchivedPassenger(ride_id=ride_id, user_id=user_id)
+      for ride_id, user_id in Ride.passengers.through.objects.filter(
+        ride_id__in=ids
+      ).values_list('ride_id', 'user_id')
+    ])
+    ArchivedRating.objects.bulk_create([
+      ArchivedRating(**rating)
+      for rating in Rating.objects.filter(ride_id__in=ids).values(*RATING_FIELDS)
+    ])
+    Ride.objects.filter(pk__in=ids).delete()
+  return len(ids)
+
+
+def archive_finished_rides(batch_size=500, max_batches=20):
+  """Archive finished rides older than RIDES_ARCHIVE_AFTER.
+
+    Return the run metrics, or None if another run holds the lock.
+  """
+  token = uuid.uuid4().hex
+  if not cache.add(LOCK_KEY, token, LOCK_TIMEOUT):
+    logger.info('Rides archiver already running, skipping.')
+    return None
+
+  start = time.perf_counter()
+  try:
+    cutoff = timezone.now() - settings.RIDES_ARCHIVE_AFTER
+    archived = batches = 0
+    drained = False
+    while batches < max_batches:
+      moved = archive_batch(cutoff, batch_size)
+      if not moved:
+        drained = True
+        break
+      archived += moved
+      batches += 1
+      if moved < batch_size:
+        drained = True
+        break
+  finally:
+    # Past LOCK_TIMEOUT the lock may belong to another run.
+    if cache.get(LOCK_KEY) == token:
+      cache.delete(LOCK_KEY)
+
+  metrics = {
+    'archived': archived,
+    'batches': batches,
+    'drained': drained,
+    'seconds': round(time.perf_counter() - start, 3),
+  }
+  logger.info('Rides archiver moved %(archived)d rides in %(batches)d batches.', metrics, extra=metrics)
+  return metrics
@@ -0,0 +1,61 @@
+"""Rides list cache.
+
+Upcoming ride pages are cached per circle under a version key. Any
+change to a ride of the circle (creation, update, join, finish or
+rating) bumps the version, which orphans every cached page at once.
+Pages also expire by themselves when the earliest upcoming ride is
+about to leave the list because of the departure cutoff.
+"""
+
+# Django
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+# Utilities
+from datetime import timedelta
+import hashlib
+import uuid
+
+LIST_TIMEOUT = 60
+DEPARTURE_CUTOFF = timedelta(minutes=10)
+
+
+def version_key(circle_id):
+  """Return the cache key holding the version of a circle's rides."""
+  return f'rides:list:{circle_id}:version'
+
+
+def get_version(circle_id):
+  """Return the current version of a circle's rides."""
+  key = version_key(circle_id)
+  version = cache.get(key)
+  if version is None:
+    version = uuid.uuid4().hex
+    cache.add(key, version, None)
+    version = cache.get(key, version)
+  return version
+
+
+def invalidate(circle_id):
+  """Drop the cached ride pages of a circle once the transaction commits."""
+  if circle_id is None:
+    return
+  key = version_key(circle_id)
+  transaction.on_commit(lambda: cache.set(key, uuid.uuid4().hex, None))
+
+
+def page_key(circle_id, request):
+  """Return the cache key of a ride page, by circle, query params and page."""
+  url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+  return f'rides:list:{circle_id}:{get_version(circle_id)}:{url}'
+
+
+def page_timeout(queryset):
+  """Return seconds until the first ride of queryset passes the cutoff."""
+  earliest = queryset.aggregate(earliest=Min('departure_date'))['earliest']
+  if earliest is None:
+    return LIST_TIMEOUT
+  remaining = (earliest - DEPARTURE_CUTOFF - timezone.now()).total_seconds()
+  return max(1, min(LIST_TIMEOUT, int(remaining)))
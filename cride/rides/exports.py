@@ -0,0 +1,205 @@
+"""Ride history exports.
+
+The full history of a circle, archived rides included, can be
+hundreds of thousands of rides, so it is never loaded at once.
+Rides are read in primary key chunks together with their passengers
+and ratings, written to a temporary file and finally handed to the
+configured file storage.
+"""
+
+# Django
+from django.core.files import File
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+# Models
+from cride.rides.models import (
+  Ride,
+  Rating,
+  RideExport,
+  ArchivedRide,
+  ArchivedRating
+)
+
+# Utilities
+from collections import defaultdict
+import csv
+import gzip
+import io
+import json
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 2000
+
+# (rides, ratings) models of the rides and archive tables.
+SOURCES = (
+  (Ride, Rating),
+  (ArchivedRide, ArchivedRating),
+)
+
+RIDE_FIELDS = (
+  'id',
+  'offered_by__username',
+  'departure_location',
+  'departure_date',
+  'arrival_location',
+  'arrival_date',
+  'available_seats',
+  'comments',
+  'rating',
+  'is_active',
+  'passengers_summary',
+)
+
+CSV_HEADER = (
+  'id',
+  'offered_by',
+  'departure_location',
+  'departure_date',
+  'arrival_location',
+  'arrival_date',
+  'available_seats',
+  'comments',
+  'rating',
+  'is_active',
+  'passengers',
+  'ratings',
+)
+
+
+def iter_chunks(circle_id, sources=SOURCES, chunk_size=CHUNK_SIZE):
+  """Yield lists of circle rides with their passengers and ratings.
+
+    Each chunk costs two queries whatever the number of passengers
+    and ratings, and chunks are paginated by primary key so late
+    chunks are as cheap as the first ones. Rides are read from the
+    rides tables first and then from the archive.
+  """
+  for ride_model, rating_model in sources:
+    yield from iter_source_chunks(circle_id, ride_model, rating_model, chunk_size)
+
+
+def iter_source_chunks(circle_id, ride_model, rating_model, chunk_size):
+  """Yield lists of circle rides of a single source."""
+  last_pk = 0
+  while True:
+    rides = list(
+      ride_model.objects.filter(offered_in_id=circle_id, pk__gt=last_pk)
+      .order_by('pk')
+      .values(*RIDE_FIELDS)[:chunk_size]
+    )
+    if not rides:
+      return
+    ids = [ride['id'] for ride in rides]
+
+    ratings = defaultdict(list)
+    rates = rating_model.objects.filter(ride_id__in=ids).order_by('pk').values(
+      'ride_id', 'rating_user__username', 'rating', 'comments', 'created'
+    )
+    for rate in rates:
+      ratings[rate.pop('ride_id')].append({
+        'user': rate['rating_user__username'],
+        'rating': rate['rating'],
+        'comments': rate['comments'],
+        'created': rate['created'],
+      })
+
+    for ride in rides:
+      ride['offered_by'] = ride.pop('offered_by__username')
+      ride['passengers'] = [p['username'] for p in ride.pop('passengers_summary')]
+      ride['ratings'] = ratings[ride['id']]
+    yield rides
+
+    last_pk = ids[-1]
+
+
+class CSVWriter:
+  """Write rides as CSV, passengers and ratings flattened."""
+
+  extension = 'csv'
+
+  def __init__(self, fileobj):
+    self.stream = io.TextIOWrapper(fileobj, encoding='utf-8', newline='')
+    self.writer = csv.writer(self.stream)
+    self.writer.writerow(CSV_HEADER)
+
+  def write(self, rides):
+    """Write a chunk of rides."""
+    for ride in rides:
+      ride['departure_date'] = timezone.localtime(ride['departure_date']).isoformat()
+      ride['arrival_date'] = timezone.localtime(ride['arrival_date']).isoformat()
+      ride['passengers'] = ' '.join(ride['passengers'])
+      ride['ratings'] = ' '.join(f"{rate['user']}:{rate['rating']}" for rate in ride['ratings'])
+      self.writer.writerow([ride[field] for field in CSV_HEADER])
+
+  def close(self):
+    """Flush pending data leaving the underlying file open."""
+    self.stream.detach()
+
+
+class JSONLinesWriter:
+  """Write rides as gzip compressed JSON Lines."""
+
+  extension = 'jsonl.gz'
+
+  def __init__(self, fileobj):
+    self.gzip = gzip.GzipFile(fileobj=fileobj, mode='wb')
+    self.stream = io.TextIOWrapper(self.gzip, encoding='utf-8')
+
+  def write(self, rides):
+    """Write a chunk of rides."""
+    for ride in rides:
+      self.stream.write(json.dumps(ride, cls=DjangoJSONEncoder))
+      self.stream.write('\n')
+
+  def close(self):
+    """Flush pending data leaving the underlying file open."""
+    self.stream.detach()
+    self.gzip.close()
+
+
+WRITERS = {
+  RideExport.CSV: CSVWriter,
+  RideExport.JSONL: JSONLinesWriter,
+}
+
+
+def run_export(export, chunk_size=CHUNK_SIZE):
+  """Write the export file, recording progress after every chunk."""
+  export.status = RideExport.RUNNING
+  export.total_rides = sum(
+    ride_model.objects.filter(offered_in_id=export.circle_id).count()
+    for ride_model, _ in SOURCES
+  )
+  export.exported_rides = 0
+  export.save(update_fields=('status', 'total_rides', 'exported_rides', 'modified'))
+
+  try:
+    with tempfile.TemporaryFile() as fileobj:
+      writer = WRITERS[export.format](fileobj)
+      for rides in iter_chunks(export.circle_id, chunk_size=chunk_size):
+        writer.write(rides)
+        export.exported_rides += len(rides)
+        export.save(update_fields=('exported_rides', 'modified'))
+      writer.close()
+
+      fileobj.seek(0)
+      name = f'{export.circle.slug_name}-{export.pk}.{writer.extension}'
+      export.file.save(name, File(fileobj), save=False)
+  except Exception as error:
+    logger.exception('Ride export %s failed', export.pk)
+    RideExport.objects.filter(pk=export.pk).update(
+      status=RideExport.FAILED,
+      error=str(error),
+      finished_at=timezone.now(),
+      modified=timezone.now()
+    )
+    raise
+
+  export.status = RideExport.DONE
+  export.finished_at = timezone.now()
+  export.save(update_fields=('file', 'status', 'finished_at', 'modified'))
+  return export
@@ -0,0 +1,113 @@
+"""JSON renderers benchmark."""
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework.renderers import JSONRenderer
+
+# Models
+from cride.circles.models import Circle
+from cride.rides.models import Ride
+from cride.users.models import User, Profile
+
+# Serializers
+from cride.rides.serializers import RideModelSerializer
+
+# Utilities
+from cride.utils.renderers import ORJSONRenderer
+from datetime import timedelta
+import json
+import random
+import time
+
+
+class Command(BaseCommand):
+  """Benchmark the JSON renderers.
+
+    Render a page of RideModelSerializer output, built from unsaved
+    rides so no database is needed, with the stdlib JSONRenderer and
+    the orjson renderer. Outputs are checked to be the same bytes.
+  """
+
+  help = 'Compare JSONRenderer and ORJSONRenderer on ride list pages.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--passengers', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the report as JSON to this path.')
+
+  def handle(self, *args, **options):
+    data = {
+      'count': options['rows'],
+      'results': RideModelSerializer(self.build_rides(options), many=True).data,
+    }
+    renderers = {'json': JSONRenderer(), 'orjson': ORJSONRenderer()}
+    outputs = {name: renderer.render(data) for name, renderer in renderers.items()}
+    if outputs['json'] != outputs['orjson']:
+      raise CommandError('ORJSONRenderer output differs from JSONRenderer.')
+
+    report = {'rows': options['rows'], 'bytes': len(outputs['json'])}
+    for name, renderer in renderers.items():
+      start = time.perf_counter()
+      for _ in range(options['repeat']):
+        renderer.render(data)
+      elapsed = (time.perf_counter() - start) / options['repeat']
+      report[name] = {'ms': elapsed * 1000, 'mb_per_second': report['bytes'] / elapsed / 1e6}
+    report['speedup'] = report['json']['ms'] / report['orjson']['ms']
+
+    self.stdout.write(self.style.MIGRATE_HEADING(f'{report["rows"]} rides, {report["bytes"]} bytes'))
+    for name in renderers:
+      self.stdout.write(f'  {name}: {report[name]["ms"]:.3f} ms, {report[name]["mb_per_second"]:.1f} MB/s')
+    self.stdout.write(f'  speedup: {report["speedup"]:.1f}x')
+    if options['output']:
+      with open(options['output'], 'w') as output:
+        json.dump(report, output, indent=2)
+
+  def build_rides(self, options):
+    """Return unsaved rides with offerers, circle and passengers."""
+    rng = random.Random(options['seed'])
+    circle = Circle(pk=1, name='Facultad de Ciencias', slug_name='fciencias')
+    now = timezone.now()
+    rides = []
+    for pk in range(1, options['rows'] + 1):
+      user = User(
+        pk=pk,
+        username=f'user{pk}',
+        email=f'user{pk}@cride.com',
+        first_name='Benchmark',
+        last_name=f'Usuario {pk}',
+        phone_number='+525512345678'
+      )
+      user.profile = Profile(
+        pk=pk,
+        user=user,
+        biography='Viajo a Ciudad Universitaria todos los días.',
+        rides_taken=rng.randint(0, 100),
+        rides_offered=rng.randint(0, 100),
+        reputation=round(rng.uniform(1, 5), 1)
+      )
+      departure = now + timedelta(minutes=rng.randint(20, 60 * 24 * 7))
+      rides.append(Ride(
+        pk=pk,
+        created=now,
+        modified=now,
+        offered_by=user,
+        offered_in=circle,
+        available_seats=rng.randint(1, 4),
+        passengers_count=options['passengers'],
+        passengers_summary=[
+          {'id': rng.randint(1, options['rows']), 'username': f'passenger{i}'}
+          for i in range(options['passengers'])
+        ],
+        comments='Salgo puntual, sin escalas.',
+        departure_location='Ciudad Universitaria',
+        departure_date=departure,
+        arrival_location='Polanco',
+        arrival_date=departure + timedelta(minutes=rng.randint(10, 120)),
+        rating=round(rng.uniform(1, 5), 1)
+      ))
+    return rides
@@ -0,0 +1,148 @@
+"""Upcoming rides query benchmark."""
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+# Models
+from cride.circles.models import Circle
+from cride.rides.models import Ride
+from cride.users.models import User
+
+# Views
+from cride.rides.views.rides import RideViewSet
+
+# Utilities
+from datetime import timedelta
+import json
+import random
+import time
+
+
+class Rollback(Exception):
+  """Raised to discard the seeded data."""
+
+
+class Command(BaseCommand):
+  """Benchmark the upcoming rides list query.
+
+    Seed a large ride table and record the EXPLAIN plan and the
+    timings of the RideViewSet list query (page and count) without
+    and with the Ride model indexes. Everything runs inside a
+    transaction that is rolled back unless --keep is given.
+  """
+
+  help = 'Seed rides and compare the upcoming rides query plans without and with indexes.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--rides', type=int, default=100000)
+    parser.add_argument('--circles', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--page-size', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the report as JSON to this path.')
+    parser.add_argument('--keep', action='store_true', help='Keep the seeded rides.')
+
+  def handle(self, *args, **options):
+    report = {}
+    try:
+      with transaction.atomic():
+        circle = self.seed(options)
+        self.analyze()
+        self.execute_for_indexes('remove_sql')
+        report['before'] = self.measure(circle, options)
+        self.execute_for_indexes('create_sql')
+        self.analyze()
+        report['after'] = self.measure(circle, options)
+        if not options['keep']:
+          raise Rollback
+    except Rollback:
+      pass
+
+    for stage in ('before', 'after'):
+      self.stdout.write(self.style.MIGRATE_HEADING(f'{stage} indexes'))
+      for name, result in report[stage].items():
+        self.stdout.write(f'  {name}: {result["ms"]:.3f} ms')
+        for line in result['plan'].splitlines():
+          self.stdout.write(f'    {line}')
+    if options['output']:
+      with open(options['output'], 'w') as output:
+        json.dump(report, output, indent=2)
+
+  def seed(self, options):
+    """Create circles and rides, return the busiest circle."""
+    rng = random.Random(options['seed'])
+    user, _ = User.objects.get_or_create(
+      username='benchmark',
+      defaults={'email': 'benchmark@cride.com', 'first_name': 'Bench', 'last_name': 'Mark'}
+    )
+    slugs = [f'benchmark-{options["seed"]}-{i}' for i in range(options['circles'])]
+    Circle.objects.bulk_create([Circle(name=slug, slug_name=slug) for slug in slugs])
+    circles = list(Circle.objects.filter(slug_name__in=slugs).order_by('slug_name'))
+
+    # Half of the rides go to the first circle to mimic a hot circle.
+    weights = [len(circles)] + [1] * (len(circles) - 1)
+    now = timezone.now()
+    batch = []
+    for i in range(options['rides']):
+      departure = now + timedelta(minutes=rng.randint(-60 * 24 * 90, 60 * 24 * 30))
+      batch.append(Ride(
+        offered_by=user,
+        offered_in=rng.choices(circles, weights)[0],
+        available_seats=rng.randint(0, 4),
+        departure_location='Benchmark origin',
+        departure_date=departure,
+        arrival_location='Benchmark destination',
+        arrival_date=departure + timedelta(minutes=rng.randint(10, 180)),
+        is_active=departure > now or rng.random() < 0.2
+      ))
+      if len(batch) >= options['batch_size']:
+        Ride.objects.bulk_create(batch)
+        batch = []
+    Ride.objects.bulk_create(batch)
+    self.stdout.write(f'Seeded {options["rides"]} rides in {len(circles)} circles.')
+    return circles[0]
+
+  def execute_for_indexes(self, method):
+    """Run the create or remove statement of every Ride index.
+
+      Statements are executed through a cursor instead of an entered
+      schema editor so they stay inside the benchmark transaction.
+    """
+    editor = connection.schema_editor()
+    with connection.cursor() as cursor:
+      for index in Ride._meta.indexes:
+        cursor.execute(str(getattr(index, method)(Ride, editor)))
+
+  def analyze(self):
+    """Refresh planner statistics."""
+    with connection.cursor() as cursor:
+      cursor.execute(f'ANALYZE {Ride._meta.db_table}')
+
+  def measure(self, circle, options):
+    """Return plan and mean time of the list page and count queries."""
+    offset = timezone.now() + timedelta(minutes=10)
+    queryset = circle.ride_set.filter(
+      departure_date__gte=offset,
+      is_active=True,
+      available_seats__gte=1
+    ).order_by(*RideViewSet.DEFAULT_ORDERING)
+    queries = {
+      'page': lambda: list(queryset[:options['page_size']]),
+      'count': queryset.count,
+    }
+    plans = {
+      'page': queryset[:options['page_size']].explain(),
+      'count': queryset.order_by().values('pk').explain(),
+    }
+
+    results = {}
+    for name, query in queries.items():
+      start = time.perf_counter()
+      for _ in range(options['repeat']):
+        query()
+      elapsed = (time.perf_counter() - start) / options['repeat']
+      results[name] = {'ms': elapsed * 1000, 'plan': plans[name]}
+    return results
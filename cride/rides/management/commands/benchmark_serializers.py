@@ -0,0 +1,154 @@
+"""List serializers benchmark."""
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework.renderers import JSONRenderer
+
+# Models
+from cride.circles.models import Circle, Membership
+from cride.rides.models import Ride
+from cride.users.models import User, Profile
+
+# Serializers
+from cride.circles.serializers import MembershipModelSerializer
+from cride.rides.serializers import RideModelSerializer
+
+# Utilities
+from cride.utils.serializers import compile_serializer
+from datetime import timedelta
+import json
+import random
+import time
+
+
+class Rollback(Exception):
+  """Raised to discard the seeded data."""
+
+
+class Command(BaseCommand):
+  """Benchmark the compiled list serializers.
+
+    Seed a circle with members and rides, then render pages of
+    rides and memberships with the regular serializers and with
+    their compiled versions over `.values()` rows. Queries are
+    included in the timings, outputs are checked to render the
+    same JSON. Everything runs inside a transaction that is rolled
+    back unless --keep is given.
+  """
+
+  help = 'Compare the throughput of the regular and compiled list serializers.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the report as JSON to this path.')
+    parser.add_argument('--keep', action='store_true', help='Keep the seeded data.')
+
+  def handle(self, *args, **options):
+    report = {}
+    try:
+      with transaction.atomic():
+        circle = self.seed(options)
+        report['rides'] = self.measure(
+          RideModelSerializer,
+          circle.ride_set.select_related('offered_by__profile', 'offered_in').order_by('pk'),
+          options
+        )
+        report['memberships'] = self.measure(
+          MembershipModelSerializer,
+          circle.membership_set.select_related('user__profile', 'invited_by').order_by('pk'),
+          options
+        )
+        if not options['keep']:
+          raise Rollback
+    except Rollback:
+      pass
+
+    for name, result in report.items():
+      self.stdout.write(self.style.MIGRATE_HEADING(f'{name} ({result["rows"]} rows)'))
+      for mode in ('regular', 'compiled'):
+        self.stdout.write(f'  {mode}: {result[mode]["ms"]:.1f} ms, {result[mode]["rows_per_second"]:.0f} rows/s')
+      self.stdout.write(f'  speedup: {result["speedup"]:.1f}x')
+    if options['output']:
+      with open(options['output'], 'w') as output:
+        json.dump(report, output, indent=2)
+
+  def seed(self, options):
+    """Create a circle with members and rides, return the circle."""
+    rng = random.Random(options['seed'])
+    rows, batch_size = options['rows'], options['batch_size']
+    prefix = f'benchmark-{options["seed"]}'
+    circle = Circle.objects.create(name=prefix, slug_name=prefix)
+
+    User.objects.bulk_create([
+      User(
+        username=f'{prefix}-{i}',
+        email=f'{prefix}-{i}@cride.com',
+        first_name='Bench',
+        last_name=f'Mark {i}'
+      )
+      for i in range(rows)
+    ], batch_size=batch_size)
+    users = list(User.objects.filter(username__startswith=f'{prefix}-').order_by('pk'))
+    Profile.objects.bulk_create([
+      Profile(user=user, biography='Benchmark profile', rides_taken=rng.randint(0, 50))
+      for user in users
+    ], batch_size=batch_size)
+    profiles = dict(Profile.objects.filter(user__in=users).values_list('user_id', 'pk'))
+    Membership.objects.bulk_create([
+      Membership(
+        user=user,
+        profile_id=profiles[user.pk],
+        circle=circle,
+        invited_by=users[0] if i else None,
+        rides_taken=rng.randint(0, 50)
+      )
+      for i, user in enumerate(users)
+    ], batch_size=batch_size)
+
+    now = timezone.now()
+    rides = []
+    for i in range(rows):
+      departure = now + timedelta(minutes=rng.randint(20, 60 * 24 * 30))
+      passengers = rng.sample(users, 3)
+      rides.append(Ride(
+        offered_by=rng.choice(users),
+        offered_in=circle,
+        available_seats=rng.randint(1, 4),
+        departure_location='Benchmark origin',
+        departure_date=departure,
+        arrival_location='Benchmark destination',
+        arrival_date=departure + timedelta(minutes=rng.randint(10, 180)),
+        passengers_count=len(passengers),
+        passengers_summary=[{'id': user.pk, 'username': user.username} for user in passengers]
+      ))
+    Ride.objects.bulk_create(rides, batch_size=batch_size)
+    self.stdout.write(f'Seeded {rows} members and {rows} rides.')
+    return circle
+
+  def measure(self, serializer_class, queryset, options):
+    """Return the timings of both serializers over queryset."""
+    compiled = compile_serializer(serializer_class)
+    renders = {
+      'regular': lambda: serializer_class(queryset.all(), many=True).data,
+      'compiled': lambda: compiled.render_many(queryset.values(*compiled.paths)),
+    }
+    outputs = {mode: JSONRenderer().render(render()) for mode, render in renders.items()}
+    if outputs['regular'] != outputs['compiled']:
+      raise CommandError(f'{serializer_class.__name__} compiled output differs.')
+
+    result = {'rows': queryset.count()}
+    for mode, render in renders.items():
+      start = time.perf_counter()
+      for _ in range(options['repeat']):
+        render()
+      elapsed = (time.perf_counter() - start) / options['repeat']
+      result[mode] = {'ms': elapsed * 1000, 'rows_per_second': result['rows'] / elapsed}
+    result['speedup'] = result['compiled']['rows_per_second'] / result['regular']['rows_per_second']
+    return result
@@ -0,0 +1,398 @@
+"""Synthetic dataset generator."""
+
+# Django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+# Models
+from cride.circles.models import Circle, Membership, Invitation
+from cride.rides.models import Ride, Rating
+from cride.users.models import User, Profile
+
+# Utilities
+from bisect import bisect
+from collections import Counter
+from datetime import timedelta
+from itertools import accumulate
+import random
+import time
+
+PLACES = (
+  'Ciudad Universitaria', 'Santa Fe', 'Polanco', 'Coyoacán', 'Satélite',
+  'Chapinero', 'Usaquén', 'Reforma', 'Tlalpan', 'Condesa',
+)
+RATINGS = (1, 2, 3, 4, 5)
+RATING_WEIGHTS = (1, 1, 3, 8, 12)
+# Fields whose values must be adapted before reaching the database.
+PREPARED_FIELDS = (models.DateTimeField, models.JSONField)
+
+Passenger = Ride.passengers.through
+
+
+class Command(BaseCommand):
+  """Generate a synthetic dataset.
+
+    Create users with profiles, circles whose sizes follow a Zipf
+    distribution, memberships where every member but the founder was
+    invited by an earlier member through a used invitation, unused
+    invitations, and rides with passengers and ratings.
+
+    Rows are built as tuples with precomputed primary keys, so
+    relations never need to be read back, and written with multi-row
+    INSERTs in chunks, skipping model instances. Passenger counts and
+    summaries, seats, rating sums and member counts are computed as
+    rows are generated, ride counters, ride ratings and reputations
+    are recounted with batched UPDATEs at the end. The same prefix and
+    seed always generate the same dataset, invitation codes included.
+  """
+
+  help = 'Generate a reproducible synthetic dataset of users, circles, memberships, invitations and rides.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--circles', type=int, default=100)
+    parser.add_argument('--memberships-per-user', type=float, default=2.0)
+    parser.add_argument('--zipf', type=float, default=1.1, help='Exponent of the circle sizes distribution.')
+    parser.add_argument('--rides', type=int, default=50000)
+    parser.add_argument('--max-seats', type=int, default=4)
+    parser.add_argument('--rating-rate', type=float, default=0.7, help='Share of passengers rating finished rides.')
+    parser.add_argument('--inactive-rate', type=float, default=0.03, help='Share of deactivated memberships.')
+    parser.add_argument('--max-invitations', type=int, default=5, help='Most remaining invitations of a member.')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--prefix', default='synthetic')
+
+  def handle(self, *args, **options):
+    self.validate(options)
+    self.options = options
+    self.now = timezone.now()
+    self.prefix = f'{options["prefix"]}-{options["seed"]}'
+    # Seeded with the prefix too, so datasets of other prefixes don't share codes.
+    self.rng = random.Random(self.prefix)
+    if User.objects.filter(username__startswith=f'{self.prefix}-').exists():
+      raise CommandError(f'A {self.prefix} dataset already exists, use another --prefix or --seed.')
+
+    self.inserted = {}
+    start = time.perf_counter()
+    with transaction.atomic():
+      self.first_ids = {model: self.next_id(model) for model in (User, Profile, Circle, Membership, Ride, Rating)}
+      self.ids = dict(self.first_ids)
+      self.generate_users()
+      self.generate_circles()
+      self.generate_rides()
+      self.recount()
+      self.reset_sequences()
+
+    elapsed = time.perf_counter() - start
+    rows = sum(self.inserted.values())
+    for name, count in self.inserted.items():
+      self.stdout.write(f'  {name}: {count}')
+    self.stdout.write(self.style.SUCCESS(
+      f'Generated {rows} rows in {elapsed:.1f} s ({rows / elapsed if elapsed else 0:.0f} rows/s).'
+    ))
+
+  def validate(self, options):
+    """Raise CommandError if an option is out of range."""
+    for name in ('users', 'circles', 'max_seats', 'batch_size'):
+      if options[name] < 1:
+        raise CommandError(f'--{name.replace("_", "-")} must be at least 1.')
+    for name in ('rides', 'max_invitations', 'zipf'):
+      if options[name] < 0:
+        raise CommandError(f'--{name.replace("_", "-")} must not be negative.')
+    if options['memberships_per_user'] <= 0:
+      raise CommandError('--memberships-per-user must be positive.')
+    for name in ('rating_rate', 'inactive_rate'):
+      if not 0 <= options[name] <= 1:
+        raise CommandError(f'--{name.replace("_", "-")} must be between 0 and 1.')
+
+  def next_id(self, model):
+    """Return the first primary key free after every existing row."""
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+  def take_id(self, model):
+    """Return the next free primary key of model."""
+    pk = self.ids[model]
+    self.ids[model] += 1
+    return pk
+
+  def user_id(self, index):
+    """Return the primary key of the generated user at index."""
+    return self.first_ids[User] + index
+
+  def insert(self, model, names, rows):
+    """Insert rows, tuples of the values of the fields in names.
+
+      Every other concrete field but an automatic primary key gets
+      its default, timestamps the current time. Values are written as
+      they are except datetimes and JSON, which are adapted by their
+      field.
+    """
+    if not rows:
+      return
+    fields = [model._meta.get_field(name) for name in names]
+    defaults = [
+      field for field in model._meta.concrete_fields
+      if field not in fields and not field.primary_key
+    ]
+    template = model()
+    default_values = tuple(
+      field.get_db_prep_save(field.pre_save(template, True), connection) for field in defaults
+    )
+    prepared = [
+      (i, field) for i, field in enumerate(fields) if isinstance(field, PREPARED_FIELDS)
+    ]
+
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in fields + defaults)
+    placeholders = '(' + ', '.join(['%s'] * (len(fields) + len(defaults))) + ')'
+    batch_size = connection.ops.bulk_batch_size(fields + defaults, rows)
+    with connection.cursor() as cursor:
+      for lower in range(0, len(rows), batch_size):
+        batch = rows[lower:lower + batch_size]
+        params = []
+        for row in batch:
+          if prepared:
+            row = list(row)
+            for i, field in prepared:
+              row[i] = field.get_db_prep_save(row[i], connection)
+          params.extend(row)
+          params.extend(default_values)
+        cursor.execute(
+          f'INSERT INTO {quote(model._meta.db_table)} ({columns}) '
+          f'VALUES {", ".join([placeholders] * len(batch))}',
+          params
+        )
+
+    name = model._meta.label
+    self.inserted[name] = self.inserted.get(name, 0) + len(rows)
+
+  def generate_users(self):
+    """Create users and their profiles in chunks."""
+    count, batch_size = self.options['users'], self.options['batch_size']
+    password = make_password(None)
+    self.usernames = [f'{self.prefix}-{i}' for i in range(count)]
+    for lower in range(0, count, batch_size):
+      indexes = range(lower, min(lower + batch_size, count))
+      self.insert(User, ('id', 'username', 'email', 'first_name', 'last_name', 'password'), [
+        (
+          self.take_id(User), self.usernames[i], f'{self.usernames[i]}@cride.com',
+          'Synthetic', f'User {i}', password
+        )
+        for i in indexes
+      ])
+      self.insert(Profile, ('id', 'user', 'biography'), [
+        (self.take_id(Profile), self.user_id(i), 'Synthetic profile') for i in indexes
+      ])
+
+  def circle_sizes(self):
+    """Return the number of members of every circle, Zipf distributed."""
+    users, circles = self.options['users'], self.options['circles']
+    weights = [1 / (rank ** self.options['zipf']) for rank in range(1, circles + 1)]
+    total = sum(weights)
+    memberships = users * self.options['memberships_per_user']
+    return [max(1, min(users, round(memberships * weight / total))) for weight in weights]
+
+  def generate_circles(self):
+    """Create circles with their memberships and invitations.
+
+      Members join in a random order, the first one founds the circle
+      and every later one is invited by an earlier member, which
+      builds invitation chains. Active members are kept by circle to
+      offer and take rides.
+    """
+    rng, options = self.rng, self.options
+    pool = Invitation.objects.CODE_POOL
+    code_length = Invitation.objects.CODE_LENGTH
+    self.members = []
+    circles, memberships, invitations = [], [], []
+
+    for k, size in enumerate(self.circle_sizes()):
+      circle_id = self.take_id(Circle)
+      order = rng.sample(range(options['users']), size)
+      active = [i == 0 or rng.random() >= options['inactive_rate'] for i in range(size)]
+      inviters = [None] + [order[rng.randrange(i)] for i in range(1, size)]
+      invited = Counter(inviters[1:])
+
+      members_count = sum(active)
+      is_limited = rng.random() < 0.2
+      circles.append((
+        circle_id,
+        f'Synthetic circle {k}',
+        f'{self.prefix}-circle-{k}',
+        'Synthetic circle',
+        rng.random() < 0.1,
+        rng.random() < 0.8,
+        is_limited,
+        members_count + rng.randint(0, members_count) if is_limited else 0,
+        members_count
+      ))
+
+      for i, member in enumerate(order):
+        remaining = rng.randint(0, options['max_invitations'])
+        memberships.append((
+          self.take_id(Membership),
+          self.user_id(member),
+          self.first_ids[Profile] + member,
+          circle_id,
+          i == 0,
+          invited[member],
+          remaining,
+          self.user_id(inviters[i]) if i else None,
+          active[i]
+        ))
+        if i:
+          invitations.append((
+            ''.join(rng.choices(pool, k=code_length)),
+            self.user_id(inviters[i]),
+            self.user_id(member),
+            circle_id,
+            True,
+            self.now - timedelta(minutes=rng.randint(1, 60 * 24 * 365))
+          ))
+        if active[i]:
+          invitations.extend(
+            (''.join(rng.choices(pool, k=code_length)), self.user_id(member), None, circle_id, False, None)
+            for _ in range(rng.randint(0, remaining))
+          )
+
+      self.members.append((circle_id, [member for i, member in enumerate(order) if active[i]]))
+      if len(memberships) >= options['batch_size']:
+        self.insert_circles(circles, memberships, invitations)
+        circles, memberships, invitations = [], [], []
+
+    self.insert_circles(circles, memberships, invitations)
+
+  def insert_circles(self, circles, memberships, invitations):
+    """Insert a chunk of circles, memberships and invitations rows."""
+    self.insert(Circle, (
+      'id', 'name', 'slug_name', 'about', 'verified', 'is_public',
+      'is_limited', 'members_limit', 'members_count'
+    ), circles)
+    self.insert(Membership, (
+      'id', 'user', 'profile', 'circle', 'is_admin', 'used_invitations',
+      'remaining_invitations', 'invited_by', 'is_active'
+    ), memberships)
+    self.insert(Invitation, ('code', 'issued_by', 'used_by', 'circle', 'used', 'used_at'), invitations)
+
+  def generate_rides(self):
+    """Create rides with passengers and ratings in chunks.
+
+      Rides are offered in circles in proportion to their active
+      members, by one of them, and taken by other active members.
+      Rides whose arrival already passed are finished and rated by
+      some of their passengers.
+    """
+    rng, options = self.rng, self.options
+    cum_weights = list(accumulate(len(members) for _, members in self.members))
+    total = cum_weights[-1] if cum_weights else 0
+    if not total:
+      return
+
+    for lower in range(0, options['rides'], options['batch_size']):
+      rides, passengers, ratings = [], [], []
+      for _ in range(lower, min(lower + options['batch_size'], options['rides'])):
+        circle_id, members = self.members[bisect(cum_weights, rng.random() * total)]
+        ride_id = self.take_id(Ride)
+        driver = rng.choice(members)
+        seats = rng.randint(1, options['max_seats'])
+        candidates = rng.sample(members, min(len(members), seats + 1))
+        taken = [member for member in candidates if member != driver][:rng.randint(0, seats)]
+
+        departure = self.now + timedelta(minutes=rng.randint(-60 * 24 * 60, 60 * 24 * 30))
+        arrival = departure + timedelta(minutes=rng.randint(10, 180))
+        finished = arrival < self.now
+
+        ride_ratings = []
+        if finished:
+          for member in taken:
+            if rng.random() < options['rating_rate']:
+              ride_ratings.append((
+                self.take_id(Rating), ride_id, circle_id, self.user_id(member),
+                self.user_id(driver), rng.choices(RATINGS, RATING_WEIGHTS)[0]
+              ))
+
+        rides.append((
+          ride_id,
+          self.user_id(driver),
+          circle_id,
+          len(taken),
+          [{'id': self.user_id(member), 'username': self.usernames[member]} for member in taken],
+          seats - len(taken),
+          rng.choice(PLACES),
+          departure,
+          rng.choice(PLACES),
+          arrival,
+          sum(rating[-1] for rating in ride_ratings),
+          len(ride_ratings),
+          not finished
+        ))
+        passengers.extend((ride_id, self.user_id(member)) for member in taken)
+        ratings.extend(ride_ratings)
+
+      self.insert(Ride, (
+        'id', 'offered_by', 'offered_in', 'passengers_count', 'passengers_summary',
+        'available_seats', 'departure_location', 'departure_date', 'arrival_location',
+        'arrival_date', 'rating_sum', 'rating_count', 'is_active'
+      ), rides)
+      self.insert(Passenger, ('ride', 'user'), passengers)
+      self.insert(Rating, ('id', 'ride', 'circle', 'rating_user', 'rated_user', 'rating'), ratings)
+
+  def recount(self):
+    """Recount the stats of generated rows from the rides and ratings tables."""
+    def count(queryset, group, **filters):
+      queryset = queryset.order_by().values(group).annotate(count=Count('pk', filter=Q(**filters)))
+      return Coalesce(Subquery(queryset.values('count')), 0)
+
+    ratings = Rating.objects.filter(rated_user=OuterRef('user_id')).order_by().values('rated_user')
+    self.update(
+      Profile.objects.all(),
+      rides_offered=count(Ride.objects.filter(offered_by=OuterRef('user_id')), 'offered_by'),
+      rides_taken=count(Passenger.objects.filter(user=OuterRef('user_id')), 'user'),
+      rating_sum=Coalesce(Subquery(ratings.annotate(total=Sum('rating')).values('total')), 0),
+      rating_count=Coalesce(Subquery(ratings.annotate(count=Count('pk')).values('count')), 0)
+    )
+    Profile.objects.filter(pk__gte=self.first_ids[Profile], rating_count__gt=0).update(
+      reputation=Rating.average(F('rating_sum'), F('rating_count'))
+    )
+    Ride.objects.filter(pk__gte=self.first_ids[Ride], rating_count__gt=0).update(
+      rating=Rating.average(F('rating_sum'), F('rating_count'))
+    )
+
+    self.update(
+      Membership.objects.all(),
+      # The circle goes in the aggregate filter so rides are looked up
+      # by driver, circles have many more rides than a member offers.
+      rides_offered=count(
+        Ride.objects.filter(offered_by=OuterRef('user_id')),
+        'offered_by',
+        offered_in=OuterRef('circle_id')
+      ),
+      rides_taken=count(
+        Passenger.objects.filter(user=OuterRef('user_id'), ride__offered_in=OuterRef('circle_id')),
+        'user'
+      )
+    )
+    self.update(
+      Circle.objects.all(),
+      rides_offered=count(Ride.objects.filter(offered_in=OuterRef('pk')), 'offered_in'),
+      rides_taken=count(Passenger.objects.filter(ride__offered_in=OuterRef('pk')), 'ride__offered_in')
+    )
+
+  def update(self, queryset, **values):
+    """Update the generated rows of queryset in primary key batches."""
+    model = queryset.model
+    batch_size = self.options['batch_size']
+    for lower in range(self.first_ids[model], self.ids[model], batch_size):
+      queryset.filter(pk__gte=lower, pk__lt=lower + batch_size).update(**values)
+
+  def reset_sequences(self):
+    """Move primary key sequences past the precomputed keys."""
+    generated = [User, Profile, Circle, Membership, Ride, Rating]
+    with connection.cursor() as cursor:
+      for sql in connection.ops.sequence_reset_sql(no_style(), generated):
+        cursor.execute(sql)
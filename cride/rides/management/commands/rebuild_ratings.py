@@ -0,0 +1,90 @@
+"""Rebuild rating aggregates command."""
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+# Models
+from cride.rides.models import Ride, Rating, ArchivedRide, ArchivedRating
+from cride.users.models import Profile
+
+# Utilities
+import time
+
+
+class Command(BaseCommand):
+  """Rebuild rating aggregates.
+
+    Recompute the running rating sum and count of every ride,
+    archived ride and profile from the Rating and ArchivedRating
+    tables, along with the derived ride rating and profile
+    reputation. Rows are updated in primary key
+    batches with one UPDATE ... SELECT per aggregate.
+  """
+
+  help = 'Rebuild ride ratings and profile reputations from the ratings tables.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--batch-size', type=int, default=10000)
+
+  def handle(self, *args, **options):
+    batch_size = options['batch_size']
+    start = time.perf_counter()
+
+    rides = self.rebuild(
+      Ride.objects.all(),
+      [Rating.objects.filter(ride=OuterRef('pk')).values('ride')],
+      average_field='rating',
+      default=None,
+      batch_size=batch_size
+    )
+    rides += self.rebuild(
+      ArchivedRide.objects.all(),
+      [ArchivedRating.objects.filter(ride=OuterRef('pk')).values('ride')],
+      average_field='rating',
+      default=None,
+      batch_size=batch_size
+    )
+    profiles = self.rebuild(
+      Profile.objects.all(),
+      [
+        Rating.objects.filter(rated_user=OuterRef('user')).values('rated_user'),
+        ArchivedRating.objects.filter(rated_user=OuterRef('user')).values('rated_user'),
+      ],
+      average_field='reputation',
+      default=Profile._meta.get_field('reputation').default,
+      batch_size=batch_size
+    )
+
+    elapsed = time.perf_counter() - start
+    self.stdout.write(self.style.SUCCESS(
+      f'Rebuilt {rides} rides and {profiles} profiles in {elapsed:.2f}s.'
+    ))
+
+  def rebuild(self, queryset, sources, average_field, default, batch_size):
+    """Rebuild aggregates of queryset in batches, return rows updated.
+
+      `sources` are the grouped rating querysets whose totals and
+      counts are added up.
+    """
+    totals = counts = Value(0)
+    for ratings in sources:
+      ratings = ratings.order_by().annotate(total=Sum('rating'), count=Count('pk'))
+      totals = totals + Coalesce(Subquery(ratings.values('total')), 0)
+      counts = counts + Coalesce(Subquery(ratings.values('count')), 0)
+    last_pk = queryset.aggregate(last=Max('pk'))['last'] or 0
+    updated = 0
+    for lower in range(0, last_pk, batch_size):
+      with transaction.atomic():
+        batch = queryset.filter(pk__gt=lower, pk__lte=lower + batch_size)
+        updated += batch.update(
+          rating_sum=totals,
+          rating_count=counts
+        )
+        batch.filter(rating_count__gt=0).update(**{
+          average_field: Rating.average(F('rating_sum'), F('rating_count'))
+        })
+        batch.filter(rating_count=0).update(**{average_field: default})
+    return updated
@@ -0,0 +1,17 @@
+# Generated by Django 3.1.5 on 2026-10-18 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rides', '0003_rating'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ride',
+            index=models.Index(condition=models.Q(('available_seats__gte', 1), ('is_active', True)), fields=['offered_in', 'departure_date', 'arrival_date', 'available_seats'], name='ride_upcoming_idx'),
+        ),
+    ]
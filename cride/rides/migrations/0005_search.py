@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+INDEXES = """
+CREATE INDEX ride_search_vector_idx ON rides_ride USING gin (
+  to_tsvector('cride_search'::regconfig, COALESCE(departure_location, '') || ' ' || COALESCE(arrival_location, ''))
+);
+CREATE INDEX ride_departure_location_trgm_idx ON rides_ride USING gin (departure_location gin_trgm_ops);
+CREATE INDEX ride_arrival_location_trgm_idx ON rides_ride USING gin (arrival_location gin_trgm_ops);
+"""
+
+DROP = """
+DROP INDEX IF EXISTS ride_search_vector_idx;
+DROP INDEX IF EXISTS ride_departure_location_trgm_idx;
+DROP INDEX IF EXISTS ride_arrival_location_trgm_idx;
+"""
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(INDEXES)
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(DROP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('circles', '0003_search'),
+        ('rides', '0004_ride_upcoming_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
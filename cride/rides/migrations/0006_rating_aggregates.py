@@ -0,0 +1,46 @@
+# Generated by Django 3.1.5 on 2026-10-18 19:26
+
+from django.db import migrations, models
+from django.db.models import Count, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, Round
+
+
+def backfill(apps, schema_editor):
+    """Compute the running aggregates of existing rides and profiles."""
+    Ride = apps.get_model('rides', 'Ride')
+    Rating = apps.get_model('rides', 'Rating')
+    Profile = apps.get_model('users', 'Profile')
+    average = Round(Cast(F('rating_sum'), FloatField()) * 10 / F('rating_count')) / 10
+
+    for queryset, ratings, field in (
+        (Ride.objects.all(), Rating.objects.filter(ride=OuterRef('pk')).values('ride'), 'rating'),
+        (Profile.objects.all(), Rating.objects.filter(rated_user=OuterRef('user')).values('rated_user'), 'reputation'),
+    ):
+        ratings = ratings.order_by().annotate(total=Sum('rating'), count=Count('pk'))
+        queryset.update(
+            rating_sum=Coalesce(Subquery(ratings.values('total')), 0),
+            rating_count=Coalesce(Subquery(ratings.values('count')), 0),
+        )
+        queryset.filter(rating_count__gt=0).update(**{field: average})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rides', '0005_search'),
+        ('users', '0002_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ride',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ride',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.1.5 on 2026-10-18 19:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rides', '0006_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ride',
+            index=models.Index(fields=['is_active', 'arrival_date'], name='ride_active_arrival_idx'),
+        ),
+    ]
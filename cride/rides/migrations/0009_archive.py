@@ -0,0 +1,78 @@
+# Generated by Django 3.1.5 on 2026-10-18 19:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('circles', '0003_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('rides', '0008_ride_export'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPassenger',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedRide',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(verbose_name='created at')),
+                ('modified', models.DateTimeField(verbose_name='modified at')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('available_seats', models.PositiveSmallIntegerField(default=1)),
+                ('comments', models.TextField(blank=True)),
+                ('departure_location', models.CharField(max_length=255)),
+                ('departure_date', models.DateTimeField()),
+                ('arrival_location', models.CharField(max_length=255)),
+                ('arrival_date', models.DateTimeField()),
+                ('rating', models.FloatField(null=True)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('is_active', models.BooleanField(default=False, verbose_name='active status')),
+                ('offered_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('offered_in', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='circles.circle')),
+                ('passengers', models.ManyToManyField(related_name='archived_rides', through='rides.ArchivedPassenger', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created', '-modified'],
+                'get_latest_by': 'created',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedRating',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now, verbose_name='created at')),
+                ('modified', models.DateTimeField(default=django.utils.timezone.now, verbose_name='modified at')),
+                ('comments', models.TextField(blank=True)),
+                ('rating', models.IntegerField(default=1)),
+                ('circle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='circles.circle')),
+                ('rated_user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('rating_user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('ride', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ratings', to='rides.archivedride')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='archivedpassenger',
+            name='ride',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='rides.archivedride'),
+        ),
+        migrations.AddField(
+            model_name='archivedpassenger',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='archivedpassenger',
+            unique_together={('ride', 'user')},
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 3.1.5 on 2026-10-18 19:39
+
+from django.db import migrations, models
+
+# Utilities
+from collections import defaultdict
+
+
+def backfill(apps, schema_editor):
+    """Compute the passenger count and summary of existing rides."""
+    batch_size = 2000
+    for ride_label, passenger_label in (('Ride', 'Ride_passengers'), ('ArchivedRide', 'ArchivedPassenger')):
+        Ride = apps.get_model('rides', ride_label)
+        Passenger = apps.get_model('rides', passenger_label)
+        last_pk = 0
+        while True:
+            rides = list(Ride.objects.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+            if not rides:
+                break
+            last_pk = rides[-1].pk
+
+            summaries = defaultdict(list)
+            passengers = Passenger.objects.filter(ride_id__in=[ride.pk for ride in rides]).order_by('pk')
+            for ride_id, user_id, username in passengers.values_list('ride_id', 'user_id', 'user__username'):
+                summaries[ride_id].append({'id': user_id, 'username': username})
+            for ride in rides:
+                ride.passengers_summary = summaries[ride.pk]
+                ride.passengers_count = len(ride.passengers_summary)
+            Ride.objects.bulk_update(rides, ['passengers_count', 'passengers_summary'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rides', '0009_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedride',
+            name='passengers_count',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='archivedride',
+            name='passengers_summary',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='ride',
+            name='passengers_count',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ride',
+            name='passengers_summary',
+            field=models.JSONField(default=list, help_text='Id and username of every passenger, kept in sync with passengers.'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
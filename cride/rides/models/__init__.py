@@ -1,2 +1,4 @@
 from .rides import *
-from .rating import *
\ No newline at end of file
+from .rating import *
+from .exports import *
+from .archive import *
\ No newline at end of file
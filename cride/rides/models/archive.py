@@ -0,0 +1,108 @@
+"""Archived rides models."""
+
+# Django
+from django.db import models
+from django.utils import timezone
+
+class ArchivedRide(models.Model):
+  """Archived ride.
+
+    Finished rides older than RIDES_ARCHIVE_AFTER are moved here,
+    along with their passengers and ratings, to keep the rides
+    table and its indexes small. Rows keep the id, timestamps and
+    field names of the ride they come from so they can be served
+    and rated as regular rides.
+  """
+
+  id = models.IntegerField(primary_key=True)
+  created = models.DateTimeField('created at')
+  modified = models.DateTimeField('modified at')
+  archived_at = models.DateTimeField(default=timezone.now)
+
+  offered_by = models.ForeignKey('users.User', on_delete=models.SET_NULL, null=True)
+  offered_in = models.ForeignKey('circles.Circle', on_delete=models.SET_NULL, null=True)
+
+  passengers = models.ManyToManyField(
+    'users.User',
+    through='rides.ArchivedPassenger',
+    related_name='archived_rides'
+  )
+  passengers_count = models.PositiveSmallIntegerField(default=0)
+  passengers_summary = models.JSONField(default=list)
+
+  available_seats = models.PositiveSmallIntegerField(default=1)
+  comments = models.TextField(blank=True)
+
+  departure_location = models.CharField(max_length=255)
+  departure_date = models.DateTimeField()
+  arrival_location = models.CharField(max_length=255)
+  arrival_date = models.DateTimeField()
+
+  rating = models.FloatField(null=True)
+  rating_sum = models.PositiveIntegerField(default=0)
+  rating_count = models.PositiveIntegerField(default=0)
+
+  is_active = models.BooleanField('active status', default=False)
+
+  class Meta:
+    """Meta option."""
+
+    get_latest_by = 'created'
+    ordering = ['-created', '-modified']
+
+  def __str__(self):
+    """Return ride details."""
+    return f'{self.departure_location} to {self.arrival_location} (archived)'
+
+
+class ArchivedPassenger(models.Model):
+  """Passenger of an archived ride."""
+
+  ride = models.ForeignKey('rides.ArchivedRide', on_delete=models.CASCADE)
+  user = models.ForeignKey('users.User', on_delete=models.CASCADE)
+
+  class Meta:
+    """Meta option."""
+
+    unique_together = ('ride', 'user')
+
+
+class ArchivedRating(models.Model):
+  """Rating of an archived ride.
+
+    Ratings keep their timestamps but not their id, ratings emitted
+    after the ride was archived are stored here too.
+  """
+
+  created = models.DateTimeField('created at', default=timezone.now)
+  modified = models.DateTimeField('modified at', default=timezone.now)
+
+  ride = models.ForeignKey(
+    'rides.ArchivedRide',
+    related_name='ratings',
+    on_delete=models.CASCADE
+  )
+
+  circle = models.ForeignKey('circles.Circle', on_delete=models.CASCADE)
+
+  rating_user = models.ForeignKey(
+    'users.User',
+    related_name='+',
+    on_delete=models.SET_NULL,
+    null=True
+  )
+
+  rated_user = models.ForeignKey(
+    'users.User',
+    related_name='+',
+    on_delete=models.SET_NULL,
+    null=True
+  )
+
+  comments = models.TextField(blank=True)
+
+  rating = models.IntegerField(default=1)
+
+  def __str__(self):
+    """Return summary."""
+    return f'#{self.ride_id} rated {self.rating} (archived)'
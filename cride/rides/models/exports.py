@@ -0,0 +1,60 @@
+"""Ride exports model."""
+
+# Django
+from django.db import models
+
+# Utilities
+from cride.utils.models import CRideModel
+
+class RideExport(CRideModel):
+  """Ride history export.
+
+    Exports hold the full ride, passenger and rating history of a
+    circle. They are written in the background by the
+    `export_circle_rides` task, which keeps `exported_rides` up to
+    date so clients can poll the progress.
+  """
+
+  CSV = 'csv'
+  JSONL = 'jsonl'
+  FORMATS = (
+    (CSV, 'CSV'),
+    (JSONL, 'Gzipped JSON Lines'),
+  )
+
+  PENDING = 'pending'
+  RUNNING = 'running'
+  DONE = 'done'
+  FAILED = 'failed'
+  STATUSES = (
+    (PENDING, 'Pending'),
+    (RUNNING, 'Running'),
+    (DONE, 'Done'),
+    (FAILED, 'Failed'),
+  )
+
+  circle = models.ForeignKey('circles.Circle', on_delete=models.CASCADE)
+  requested_by = models.ForeignKey('users.User', on_delete=models.SET_NULL, null=True)
+
+  format = models.CharField(max_length=5, choices=FORMATS, default=CSV)
+  status = models.CharField(max_length=7, choices=STATUSES, default=PENDING)
+
+  total_rides = models.PositiveIntegerField(default=0)
+  exported_rides = models.PositiveIntegerField(default=0)
+
+  file = models.FileField(upload_to='exports/rides/', blank=True)
+  error = models.TextField(blank=True)
+  finished_at = models.DateTimeField(null=True, blank=True)
+
+  @property
+  def progress(self):
+    """Return the exported fraction of the rides."""
+    if self.status == self.DONE:
+      return 1.0
+    if not self.total_rides:
+      return 0.0
+    return round(self.exported_rides / self.total_rides, 4)
+
+  def __str__(self):
+    """Return circle and status."""
+    return f'#{self.circle_id} {self.format} export: {self.status}'
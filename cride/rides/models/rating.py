@@ -2,6 +2,8 @@
 
 # Django
 from django.db import models
+from django.db.models import FloatField
+from django.db.models.functions import Cast, Round
 
 # Utilities
 from cride.utils.models import CRideModel
@@ -42,6 +44,15 @@ class Rating(CRideModel):
 
   rating = models.IntegerField(default=1)
 
+  @staticmethod
+  def average(total, count):
+    """Return an expression for total / count rounded to one decimal.
+
+      Used to derive `Ride.rating` and `Profile.reputation` from their
+      running rating sum and count.
+    """
+    return Round(Cast(total, FloatField()) * 10 / count) / 10
+
   def __str__(self):
     """Return summary."""
     rating_user = self.rating_user.username
@@ -13,6 +13,11 @@ class Ride(CRideModel):
   offered_in = models.ForeignKey('circles.Circle', on_delete=models.SET_NULL, null=True)
 
   passengers = models.ManyToManyField('users.User', related_name='passengers')
+  passengers_count = models.PositiveSmallIntegerField(default=0)
+  passengers_summary = models.JSONField(
+    default=list,
+    help_text='Id and username of every passenger, kept in sync with passengers.'
+  )
 
   available_seats = models.PositiveSmallIntegerField(default=1)
   comments = models.TextField(blank=True)
@@ -23,6 +28,8 @@ class Ride(CRideModel):
   arrival_date = models.DateTimeField()
 
   rating = models.FloatField(null=True)
+  rating_sum = models.PositiveIntegerField(default=0)
+  rating_count = models.PositiveIntegerField(default=0)
 
   is_active = models.BooleanField(
     'active status',
@@ -35,4 +42,18 @@ class Ride(CRideModel):
     day = self.departure_date.strftime('%a %d, %b')
     i_time = self.departure_date.strftime('%I:%M %p')
     f_time = self.departure_date.strftime('%I:%M %p')
-    return f'{self.departure_location} to {self.arrival_location} | {day} {i_time} - {f_time}'
\ No newline at end of file
+    return f'{self.departure_location} to {self.arrival_location} | {day} {i_time} - {f_time}'
+
+  class Meta(CRideModel.Meta):
+    """Meta class."""
+    indexes = [
+      # Upcoming rides of a circle: active, with free seats and
+      # ordered like RideViewSet.DEFAULT_ORDERING.
+      models.Index(
+        fields=['offered_in', 'departure_date', 'arrival_date', 'available_seats'],
+        condition=models.Q(is_active=True, available_seats__gte=1),
+        name='ride_upcoming_idx'
+      ),
+      # Finished rides sweeper: active rides by arrival date.
+      models.Index(fields=['is_active', 'arrival_date'], name='ride_active_arrival_idx'),
+    ]
\ No newline at end of file
@@ -1,2 +1,3 @@
 from .rides import *
-from .ratings import *
\ No newline at end of file
+from .ratings import *
+from .exports import *
\ No newline at end of file
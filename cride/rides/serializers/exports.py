@@ -0,0 +1,46 @@
+"""Ride exports serializers."""
+
+# Django REST Framework
+from rest_framework import serializers
+
+# Models
+from cride.rides.models import RideExport
+
+class RideExportModelSerializer(serializers.ModelSerializer):
+  """Ride export model serializer."""
+
+  progress = serializers.FloatField(read_only=True)
+  download_url = serializers.SerializerMethodField()
+
+  class Meta:
+    """Meta class."""
+
+    model = RideExport
+    fields = (
+      'id', 'format', 'status',
+      'total_rides', 'exported_rides', 'progress',
+      'download_url', 'error',
+      'created', 'finished_at'
+    )
+    read_only_fields = (
+      'id', 'status',
+      'total_rides', 'exported_rides',
+      'error',
+      'created', 'finished_at'
+    )
+
+  def get_download_url(self, obj):
+    """Return the export file link once it's done."""
+    if obj.status != RideExport.DONE or not obj.file:
+      return None
+    request = self.context.get('request')
+    url = obj.file.url
+    return request.build_absolute_uri(url) if request else url
+
+  def create(self, data):
+    """Create the export for the circle of the context."""
+    return RideExport.objects.create(
+      circle=self.context['circle'],
+      requested_by=self.context['request'].user,
+      **data
+    )
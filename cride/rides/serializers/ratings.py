@@ -1,16 +1,23 @@
 """Ratings serializers."""
 
 # Django
-from django.db.models import Avg
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
 
 # Django REST Framework
 from rest_framework import serializers
 
 # Models
-from cride.rides.models import Rating
+from cride.rides.models import Rating, ArchivedRide, ArchivedRating
+from cride.users.models import Profile
 
 class CreateRideRatingSerializer(serializers.ModelSerializer):
-  """Create ride rating serializer."""
+  """Create ride rating serializer.
+
+    Archived rides are rated in place, their ratings go to the
+    archive ratings table.
+  """
   rating = serializers.IntegerField(min_value=1, max_value=5)
   comments = serializers.CharField(required=False)
 
@@ -24,10 +31,11 @@ class CreateRideRatingSerializer(serializers.ModelSerializer):
     """Verify rating hasn't been emitted before."""
     user = self.context['request'].user
     ride = self.context['ride']
-    if not ride.passengers.filter(pk=user.pk).exists():
+    if not any(p['id'] == user.pk for p in ride.passengers_summary):
       raise serializers.ValidationError('User is not a passenger')
 
-    q = Rating.objects.filter(
+    rating_model = ArchivedRating if isinstance(ride, ArchivedRide) else Rating
+    q = rating_model.objects.filter(
       circle=self.context['circle'],
       ride=ride,
       rating_user=user,
@@ -37,34 +45,39 @@ class CreateRideRatingSerializer(serializers.ModelSerializer):
     return data
 
   def create(self, data):
-    """Create rating."""
-    offered_by = self.context['ride'].offered_by
+    """Create rating.
 
-    Rating.objects.create(
-      circle=self.context['circle'],
-      ride=self.context['ride'],
-      rating_user=self.context['request'].user,
-      rated_user=offered_by,
-      **data
-    )
+      Ride rating and offerer reputation are derived from running
+      sums and counts updated in place, so the cost doesn't grow
+      with the number of ratings received.
+    """
+    ride = self.context['ride']
+    offered_by = ride.offered_by
+    value = data['rating']
+    now = timezone.now()
+    rating_model = ArchivedRating if isinstance(ride, ArchivedRide) else Rating
 
-    ride_avg = round(
-      Rating.objects.filter(
+    with transaction.atomic():
+      rating_model.objects.create(
         circle=self.context['circle'],
-        ride=self.context['ride']
-      ).aggregate(Avg('rating'))['rating__avg'],
-      1
-    )
-    self.context['ride'].rating = ride_avg
-    self.context['ride'].save()
+        ride=ride,
+        rating_user=self.context['request'].user,
+        rated_user=offered_by,
+        **data
+      )
 
-    user_avg = round(
-      Rating.objects.filter(
-        rated_user=offered_by
-      ).aggregate(Avg('rating'))['rating__avg'],
-      1
-    )
-    offered_by.profile.reputation = user_avg
-    offered_by.profile.save()
+      type(ride).objects.filter(pk=ride.pk).update(
+        rating_sum=F('rating_sum') + value,
+        rating_count=F('rating_count') + 1,
+        rating=Rating.average(F('rating_sum') + value, F('rating_count') + 1),
+        modified=now
+      )
+      Profile.objects.filter(user=offered_by).update(
+        rating_sum=F('rating_sum') + value,
+        rating_count=F('rating_count') + 1,
+        reputation=Rating.average(F('rating_sum') + value, F('rating_count') + 1),
+        modified=now
+      )
 
-    return self.context['ride']
\ No newline at end of file
+    ride.refresh_from_db(fields=('rating', 'rating_sum', 'rating_count', 'modified'))
+    return ride
\ No newline at end of file
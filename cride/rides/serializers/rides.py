@@ -1,12 +1,23 @@
 """Rides serializers."""
 
+# Django
+from django.db import transaction, IntegrityError
+from django.db.models import F
+
 # Django REST Framework
 from rest_framework import serializers
 
 # Models
 from cride.rides.models import Ride
-from cride.circles.models import Membership
-from cride.users.models import User
+from cride.rides.signals import sync_passengers
+from cride.circles.models import Circle, Membership
+from cride.users.models import User, Profile
+
+# Utilities
+from cride.circles.resolvers import get_resolver
+from cride.rides import cache
+from cride.utils import counters
+from cride.utils.serializers import DynamicFieldsMixin
 
 # Utilities
 from datetime import timedelta
@@ -25,7 +36,11 @@ class CreateRideSerializer(serializers.ModelSerializer):
     """Meta class."""
 
     model = Ride
-    exclude = ('offered_in', 'passengers', 'rating', 'is_active')
+    exclude = (
+      'offered_in', 'passengers', 'is_active',
+      'passengers_count', 'passengers_summary',
+      'rating', 'rating_sum', 'rating_count'
+    )
 
   def validate_departure_date(self, data):
     """Verify date is not in the past."""
@@ -46,14 +61,9 @@ class CreateRideSerializer(serializers.ModelSerializer):
     if self.context['request'].user != data['offered_by']:
       raise serializers.ValidationError('Rides offered on behalf of others are not allowed.')
 
-    user = data['offered_by']
     circle = self.context['circle']
-    try:
-      membership = Membership.objects.get(
-        user=user, 
-        circle=circle, 
-        is_active=True)
-    except Membership.DoesNotExist:
+    membership = get_resolver(self.context['request']).get_membership(circle)
+    if membership is None:
       raise serializers.ValidationError('User is not an active member of the circle.')
 
     if data['arrival_date'] <= data['departure_date']:
@@ -67,36 +77,42 @@ class CreateRideSerializer(serializers.ModelSerializer):
     circle = self.context['circle']
     ride = Ride.objects.create(**data, offered_in=circle)
 
-    # Circle
-    circle.rides_offered += 1
-    circle.save()
-
-    # Membership
+    # Stats
     membership = self.context['membership']
-    membership.rides_offered += 1
-    circle.save()
-
-    # Profile
-    profile = data['offered_by'].profile
-    profile.rides_offered += 1
-    profile.save()
+    counters.incr(Circle, circle.pk, rides_offered=1)
+    counters.incr(Membership, membership.pk, rides_offered=1)
+    counters.incr(Profile, membership.profile_id, rides_offered=1)
 
     return ride
 
-class RideModelSerializer(serializers.ModelSerializer):
-  """Ride model serializer"""
+class RideModelSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+  """Ride model serializer
+
+    Passengers are rendered from the ride's summary, full passengers
+    with their profiles are requested with `?expand=passengers`.
+  """
 
   offered_by = UserModelSerializer(read_only=True)
   offered_in = serializers.StringRelatedField()
 
-  passengers = UserModelSerializer(read_only=True, many=True)
+  passengers = serializers.JSONField(source='passengers_summary', read_only=True)
+
+  expandable_fields = {
+    'passengers': lambda: UserModelSerializer(read_only=True, many=True),
+  }
+  string_sources = {'offered_in': 'offered_in__name'}
 
   class Meta:
     """Meta class."""
 
     model = Ride
-    fields = '__all__'
-    read_only_fields = ('offered_in', 'offered_by', 'rating')
+    list_serializer_class = counters.PendingCountersListSerializer
+    exclude = ('passengers_summary',)
+    read_only_fields = (
+      'offered_in', 'offered_by',
+      'passengers_count',
+      'rating', 'rating_sum', 'rating_count'
+    )
 
   def update(self, instance, data):
     """Allow updates only before departure date."""
@@ -116,19 +132,28 @@ class JoinSerializer(serializers.ModelSerializer):
     fields = ('passenger', )
 
   def validate_passenger(self, data):
-    """Verify passenger exists and is a circle member."""
-    try:
-      user = User.objects.get(username=data)
-    except User.DoesNotExist:
-      raise serializers.ValidationError('Invalid passenger.')
+    """Verify passenger exists and is a circle member.
 
+      The requesting user and their membership come from the
+      request's resolver, other passengers are looked up.
+    """
     circle = self.context['circle']
-    try:
-      membership = Membership.objects.get(
-        user=user, 
-        circle=circle, 
-        is_active=True)
-    except Membership.DoesNotExist:
+    request = self.context.get('request')
+    if request is not None and data == request.user.username:
+      user = request.user
+      membership = get_resolver(request).get_membership(circle)
+    else:
+      try:
+        user = User.objects.get(username=data)
+      except User.DoesNotExist:
+        raise serializers.ValidationError('Invalid passenger.')
+      membership = Membership.objects.filter(
+        user=user,
+        circle=circle,
+        is_active=True
+      ).first()
+
+    if membership is None:
       raise serializers.ValidationError('User is not an active member of the circle.')
 
     self.context['user'] = user
@@ -144,36 +169,52 @@ class JoinSerializer(serializers.ModelSerializer):
     if ride.available_seats < 1:
       raise serializers.ValidationError('Ride is already full!')
     
-    if Ride.objects.filter(passengers__username=data['passenger']).exists():
+    user = self.context['user']
+    if any(p['id'] == user.pk for p in ride.passengers_summary):
       raise serializers.ValidationError('Passenger is already in this trip.')
 
     return data
 
 
   def update(self, instance, data):
-    """Add passenger to ride, and update stats."""
+    """Add passenger to ride, and update stats.
+
+      The passenger row is inserted first, so a concurrent join of
+      the same user hits the (ride, user) unique constraint instead
+      of validating against the same stale summary. The seat is then
+      taken with a conditional UPDATE so concurrent joins can't
+      oversell the ride, and the passengers summary is synced while
+      the ride's row is still locked. Stats go through the
+      write-behind counters so the hot circle row isn't locked by
+      every join.
+    """
     ride = self.context['ride']
     circle = self.context['circle']
     user = self.context['user']
+    member = self.context['member']
 
-    ride.passengers.add(user)
-    instance.available_seats -= 1
-    instance.save()
-
-    # Profile
-    profile = user.profile
-    profile.rides_taken += 1
-    profile.save()
+    with transaction.atomic():
+      try:
+        with transaction.atomic():
+          Ride.passengers.through.objects.create(ride_id=ride.pk, user_id=user.pk)
+      except IntegrityError:
+        raise serializers.ValidationError('Passenger is already in this trip.')
 
-    # Membership
-    member = self.context['member']
-    member.rides_taken += 1
-    member.save()
+      taken = Ride.objects.filter(pk=ride.pk, available_seats__gte=1).update(
+        available_seats=F('available_seats') - 1,
+        modified=timezone.now()
+      )
+      if not taken:
+        raise serializers.ValidationError('Ride is already full!')
+      sync_passengers([ride.pk])
+      cache.invalidate(ride.offered_in_id)
 
-    # Circle
-    circle.rides_taken += 1
-    circle.save()
+      # Stats
+      counters.incr(Circle, circle.pk, rides_taken=1)
+      counters.incr(Membership, member.pk, rides_taken=1)
+      counters.incr(Profile, member.profile_id, rides_taken=1)
 
+    ride.refresh_from_db(fields=('available_seats', 'passengers_count', 'passengers_summary', 'modified'))
     return ride
 
 class EndRideSerializer(serializers.ModelSerializer):
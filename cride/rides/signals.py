@@ -0,0 +1,92 @@
+"""Rides signals."""
+
+# Django
+from django.db.models.signals import m2m_changed, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+# Models
+from cride.rides.models import Ride, Rating
+from cride.users.models import User
+
+# Cache
+from cride.rides import cache
+
+# Utilities
+from collections import defaultdict
+
+
+def sync_passengers(ride_ids):
+  """Rebuild the passenger count and summary of rides, return the summaries."""
+  summaries = defaultdict(list)
+  through = Ride.passengers.through.objects.filter(ride_id__in=ride_ids).order_by('pk')
+  for ride_id, user_id, username in through.values_list('ride_id', 'user_id', 'user__username'):
+    summaries[ride_id].append({'id': user_id, 'username': username})
+
+  now = timezone.now()
+  for ride_id in ride_ids:
+    Ride.objects.filter(pk=ride_id).update(
+      passengers_count=len(summaries[ride_id]),
+      passengers_summary=summaries[ride_id],
+      modified=now
+    )
+  return summaries
+
+
+@receiver(post_save, sender=Ride)
+def ride_saved(sender, instance, **kwargs):
+  """Invalidate the circle's ride list on creation, update or finish."""
+  cache.invalidate(instance.offered_in_id)
+
+
+@receiver(m2m_changed, sender=Ride.passengers.through)
+def ride_passengers_changed(sender, instance, action, reverse, pk_set, **kwargs):
+  """Sync the passengers summary and invalidate the circle's ride list."""
+  if reverse and action == 'pre_clear':
+    instance._cleared_ride_ids = list(instance.passengers.values_list('pk', flat=True))
+  if action not in ('post_add', 'post_remove', 'post_clear'):
+    return
+
+  if not reverse:
+    summary = sync_passengers([instance.pk])[instance.pk]
+    instance.passengers_summary = summary
+    instance.passengers_count = len(summary)
+    cache.invalidate(instance.offered_in_id)
+    return
+
+  ride_ids = list(pk_set) if pk_set is not None else instance.__dict__.pop('_cleared_ride_ids', [])
+  sync_passengers(ride_ids)
+  rides = Ride.objects.filter(pk__in=ride_ids)
+  for circle_id in rides.values_list('offered_in_id', flat=True).distinct():
+    cache.invalidate(circle_id)
+
+
+@receiver(pre_save, sender=User)
+def user_saving(sender, instance, raw, **kwargs):
+  """Remember the username a user's rides summarize before renames."""
+  if instance.pk is not None and not raw:
+    instance._summary_username = User.objects.filter(
+      pk=instance.pk
+    ).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+  """Resync the passengers summary of the rides of a renamed user."""
+  username = instance.__dict__.pop('_summary_username', None)
+  if username is None or username == instance.username:
+    return
+
+  ride_ids = list(Ride.passengers.through.objects.filter(
+    user_id=instance.pk
+  ).values_list('ride_id', flat=True))
+  sync_passengers(ride_ids)
+  rides = Ride.objects.filter(pk__in=ride_ids)
+  for circle_id in rides.values_list('offered_in_id', flat=True).distinct():
+    cache.invalidate(circle_id)
+
+
+@receiver(post_save, sender=Rating)
+def ride_rated(sender, instance, created, **kwargs):
+  """Invalidate the circle's ride list when a ride is rated."""
+  cache.invalidate(instance.circle_id)
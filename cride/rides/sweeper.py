@@ -0,0 +1,70 @@
+"""Finished rides sweeper.
+
+Rides past their arrival date are deactivated in bounded batches,
+walking the (is_active, arrival_date) index. Deactivated rides leave
+the index range, so every run starts from the oldest active ride
+left, including rides edited to arrive earlier. A cache lock keeps
+runs from overlapping.
+"""
+
+# Django
+from django.core.cache import cache
+from django.utils import timezone
+
+# Models
+from cride.rides.models import Ride
+
+# Utilities
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = 'rides:sweeper:lock'
+LOCK_TIMEOUT = 5 * 60
+
+
+def sweep_finished_rides(batch_size=1000, max_batches=50):
+  """Deactivate rides past their arrival date.
+
+    Return the run metrics, or None if another run holds the lock.
+  """
+  token = uuid.uuid4().hex
+  if not cache.add(LOCK_KEY, token, LOCK_TIMEOUT):
+    logger.info('Finished rides sweeper already running, skipping.')
+    return None
+
+  start = time.perf_counter()
+  try:
+    now = timezone.now()
+    rides = Ride.objects.filter(is_active=True, arrival_date__lte=now)
+
+    touched = batches = 0
+    drained = False
+    while batches < max_batches:
+      batch = list(rides.order_by('arrival_date', 'pk').values_list('pk', flat=True)[:batch_size])
+      if not batch:
+        drained = True
+        break
+      touched += Ride.objects.filter(pk__in=batch, is_active=True).update(
+        is_active=False,
+        modified=now
+      )
+      batches += 1
+      if len(batch) < batch_size:
+        drained = True
+        break
+  finally:
+    # Past LOCK_TIMEOUT the lock may belong to another run.
+    if cache.get(LOCK_KEY) == token:
+      cache.delete(LOCK_KEY)
+
+  metrics = {
+    'touched': touched,
+    'batches': batches,
+    'drained': drained,
+    'seconds': round(time.perf_counter() - start, 3),
+  }
+  logger.info('Finished rides sweeper deactivated %(touched)d rides in %(batches)d batches.', metrics, extra=metrics)
+  return metrics
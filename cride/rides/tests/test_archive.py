@@ -0,0 +1,135 @@
+"""Rides archive tests."""
+
+# Django
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+# Models
+from cride.circles.models import Circle
+from cride.rides.models import Ride, Rating, ArchivedRide, ArchivedRating
+
+# Archiver
+from cride.rides import archive
+from cride.rides.archive import archive_finished_rides
+
+# Utilities
+from cride.rides.tests.test_rides import create_member
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+
+class RidesArchiveTestCase(APITestCase):
+  """Rides archive test case."""
+
+  def setUp(self):
+    """Test case setup."""
+    cache.clear()
+    self.circle = Circle.objects.create(
+      name='Facultad de Ciencias',
+      slug_name='fciencias',
+      about='Grupo oficial de la Facultad de Ciencias de la UNAM',
+    )
+    self.driver = create_member(self.circle, 'driver')
+    self.passengers = [create_member(self.circle, f'passenger{i}') for i in range(2)]
+
+    now = timezone.now()
+    self.rides = []
+    for days, is_active in ((200, False), (100, False), (120, True), (10, False)):
+      ride = Ride.objects.create(
+        offered_by=self.driver,
+        offered_in=self.circle,
+        departure_location='Ciudad Universitaria',
+        departure_date=now - timedelta(days=days),
+        arrival_location='Polanco',
+        arrival_date=now - timedelta(days=days) + timedelta(hours=1),
+        is_active=is_active
+      )
+      ride.passengers.add(*self.passengers)
+      self.rides.append(ride)
+
+    old = self.rides[0]
+    Rating.objects.create(
+      ride=old,
+      circle=self.circle,
+      rating_user=self.passengers[0],
+      rated_user=self.driver,
+      rating=3
+    )
+    Ride.objects.filter(pk=old.pk).update(rating=3.0, rating_sum=3, rating_count=1)
+
+  def test_archive_in_batches(self):
+    """Old finished rides move with their passengers and ratings."""
+    metrics = archive_finished_rides(batch_size=1)
+    self.assertEqual(metrics['archived'], 2)
+    self.assertTrue(metrics['drained'])
+
+    self.assertEqual(
+      set(ArchivedRide.objects.values_list('pk', flat=True)),
+      {self.rides[0].pk, self.rides[1].pk}
+    )
+    self.assertEqual(Ride.objects.count(), 2)
+    self.assertFalse(Rating.objects.exists())
+
+    archived = ArchivedRide.objects.get(pk=self.rides[0].pk)
+    self.assertEqual(archived.created, self.rides[0].created)
+    self.assertEqual(archived.rating_count, 1)
+    self.assertEqual(archived.passengers.count(), 2)
+    self.assertEqual(archived.ratings.get().rating_user, self.passengers[0])
+
+  def test_expired_lock(self):
+    """A run doesn't release the lock another run took after it expired."""
+    started = timezone.now()
+
+    def now():
+      cache.set(archive.LOCK_KEY, 'other')
+      return started
+
+    with mock.patch.object(archive.timezone, 'now', side_effect=now):
+      archive_finished_rides()
+    self.assertEqual(cache.get(archive.LOCK_KEY), 'other')
+
+  def test_read_and_rate_archived(self):
+    """Archived rides can still be retrieved and rated."""
+    archive_finished_rides()
+    url = f'/circles/{self.circle.slug_name}/rides/{self.rides[0].pk}/'
+
+    self.client.force_authenticate(user=self.passengers[1])
+    response = self.client.get(url)
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(response.data['id'], self.rides[0].pk)
+    self.assertEqual(len(response.data['passengers']), 2)
+
+    response = self.client.post(f'{url}rate/', {'rating': 5})
+    self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+    self.assertEqual(response.data['rating'], 4.0)
+    self.assertEqual(ArchivedRating.objects.filter(ride_id=self.rides[0].pk).count(), 2)
+
+    response = self.client.post(f'{url}rate/', {'rating': 5})
+    self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    response = self.client.post(f'{url}join/')
+    self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+  def test_rebuild_counts_archive(self):
+    """Reputations are rebuilt from both ratings tables."""
+    archive_finished_rides()
+    Rating.objects.create(
+      ride=self.rides[3],
+      circle=self.circle,
+      rating_user=self.passengers[0],
+      rated_user=self.driver,
+      rating=5
+    )
+
+    call_command('rebuild_ratings', stdout=StringIO())
+
+    self.driver.profile.refresh_from_db()
+    self.assertEqual(self.driver.profile.rating_count, 2)
+    self.assertEqual(self.driver.profile.reputation, 4.0)
+    self.assertEqual(ArchivedRide.objects.get(pk=self.rides[0].pk).rating, 3.0)
@@ -0,0 +1,129 @@
+"""Synthetic dataset generator tests."""
+
+# Django
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.db.models import Count, Q
+from django.test import TestCase
+
+# Models
+from cride.circles.models import Circle, Membership, Invitation
+from cride.rides.models import Ride, Rating
+from cride.users.models import User, Profile
+
+# Utilities
+from io import StringIO
+
+
+class Rollback(Exception):
+  """Raised to discard a generated dataset."""
+
+
+def generate(**options):
+  """Generate a small dataset."""
+  options = {'users': 60, 'circles': 5, 'rides': 150, 'batch_size': 40, **options}
+  call_command('generate_dataset', stdout=StringIO(), **options)
+
+
+def snapshot():
+  """Return what identifies the generated dataset, timestamps aside."""
+  return (
+    list(Circle.objects.order_by('pk').values_list('slug_name', 'members_count', 'members_limit')),
+    list(Membership.objects.order_by('pk').values_list('user__username', 'circle_id', 'invited_by__username')),
+    sorted(Invitation.objects.values_list('code', flat=True)),
+    list(Ride.objects.order_by('pk').values_list('offered_by__username', 'passengers_summary', 'rating_sum')),
+  )
+
+
+class GenerateDatasetTestCase(TestCase):
+  """Synthetic dataset generator test case."""
+
+  def test_invariants(self):
+    """Generated rows hold the invariants the API maintains."""
+    generate()
+
+    self.assertEqual(User.objects.count(), 60)
+    self.assertEqual(Profile.objects.count(), 60)
+
+    for circle in Circle.objects.annotate(active=Count('membership', filter=Q(membership__is_active=True))):
+      self.assertEqual(circle.members_count, circle.active)
+      if circle.is_limited:
+        self.assertGreaterEqual(circle.members_limit, circle.members_count)
+      members = Membership.objects.filter(circle=circle)
+      founder = members.get(is_admin=True)
+      self.assertIsNone(founder.invited_by)
+      self.assertTrue(founder.is_active)
+      users = set(members.values_list('user', flat=True))
+      for membership in members.exclude(pk=founder.pk):
+        self.assertIn(membership.invited_by_id, users)
+        self.assertTrue(Invitation.objects.filter(
+          circle=circle, issued_by=membership.invited_by, used_by=membership.user, used=True
+        ).exists())
+      for membership in members:
+        self.assertEqual(
+          membership.used_invitations,
+          members.filter(invited_by=membership.user).count()
+        )
+        self.assertEqual(
+          membership.rides_offered,
+          Ride.objects.filter(offered_in=circle, offered_by=membership.user).count()
+        )
+
+    self.assertEqual(Ride.objects.count(), 150)
+    for ride in Ride.objects.prefetch_related('passengers'):
+      active = Membership.objects.filter(circle=ride.offered_in_id, is_active=True)
+      passengers = {user.pk for user in ride.passengers.all()}
+      self.assertTrue(active.filter(user=ride.offered_by_id).exists())
+      self.assertEqual(active.filter(user__in=passengers).count(), len(passengers))
+      self.assertNotIn(ride.offered_by_id, passengers)
+      self.assertEqual(ride.passengers_count, len(passengers))
+      self.assertEqual({passenger['id'] for passenger in ride.passengers_summary}, passengers)
+      ratings = Rating.objects.filter(ride=ride)
+      self.assertEqual(ride.rating_count, ratings.count())
+      self.assertTrue(set(ratings.values_list('rating_user', flat=True)) <= passengers)
+      if ratings.exists():
+        self.assertFalse(ride.is_active)
+
+    profile = Profile.objects.order_by('-rides_offered').first()
+    self.assertEqual(profile.rides_offered, Ride.objects.filter(offered_by=profile.user_id).count())
+
+  def test_stats_match_rebuild(self):
+    """Recounted ratings match the rebuild_ratings command."""
+    generate()
+    fields = ('pk', 'rating_sum', 'rating_count', 'reputation')
+    generated = list(Profile.objects.order_by('pk').values_list(*fields))
+    rides = list(Ride.objects.order_by('pk').values_list('pk', 'rating'))
+
+    call_command('rebuild_ratings', stdout=StringIO())
+    self.assertEqual(list(Profile.objects.order_by('pk').values_list(*fields)), generated)
+    self.assertEqual(list(Ride.objects.order_by('pk').values_list('pk', 'rating')), rides)
+
+  def test_reproducible(self):
+    """The same seed generates the same dataset, other seeds don't."""
+    snapshots = []
+    for seed in (1, 1, 2):
+      try:
+        with transaction.atomic():
+          generate(seed=seed)
+          snapshots.append(snapshot())
+          raise Rollback
+      except Rollback:
+        pass
+    self.assertEqual(snapshots[0], snapshots[1])
+    self.assertNotEqual(snapshots[0], snapshots[2])
+
+  def test_invalid_options(self):
+    """Out of range options are refused before generating anything."""
+    for options in ({'users': 0}, {'circles': -1}, {'rides': -5}, {'rating_rate': 2}):
+      with self.assertRaises(CommandError):
+        generate(**options)
+    self.assertFalse(User.objects.exists())
+
+  def test_existing_dataset(self):
+    """Generating a dataset twice is refused."""
+    generate()
+    with self.assertRaises(CommandError):
+      generate()
+    generate(prefix='other')
+    self.assertEqual(User.objects.count(), 120)
@@ -0,0 +1,151 @@
+"""Ride exports tests."""
+
+# Django
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework.test import APIClient
+
+# Models
+from cride.circles.models import Circle
+from cride.rides.models import Ride, Rating, RideExport
+
+# Exports
+from cride.rides.exports import run_export
+
+# Utilities
+from cride.rides.tests.test_rides import create_member
+from datetime import timedelta
+from unittest import mock
+import csv
+import gzip
+import io
+import json
+import shutil
+import tempfile
+
+
+def create_history(circle, rides):
+  """Create finished circle rides, each with a passenger that rated it."""
+  driver = create_member(circle, 'driver')
+  passenger = create_member(circle, 'passenger')
+  now = timezone.now()
+  for i in range(rides):
+    ride = Ride.objects.create(
+      offered_by=driver,
+      offered_in=circle,
+      departure_location='Ciudad Universitaria',
+      departure_date=now - timedelta(days=i + 1),
+      arrival_location='Polanco',
+      arrival_date=now - timedelta(days=i + 1) + timedelta(hours=1),
+      is_active=False
+    )
+    ride.passengers.add(passenger)
+    Rating.objects.create(
+      ride=ride,
+      circle=circle,
+      rating_user=passenger,
+      rated_user=driver,
+      rating=4
+    )
+  return driver
+
+
+class ExportStorageMixin:
+  """Write export files to a throwaway media root."""
+
+  def setUp(self):
+    """Use a temporary media root."""
+    super(ExportStorageMixin, self).setUp()
+    media_root = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, media_root)
+    settings = override_settings(MEDIA_ROOT=media_root)
+    settings.enable()
+    self.addCleanup(settings.disable)
+
+
+class RideExportTestCase(ExportStorageMixin, TestCase):
+  """Ride export writer test case."""
+
+  def setUp(self):
+    """Test case setup."""
+    super(RideExportTestCase, self).setUp()
+    self.circle = Circle.objects.create(
+      name='Facultad de Ciencias',
+      slug_name='fciencias',
+      about='Grupo oficial de la Facultad de Ciencias de la UNAM',
+    )
+    self.driver = create_history(self.circle, 5)
+
+  def test_csv_export(self):
+    """Rides are written in chunks with their passengers and ratings."""
+    export = RideExport.objects.create(circle=self.circle, requested_by=self.driver)
+    with self.assertNumQueries(3 + 3 * 3 + 2 + 1):
+      run_export(export, chunk_size=2)
+
+    export.refresh_from_db()
+    self.assertEqual(export.status, RideExport.DONE)
+    self.assertEqual((export.exported_rides, export.total_rides), (5, 5))
+
+    with export.file.open('rb') as fileobj:
+      rows = list(csv.DictReader(io.TextIOWrapper(fileobj, encoding='utf-8')))
+    self.assertEqual(len(rows), 5)
+    self.assertEqual(rows[0]['passengers'], 'passenger')
+    self.assertEqual(rows[0]['ratings'], 'passenger:4')
+
+  def test_jsonl_export(self):
+    """JSON Lines exports are gzip compressed."""
+    export = RideExport.objects.create(
+      circle=self.circle,
+      requested_by=self.driver,
+      format=RideExport.JSONL
+    )
+    run_export(export, chunk_size=2)
+
+    self.assertTrue(export.file.name.endswith('.jsonl.gz'))
+    with export.file.open('rb') as fileobj:
+      rides = [json.loads(line) for line in gzip.open(fileobj)]
+    self.assertEqual(len(rides), 5)
+    self.assertEqual(rides[0]['ratings'][0]['rating'], 4)
+
+
+class RideExportAPITestCase(ExportStorageMixin, TransactionTestCase):
+  """Ride export API test case."""
+
+  def setUp(self):
+    """Test case setup."""
+    super(RideExportAPITestCase, self).setUp()
+    self.circle = Circle.objects.create(
+      name='Facultad de Ciencias',
+      slug_name='fciencias',
+      about='Grupo oficial de la Facultad de Ciencias de la UNAM',
+    )
+    self.driver = create_history(self.circle, 3)
+    self.client = APIClient()
+    self.client.force_authenticate(user=self.driver)
+    self.url = f'/circles/{self.circle.slug_name}/ride-exports/'
+
+  def test_admins_only(self):
+    """Regular members can't export the circle history."""
+    response = self.client.post(self.url, {'format': 'csv'})
+    self.assertEqual(response.status_code, 403)
+
+  def test_export_flow(self):
+    """Exports are enqueued, polled and downloaded."""
+    self.driver.membership_set.update(is_admin=True)
+
+    with mock.patch('cride.rides.views.exports.export_circle_rides.delay') as delay:
+      response = self.client.post(self.url, {'format': 'jsonl'})
+    self.assertEqual(response.status_code, 202)
+    self.assertEqual(response.data['status'], RideExport.PENDING)
+    self.assertIsNone(response.data['download_url'])
+    delay.assert_called_once_with(response.data['id'])
+
+    run_export(RideExport.objects.get(pk=response.data['id']))
+
+    response = self.client.get(f"{self.url}{response.data['id']}/")
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(response.data['status'], RideExport.DONE)
+    self.assertEqual(response.data['progress'], 1.0)
+    self.assertTrue(response.data['download_url'].startswith('http://testserver/media/exports/rides/'))
@@ -0,0 +1,252 @@
+"""Join ride tests."""
+
+# Django
+from django.db import connection
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework import status, serializers
+from rest_framework.test import APIClient, APITestCase
+
+# Models
+from cride.circles.models import Circle, Membership
+from cride.rides.models import Ride
+
+# Serializers
+from cride.rides.serializers import JoinSerializer
+
+# Utilities
+from cride.rides.tests.test_rides import create_member
+from cride.utils import counters
+from datetime import timedelta
+import threading
+import unittest
+
+
+def create_ride(circle, user, seats):
+  """Create an upcoming ride with the given available seats."""
+  departure = timezone.now() + timedelta(hours=1)
+  return Ride.objects.create(
+    offered_by=user,
+    offered_in=circle,
+    available_seats=seats,
+    departure_location='Ciudad Universitaria',
+    departure_date=departure,
+    arrival_location='Polanco',
+    arrival_date=departure + timedelta(hours=1)
+  )
+
+
+class JoinRideAPITestCase(APITestCase):
+  """Join ride test case."""
+
+  def setUp(self):
+    """Test case setup."""
+    self.circle = Circle.objects.create(
+      name='Facultad de Ciencias',
+      slug_name='fciencias',
+      about='Grupo oficial de la Facultad de Ciencias de la UNAM',
+    )
+    self.driver = create_member(self.circle, 'driver')
+    self.ride = create_ride(self.circle, self.driver, seats=1)
+
+  def join(self, ride, user):
+    """Join user to ride through the serializer."""
+    serializer = JoinSerializer(
+      ride,
+      data={'passenger': user.username},
+      context={'ride': ride, 'circle': self.circle},
+      partial=True
+    )
+    serializer.is_valid(raise_exception=True)
+    return serializer.save()
+
+  def test_stale_ride_is_not_oversold(self):
+    """A join validated against a stale seat count is rejected."""
+    first = Ride.objects.get(pk=self.ride.pk)
+    second = Ride.objects.get(pk=self.ride.pk)
+
+    self.join(first, create_member(self.circle, 'first'))
+    with self.assertRaises(serializers.ValidationError):
+      self.join(second, create_member(self.circle, 'second'))
+
+    self.ride.refresh_from_db()
+    self.assertEqual(self.ride.available_seats, 0)
+    self.assertEqual(self.ride.passengers.count(), 1)
+
+  def test_passengers_summary(self):
+    """Joining keeps the passenger count and summary in sync."""
+    user = create_member(self.circle, 'first')
+    ride = self.join(self.ride, user)
+    self.assertEqual(ride.passengers_count, 1)
+    self.assertEqual(ride.passengers_summary, [{'id': user.pk, 'username': 'first'}])
+
+    ride.refresh_from_db()
+    self.assertEqual(ride.passengers_count, 1)
+    self.assertEqual(ride.passengers_summary, [{'id': user.pk, 'username': 'first'}])
+
+    ride.passengers.remove(user)
+    ride.refresh_from_db()
+    self.assertEqual((ride.passengers_count, ride.passengers_summary), (0, []))
+
+  def test_renamed_passenger(self):
+    """A renamed passenger is renamed in the summary and can't join twice."""
+    ride = create_ride(self.circle, self.driver, seats=3)
+    user = create_member(self.circle, 'first')
+    self.join(ride, user)
+
+    user.username = 'renamed'
+    user.save()
+    ride.refresh_from_db()
+    self.assertEqual(ride.passengers_summary, [{'id': user.pk, 'username': 'renamed'}])
+
+    with self.assertRaises(serializers.ValidationError):
+      self.join(ride, user)
+    ride.refresh_from_db()
+    self.assertEqual((ride.available_seats, ride.passengers_count), (2, 1))
+
+  def test_stale_summary_is_not_joined_twice(self):
+    """A join validated against a stale summary doesn't take a second seat."""
+    ride = create_ride(self.circle, self.driver, seats=3)
+    user = create_member(self.circle, 'first')
+    first = Ride.objects.get(pk=ride.pk)
+    second = Ride.objects.get(pk=ride.pk)
+
+    self.join(first, user)
+    with self.assertRaises(serializers.ValidationError):
+      self.join(second, user)
+
+    ride.refresh_from_db()
+    self.assertEqual((ride.available_seats, ride.passengers_count), (2, 1))
+
+
+class JoinRideStatsTestCase(TransactionTestCase):
+  """Join ride stats test case.
+
+    Stats are recorded once the request transaction commits, so this
+    test case runs outside of a wrapping transaction.
+  """
+
+  def setUp(self):
+    """Test case setup."""
+    counters.get_counters().clear()
+    self.circle = Circle.objects.create(
+      name='Facultad de Ciencias',
+      slug_name='fciencias',
+      about='Grupo oficial de la Facultad de Ciencias de la UNAM',
+    )
+    driver = create_member(self.circle, 'driver')
+    self.ride = create_ride(self.circle, driver, seats=1)
+
+  def test_join_updates_stats(self):
+    """Joining takes a seat and increments the passenger stats."""
+    passenger = create_member(self.circle, 'passenger')
+    client = APIClient()
+    client.force_authenticate(user=passenger)
+    url = f'/circles/{self.circle.slug_name}/rides/{self.ride.pk}/join/'
+
+    response = client.post(url)
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(response.data['available_seats'], 0)
+
+    # Pending increments are served before being flushed
+    member = Membership.objects.get(user=passenger, circle=self.circle)
+    self.assertEqual(member.rides_taken, 0)
+    response = client.get(f'/circles/{self.circle.slug_name}/members/{passenger.username}/')
+    self.assertEqual(response.data['rides_taken'], 1)
+    self.assertEqual(response.data['user']['profile']['rides_taken'], 1)
+
+    self.assertEqual(counters.flush(), 3)
+    passenger.profile.refresh_from_db()
+    member.refresh_from_db()
+    self.circle.refresh_from_db()
+    self.assertEqual(passenger.profile.rides_taken, 1)
+    self.assertEqual(member.rides_taken, 1)
+    self.assertEqual(self.circle.rides_taken, 1)
+    response = client.get(f'/circles/{self.circle.slug_name}/members/{passenger.username}/')
+    self.assertEqual(response.data['rides_taken'], 1)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Concurrent writes require PostgreSQL.')
+class ConcurrentJoinTestCase(TransactionTestCase):
+  """Concurrent join test case."""
+
+  SEATS = 5
+  PASSENGERS = 20
+
+  def setUp(self):
+    """Test case setup."""
+    counters.get_counters().clear()
+    self.circle = Circle.objects.create(
+      name='Facultad de Ciencias',
+      slug_name='fciencias',
+      about='Grupo oficial de la Facultad de Ciencias de la UNAM',
+    )
+    driver = create_member(self.circle, 'driver')
+    self.ride = create_ride(self.circle, driver, seats=self.SEATS)
+    self.passengers = [
+      create_member(self.circle, f'passenger{i}') for i in range(self.PASSENGERS)
+    ]
+
+  def test_exactly_available_seats_succeed(self):
+    """Only as many joins as available seats succeed."""
+    url = f'/circles/{self.circle.slug_name}/rides/{self.ride.pk}/join/'
+    barrier = threading.Barrier(self.PASSENGERS)
+    codes = []
+
+    def join(user):
+      client = APIClient()
+      client.force_authenticate(user=user)
+      barrier.wait()
+      try:
+        codes.append(client.post(url).status_code)
+      finally:
+        connection.close()
+
+    threads = [threading.Thread(target=join, args=(user,)) for user in self.passengers]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+
+    self.assertEqual(codes.count(status.HTTP_200_OK), self.SEATS)
+    # Late joins see a full ride (400) or none at all once it leaves the
+    # list of rides with free seats (404).
+    failed = [code for code in codes if code != status.HTTP_200_OK]
+    self.assertEqual(len(failed), self.PASSENGERS - self.SEATS)
+    self.assertTrue(set(failed) <= {status.HTTP_400_BAD_REQUEST, status.HTTP_404_NOT_FOUND})
+    self.ride.refresh_from_db()
+    self.circle.refresh_from_db()
+    self.assertEqual(self.ride.available_seats, 0)
+    self.assertEqual(self.ride.passengers.count(), self.SEATS)
+    self.assertEqual(counters.pending(self.circle), {'rides_taken': self.SEATS})
+
+  def test_same_passenger_joins_once(self):
+    """Concurrent joins of the same user take a single seat."""
+    url = f'/circles/{self.circle.slug_name}/rides/{self.ride.pk}/join/'
+    user = self.passengers[0]
+    barrier = threading.Barrier(self.SEATS)
+    codes = []
+
+    def join():
+      client = APIClient()
+      client.force_authenticate(user=user)
+      barrier.wait()
+      try:
+        codes.append(client.post(url).status_code)
+      finally:
+        connection.close()
+
+    threads = [threading.Thread(target=join) for _ in range(self.SEATS)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+
+    self.assertEqual(codes.count(status.HTTP_200_OK), 1)
+    self.assertEqual(codes.count(status.HTTP_400_BAD_REQUEST), self.SEATS - 1)
+    self.ride.refresh_from_db()
+    self.assertEqual(self.ride.available_seats, self.SEATS - 1)
+    self.assertEqual(self.ride.passengers_summary, [{'id': user.pk, 'username': user.username}])
+    self.assertEqual(counters.pending(self.circle), {'rides_taken': 1})
@@ -0,0 +1,90 @@
+"""Ride ratings tests."""
+
+# Django
+from django.core.management import call_command
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+# Models
+from cride.circles.models import Circle
+from cride.rides.models import Ride
+
+# Utilities
+from cride.rides.tests.test_rides import create_member
+from datetime import timedelta
+from io import StringIO
+
+
+class RideRatingAPITestCase(APITestCase):
+  """Ride rating test case."""
+
+  def setUp(self):
+    """Test case setup."""
+    self.circle = Circle.objects.create(
+      name='Facultad de Ciencias',
+      slug_name='fciencias',
+      about='Grupo oficial de la Facultad de Ciencias de la UNAM',
+    )
+    self.driver = create_member(self.circle, 'driver')
+    self.passengers = [create_member(self.circle, f'passenger{i}') for i in range(3)]
+
+    departure = timezone.now() - timedelta(hours=2)
+    self.rides = []
+    for _ in range(2):
+      ride = Ride.objects.create(
+        offered_by=self.driver,
+        offered_in=self.circle,
+        departure_location='Ciudad Universitaria',
+        departure_date=departure,
+        arrival_location='Polanco',
+        arrival_date=departure + timedelta(hours=1)
+      )
+      ride.passengers.add(*self.passengers)
+      self.rides.append(ride)
+
+  def rate(self, ride, user, rating):
+    """Rate ride as user."""
+    self.client.force_authenticate(user=user)
+    url = f'/circles/{self.circle.slug_name}/rides/{ride.pk}/rate/'
+    return self.client.post(url, {'rating': rating})
+
+  def test_running_averages(self):
+    """Ride rating and driver reputation follow the running averages."""
+    response = self.rate(self.rides[0], self.passengers[0], 5)
+    self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+    self.assertEqual(response.data['rating'], 5.0)
+
+    response = self.rate(self.rides[0], self.passengers[1], 4)
+    self.assertEqual(response.data['rating'], 4.5)
+    self.rate(self.rides[0], self.passengers[2], 4)
+    self.rate(self.rides[1], self.passengers[0], 1)
+
+    self.rides[0].refresh_from_db()
+    self.assertEqual(self.rides[0].rating, 4.3)
+    self.assertEqual(self.rides[0].rating_count, 3)
+
+    self.driver.profile.refresh_from_db()
+    self.assertEqual(self.driver.profile.reputation, 3.5)
+    self.assertEqual(self.driver.profile.rating_sum, 14)
+    self.assertEqual(self.driver.profile.rating_count, 4)
+
+  def test_rebuild_command(self):
+    """Aggregates are rebuilt from the ratings table."""
+    self.rate(self.rides[0], self.passengers[0], 5)
+    self.rate(self.rides[0], self.passengers[1], 2)
+    Ride.objects.update(rating=None, rating_sum=0, rating_count=0)
+
+    call_command('rebuild_ratings', batch_size=1, stdout=StringIO())
+
+    self.rides[0].refresh_from_db()
+    self.rides[1].refresh_from_db()
+    self.driver.profile.refresh_from_db()
+    self.assertEqual(self.rides[0].rating, 3.5)
+    self.assertEqual(self.rides[0].rating_count, 2)
+    self.assertIsNone(self.rides[1].rating)
+    self.assertEqual(self.driver.profile.reputation, 3.5)
+    self.passengers[0].profile.refresh_from_db()
+    self.assertEqual(self.passengers[0].profile.reputation, 5.0)
@@ -0,0 +1,89 @@
+"""JSON renderer and parser tests."""
+
+# Django
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+
+# Django REST Framework
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+# Models
+from cride.circles.models import Circle
+from cride.rides.models import Ride
+from cride.users.models import User, Profile
+
+# Serializers
+from cride.rides.serializers import RideModelSerializer
+
+# Utilities
+from cride.utils.parsers import ORJSONParser
+from cride.utils.renderers import ORJSONRenderer
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+
+
+def build_ride(pk):
+  """Return an unsaved ride with its offerer, circle and passengers."""
+  user = User(pk=pk, username=f'driver{pk}', email=f'driver{pk}@cride.com', first_name='Ezio')
+  user.profile = Profile(pk=pk, user=user, biography='Conductor   nocturno')
+  departure = timezone.now() + timedelta(days=1)
+  return Ride(
+    pk=pk,
+    created=timezone.now(),
+    modified=timezone.now(),
+    offered_by=user,
+    offered_in=Circle(pk=1, name='Facultad de Ciencias', slug_name='fciencias'),
+    passengers_count=2,
+    passengers_summary=[{'id': 2, 'username': 'pedro'}, {'id': 3, 'username': 'maría'}],
+    departure_location='Ciudad Universitaria',
+    departure_date=departure,
+    arrival_location='Polanco',
+    arrival_date=departure + timedelta(hours=1),
+    rating=4.5
+  )
+
+
+class ORJSONRendererTestCase(SimpleTestCase):
+  """orjson renderer test case."""
+
+  def test_matches_json_renderer(self):
+    """Ride pages render the same bytes as JSONRenderer."""
+    data = {
+      'count': 2,
+      'results': RideModelSerializer([build_ride(1), build_ride(2)], many=True).data
+    }
+    self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+  def test_native_types(self):
+    """Datetimes, decimals and lazy strings use DRF's encoding."""
+    data = {
+      'created': timezone.now(),
+      'date': timezone.localdate(),
+      'duration': timedelta(minutes=90),
+      'price': Decimal('12.50'),
+      'label': gettext_lazy('active status'),
+      1: 'non string key',
+    }
+    self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+  def test_indent(self):
+    """Indentation follows the accepted media type."""
+    rendered = ORJSONRenderer().render({'a': [1]}, 'application/json; indent=4')
+    self.assertEqual(rendered, b'{\n  "a": [\n    1\n  ]\n}')
+
+
+class ORJSONParserTestCase(SimpleTestCase):
+  """orjson parser test case."""
+
+  def test_parse(self):
+    """JSON bodies are parsed."""
+    stream = BytesIO('{"comments": "Excelente viaje ñ", "rating": 5}'.encode())
+    self.assertEqual(ORJSONParser().parse(stream), {'comments': 'Excelente viaje ñ', 'rating': 5})
+
+  def test_parse_error(self):
+    """Malformed bodies raise a parse error."""
+    with self.assertRaises(ParseError):
+      ORJSONParser().parse(BytesIO(b'{"rating": }'))
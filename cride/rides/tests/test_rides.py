@@ -0,0 +1,391 @@
+"""Rides tests."""
+
+# Django
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+# Models
+from cride.circles.models import Circle, Membership
+from cride.rides.models import Ride
+from cride.users.models import User, Profile
+
+# Cache
+from cride.rides import cache as rides_cache
+
+# Utilities
+from datetime import timedelta
+from unittest import mock
+import unittest
+
+
+def create_member(circle, username, **kwargs):
+  """Create a user with its profile and an active membership in circle."""
+  user = User.objects.create(
+    first_name=username.title(),
+    last_name='Test',
+    email=f'{username}@cride.com',
+    username=username,
+    password='admin123'
+  )
+  profile = Profile.objects.create(user=user)
+  Membership.objects.create(user=user, profile=profile, circle=circle, **kwargs)
+  return user
+
+
+class RideQueriesAPITestCase(APITestCase):
+  """Ride endpoints query count test case.
+
+    Serializing rides nests the offerer, the circle and every
+    passenger, with their profiles when expanded. The number of
+    queries must not grow with the number of rides or passengers.
+  """
+
+  RIDES = 5
+  PASSENGERS = 3
+
+  def setUp(self):
+    """Test case setup."""
+    cache.clear()
+    self.circle = Circle.objects.create(
+      name='Facultad de Ciencias',
+      slug_name='fciencias',
+      about='Grupo oficial de la Facultad de Ciencias de la UNAM',
+    )
+    self.user = create_member(self.circle, 'ezioaud', is_admin=True)
+    self.passengers = passengers = [
+      create_member(self.circle, f'passenger{i}') for i in range(self.PASSENGERS)
+    ]
+
+    departure = timezone.now() + timedelta(hours=1)
+    for i in range(self.RIDES):
+      ride = Ride.objects.create(
+        offered_by=self.user,
+        offered_in=self.circle,
+        available_seats=5,
+        departure_location='Ciudad Universitaria',
+        departure_date=departure + timedelta(minutes=i),
+        arrival_location='Polanco',
+        arrival_date=departure + timedelta(hours=1, minutes=i)
+      )
+      ride.passengers.add(*passengers)
+    self.ride = ride
+
+    self.client.force_authenticate(user=self.user)
+    self.url = f'/circles/{self.circle.slug_name}/rides/'
+
+  def test_list_queries(self):
+    """Listing rides runs a fixed number of queries."""
+    with self.assertNumQueries(7):
+      response = self.client.get(self.url)
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(len(response.data['results']), self.RIDES)
+    for ride in response.data['results']:
+      self.assertEqual(ride['passengers_count'], self.PASSENGERS)
+      self.assertEqual(ride['passengers'][0], {'id': self.passengers[0].pk, 'username': 'passenger0'})
+      self.assertIsNotNone(ride['offered_by']['profile'])
+
+  def test_retrieve_queries(self):
+    """Retrieving a ride runs a fixed number of queries."""
+    with self.assertNumQueries(4):
+      response = self.client.get(f'{self.url}{self.ride.pk}/')
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(len(response.data['passengers']), self.PASSENGERS)
+
+  def test_expand_passengers(self):
+    """Full passengers are rendered when expanded."""
+    with self.assertNumQueries(5):
+      response = self.client.get(f'{self.url}{self.ride.pk}/', {'expand': 'passengers'})
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(len(response.data['passengers']), self.PASSENGERS)
+    for passenger in response.data['passengers']:
+      self.assertIsNotNone(passenger['profile'])
+
+  def test_compiled_list(self):
+    """Compiled list pages render the same JSON as the serializer."""
+    compiled = self.client.get(self.url, {'limit': 3})
+    cache.clear()
+    with mock.patch('cride.utils.views.get_compiled_serializer', return_value=None):
+      regular = self.client.get(self.url, {'limit': 3})
+    self.assertEqual(compiled.content, regular.content)
+
+  def test_sparse_fields(self):
+    """Only the requested fields and relations are queried and rendered."""
+    with self.assertNumQueries(7):
+      response = self.client.get(self.url, {'fields': 'id,departure_date,offered_by.username'})
+    ride = response.data['results'][0]
+    self.assertEqual(set(ride), {'id', 'departure_date', 'offered_by'})
+    self.assertEqual(ride['offered_by'], {'username': 'ezioaud'})
+
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+      self.client.get(self.url, {'fields': 'id,available_seats'})
+    ride_queries = [query['sql'] for query in queries if 'FROM "rides_ride"' in query['sql']]
+    self.assertFalse(any('JOIN' in sql for sql in ride_queries))
+
+  def test_sparse_expanded_fields(self):
+    """Expanded relations take their own sparse fieldset."""
+    with self.assertNumQueries(5):
+      response = self.client.get(
+        f'{self.url}{self.ride.pk}/',
+        {'fields': 'passengers.username', 'expand': 'passengers'}
+      )
+    self.assertEqual(list(response.data), ['passengers'])
+    self.assertCountEqual(
+      response.data['passengers'],
+      [{'username': f'passenger{i}'} for i in range(self.PASSENGERS)]
+    )
+
+
+class RidePaginationAPITestCase(APITestCase):
+  """Ride list cursor pagination test case."""
+
+  def setUp(self):
+    """Test case setup."""
+    cache.clear()
+    self.circle = Circle.objects.create(
+      name='Facultad de Ciencias',
+      slug_name='fciencias',
+      about='Grupo oficial de la Facultad de Ciencias de la UNAM',
+    )
+    self.user = create_member(self.circle, 'ezioaud')
+
+    departure = timezone.now() + timedelta(hours=1)
+    self.rides = [
+      Ride.objects.create(
+        offered_by=self.user,
+        offered_in=self.circle,
+        departure_location='Ciudad Universitaria',
+        departure_date=departure + timedelta(minutes=i),
+        arrival_location='Polanco',
+        arrival_date=departure + timedelta(hours=1, minutes=i)
+      ) for i in range(5)
+    ]
+
+    self.client.force_authenticate(user=self.user)
+    self.url = f'/circles/{self.circle.slug_name}/rides/'
+
+  def test_cursor_pages_refuse_ordering(self):
+    """Cursor pages can't be reordered."""
+    response = self.client.get(self.url, {'pagination': 'cursor', 'ordering': 'departure_date'})
+    self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+  def test_limit_offset_by_default(self):
+    """Without a cursor, pages include the total count."""
+    response = self.client.get(self.url, {'limit': 2})
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(response.data['count'], 5)
+
+  def test_cursor_pages(self):
+    """Cursor pages follow the primary key and skip the count."""
+    response = self.client.get(self.url, {'pagination': 'cursor', 'limit': 2})
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertNotIn('count', response.data)
+    self.assertIsNone(response.data['previous'])
+
+    # Rescheduled rides keep their place.
+    Ride.objects.filter(pk=self.rides[4].pk).update(departure_date=timezone.now() + timedelta(minutes=30))
+    ids = []
+    while True:
+      ids += [ride['id'] for ride in response.data['results']]
+      if response.data['next'] is None:
+        break
+      with self.assertNumQueries(6):
+        response = self.client.get(response.data['next'])
+      self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(ids, [ride.pk for ride in self.rides])
+
+
+class RideSearchAPITestCase(APITestCase):
+  """Ride search test case."""
+
+  def setUp(self):
+    """Test case setup."""
+    cache.clear()
+    self.circle = Circle.objects.create(
+      name='Facultad de Ciencias',
+      slug_name='fciencias',
+      about='Grupo oficial de la Facultad de Ciencias de la UNAM',
+    )
+    self.user = create_member(self.circle, 'ezioaud')
+
+    departure = timezone.now() + timedelta(hours=1)
+    for arrival_location in ('Polanco', 'Coyoacan'):
+      Ride.objects.create(
+        offered_by=self.user,
+        offered_in=self.circle,
+        departure_location='Ciudad Universitaria',
+        departure_date=departure,
+        arrival_location=arrival_location,
+        arrival_date=departure + timedelta(hours=1)
+      )
+
+    self.client.force_authenticate(user=self.user)
+    self.url = f'/circles/{self.circle.slug_name}/rides/'
+
+  def test_search_locations(self):
+    """Search matches departure and arrival locations."""
+    response = self.client.get(self.url, {'search': 'polanco'})
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(response.data['count'], 1)
+    self.assertEqual(response.data['results'][0]['arrival_location'], 'Polanco')
+
+    response = self.client.get(self.url, {'search': 'universitaria'})
+    self.assertEqual(response.data['count'], 2)
+
+  @unittest.skipUnless(connection.vendor == 'postgresql', 'Search indexes require PostgreSQL.')
+  def test_search_uses_index(self):
+    """The search vector is the indexed expression."""
+    with CaptureQueriesContext(connection) as queries:
+      self.client.get(self.url, {'search': 'polanco'})
+    sql = next(
+      query['sql'] for query in queries
+      if 'FROM "rides_ride"' in query['sql'] and 'to_tsvector' in query['sql']
+    )
+    with connection.cursor() as cursor:
+      cursor.execute('SET LOCAL enable_seqscan = off')
+      cursor.execute(f'EXPLAIN {sql}')
+      plan = '\n'.join(row[0] for row in cursor.fetchall())
+    self.assertIn('ride_search_vector_idx', plan)
+
+
+class RideConditionalGetAPITestCase(APITestCase):
+  """Ride conditional GET test case."""
+
+  def setUp(self):
+    """Test case setup."""
+    cache.clear()
+    self.circle = Circle.objects.create(
+      name='Facultad de Ciencias',
+      slug_name='fciencias',
+      about='Grupo oficial de la Facultad de Ciencias de la UNAM',
+    )
+    self.user = create_member(self.circle, 'ezioaud')
+
+    departure = timezone.now() + timedelta(hours=1)
+    self.ride = Ride.objects.create(
+      offered_by=self.user,
+      offered_in=self.circle,
+      departure_location='Ciudad Universitaria',
+      departure_date=departure,
+      arrival_location='Polanco',
+      arrival_date=departure + timedelta(hours=1)
+    )
+
+    self.client.force_authenticate(user=self.user)
+    self.url = f'/circles/{self.circle.slug_name}/rides/'
+
+  def test_list_etag(self):
+    """Unchanged lists answer 304, changed ones a new entity tag."""
+    response = self.client.get(self.url)
+    etag = response['ETag']
+
+    response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+    self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    self.ride.comments = 'Leaving from the main entrance'
+    self.ride.save()
+    cache.clear()  # Page invalidation only runs on commit
+    response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertNotEqual(response['ETag'], etag)
+
+  def test_list_etag_tracks_driver_profile(self):
+    """Changes to the embedded driver profile change the list entity tag."""
+    etag = self.client.get(self.url)['ETag']
+
+    profile = self.user.profile
+    profile.biography = 'Driving to Polanco every morning'
+    profile.save()
+    cache.clear()  # Cached pages expire by themselves
+    response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertNotEqual(response['ETag'], etag)
+
+  def test_retrieve_last_modified(self):
+    """Details are validated by entity tag and modification date."""
+    url = f'{self.url}{self.ride.pk}/'
+    response = self.client.get(url)
+    self.assertIn('ETag', response)
+
+    response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+    self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    self.assertEqual(response.content, b'')
+
+  def test_retrieve_etag_tracks_driver_profile(self):
+    """Changes to the embedded driver profile change the detail entity tag."""
+    url = f'{self.url}{self.ride.pk}/'
+    etag = self.client.get(url)['ETag']
+
+    profile = self.user.profile
+    profile.biography = 'Driving to Polanco every morning'
+    profile.save()
+    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertNotEqual(response['ETag'], etag)
+
+
+class RideListCacheTestCase(TransactionTestCase):
+  """Ride list cache test case.
+
+    Invalidations happen once transactions commit, so this test case
+    runs outside of a wrapping transaction.
+  """
+
+  def setUp(self):
+    """Test case setup."""
+    cache.clear()
+    self.circle = Circle.objects.create(
+      name='Facultad de Ciencias',
+      slug_name='fciencias',
+      about='Grupo oficial de la Facultad de Ciencias de la UNAM',
+    )
+    self.user = create_member(self.circle, 'ezioaud')
+    self.passenger = create_member(self.circle, 'passenger')
+
+    departure = timezone.now() + timedelta(hours=1)
+    self.ride = Ride.objects.create(
+      offered_by=self.user,
+      offered_in=self.circle,
+      available_seats=2,
+      departure_location='Ciudad Universitaria',
+      departure_date=departure,
+      arrival_location='Polanco',
+      arrival_date=departure + timedelta(hours=1)
+    )
+
+    self.client = APIClient()
+    self.client.force_authenticate(user=self.passenger)
+    self.url = f'/circles/{self.circle.slug_name}/rides/'
+
+  def test_cached_page(self):
+    """Repeated polls don't query rides."""
+    first = self.client.get(self.url)
+    with self.assertNumQueries(2):
+      second = self.client.get(self.url)
+    self.assertEqual(first.data, second.data)
+
+  def test_join_invalidates_page(self):
+    """Joining a ride refreshes the circle's ride list."""
+    self.client.get(self.url)
+    response = self.client.post(f'{self.url}{self.ride.pk}/join/')
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    response = self.client.get(self.url)
+    ride = response.data['results'][0]
+    self.assertEqual(ride['available_seats'], 1)
+    self.assertEqual(ride['passengers'][0]['username'], self.passenger.username)
+
+  def test_expires_at_departure_cutoff(self):
+    """Pages don't outlive the first ride's departure cutoff."""
+    rides = Ride.objects.filter(pk=self.ride.pk)
+    self.assertEqual(rides_cache.page_timeout(rides), rides_cache.LIST_TIMEOUT)
+
+    rides.update(departure_date=timezone.now() + timedelta(minutes=10, seconds=30))
+    self.assertLessEqual(rides_cache.page_timeout(rides), 30)
@@ -0,0 +1,86 @@
+"""Finished rides sweeper tests."""
+
+# Django
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+# Models
+from cride.circles.models import Circle
+from cride.rides.models import Ride
+
+# Sweeper
+from cride.rides import sweeper
+
+# Utilities
+from cride.rides.tests.test_rides import create_member
+from datetime import timedelta
+from unittest import mock
+
+
+class FinishedRidesSweeperTestCase(TestCase):
+  """Finished rides sweeper test case."""
+
+  def setUp(self):
+    """Test case setup."""
+    cache.clear()
+    circle = Circle.objects.create(
+      name='Facultad de Ciencias',
+      slug_name='fciencias',
+      about='Grupo oficial de la Facultad de Ciencias de la UNAM',
+    )
+    user = create_member(circle, 'driver')
+
+    now = timezone.now()
+    for hours in (-5, -4, -3, -2, -1, 1):
+      Ride.objects.create(
+        offered_by=user,
+        offered_in=circle,
+        departure_location='Ciudad Universitaria',
+        departure_date=now + timedelta(hours=hours - 1),
+        arrival_location='Polanco',
+        arrival_date=now + timedelta(hours=hours)
+      )
+
+  def test_sweep_in_batches(self):
+    """Runs are bounded and later runs pick up the rest."""
+    metrics = sweeper.sweep_finished_rides(batch_size=2, max_batches=2)
+    self.assertEqual(metrics['touched'], 4)
+    self.assertFalse(metrics['drained'])
+    self.assertEqual(Ride.objects.filter(is_active=True).count(), 2)
+
+    metrics = sweeper.sweep_finished_rides(batch_size=2, max_batches=2)
+    self.assertEqual(metrics['touched'], 1)
+    self.assertTrue(metrics['drained'])
+
+    active = Ride.objects.get(is_active=True)
+    self.assertGreater(active.arrival_date, timezone.now())
+
+  def test_overlapping_runs(self):
+    """A run is skipped while another one holds the lock."""
+    cache.add(sweeper.LOCK_KEY, True)
+    self.assertIsNone(sweeper.sweep_finished_rides())
+    self.assertEqual(Ride.objects.filter(is_active=True).count(), 6)
+
+  def test_ride_moved_earlier(self):
+    """Rides edited to arrive before already swept ones are swept."""
+    sweeper.sweep_finished_rides()
+    ride = Ride.objects.get(is_active=True)
+    ride.arrival_date = timezone.now() - timedelta(days=1)
+    ride.save()
+
+    metrics = sweeper.sweep_finished_rides()
+    self.assertEqual(metrics['touched'], 1)
+    self.assertFalse(Ride.objects.filter(is_active=True).exists())
+
+  def test_expired_lock(self):
+    """A run doesn't release the lock another run took after it expired."""
+    started = timezone.now()
+
+    def now():
+      cache.set(sweeper.LOCK_KEY, 'other')
+      return started
+
+    with mock.patch.object(sweeper.timezone, 'now', side_effect=now):
+      sweeper.sweep_finished_rides()
+    self.assertEqual(cache.get(sweeper.LOCK_KEY), 'other')
\ No newline at end of file
@@ -8,6 +8,7 @@ from rest_framework.routers import DefaultRouter
 
 # Views
 from .views import rides as rides_views
+from .views import exports as exports_views
 
 router = DefaultRouter()
 router.register(
@@ -15,6 +16,11 @@ router.register(
   rides_views.RideViewSet,
   basename='ride'
 )
+router.register(
+  r'circles/(?P<slug_name>[-a-zA-Z0-9_-]+)/ride-exports',
+  exports_views.RideExportViewSet,
+  basename='ride-export'
+)
 
 urlpatterns = [
   path('', include(router.urls))
@@ -0,0 +1,59 @@
+"""Ride exports views."""
+
+# Django
+from django.db import transaction
+
+# Django REST Framework
+from rest_framework import mixins, viewsets, status
+from rest_framework.response import Response
+
+# Models
+from cride.rides.models import RideExport
+
+# Serializers
+from cride.rides.serializers import RideExportModelSerializer
+
+# Permissions
+from rest_framework.permissions import IsAuthenticated
+from cride.circles.permissions.memberships import IsActiveCircleAdmin
+from cride.circles.resolvers import get_resolver
+
+# Tasks
+from cride.taskapp.tasks import export_circle_rides
+
+class RideExportViewSet(mixins.CreateModelMixin,
+                        mixins.ListModelMixin,
+                        mixins.RetrieveModelMixin,
+                        viewsets.GenericViewSet):
+  """Circle ride history exports.
+
+    Creating an export only enqueues it, clients poll its status
+    until it's done and then follow its download URL.
+  """
+
+  serializer_class = RideExportModelSerializer
+  permission_classes = (IsAuthenticated, IsActiveCircleAdmin)
+  cursor_ordering = ('-pk',)
+
+  def initial(self, request, *args, **kwargs):
+    """Verify that the circle exists before checking permissions."""
+    self.circle = get_resolver(request).get_circle(kwargs['slug_name'])
+    super(RideExportViewSet, self).initial(request, *args, **kwargs)
+
+  def get_queryset(self):
+    """Return circle exports."""
+    return RideExport.objects.filter(circle=self.circle)
+
+  def get_serializer_context(self):
+    """Add circle to serializer context."""
+    context = super(RideExportViewSet, self).get_serializer_context()
+    context['circle'] = self.circle
+    return context
+
+  def create(self, request, *args, **kwargs):
+    """Enqueue a new export."""
+    serializer = self.get_serializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    export = serializer.save()
+    transaction.on_commit(lambda: export_circle_rides.delay(export.pk))
+    return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
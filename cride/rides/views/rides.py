@@ -6,8 +6,17 @@ from rest_framework.generics import get_object_or_404
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+# Django
+from django.db.models import Prefetch
+from django.http import Http404
+
 # Models
-from cride.circles.models import Circle
+from cride.rides.models import ArchivedRide
+from cride.users.models import User
+
+# Cache
+from django.core.cache import cache
+from cride.rides import cache as rides_cache
 
 # Serializers
 from cride.rides.serializers import (
@@ -21,32 +30,41 @@ from cride.rides.serializers import (
 # Permissions
 from rest_framework.permissions import IsAuthenticated
 from cride.circles.permissions.memberships import IsActiveCircleMember
+from cride.circles.resolvers import get_resolver
 from cride.rides.permissions.rides import IsRideOwner, IsNotRideOwner
 
 # Filters
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from cride.utils.filters import FullTextSearchFilter
 
 # Utilities
 from datetime import timedelta
 from django.utils import timezone 
+from cride.utils.views import CompiledListMixin, ConditionalListMixin, ConditionalRetrieveMixin, make_etag
+from cride.utils.serializers import get_branch, get_field_trees, is_expanded, is_requested
 
-class RideViewSet(mixins.CreateModelMixin,
+class RideViewSet(ConditionalListMixin,
+                  ConditionalRetrieveMixin,
+                  CompiledListMixin,
+                  mixins.CreateModelMixin,
                   mixins.ListModelMixin,
                   mixins.RetrieveModelMixin,
                   mixins.UpdateModelMixin,
                   viewsets.GenericViewSet):
 
-  filter_backends = (SearchFilter, OrderingFilter)
+  filter_backends = (OrderingFilter, FullTextSearchFilter)
   DEFAULT_ORDERING = ('departure_date', 'arrival_date', 'available_seats')
   ordering = DEFAULT_ORDERING
   orderin_fields = DEFAULT_ORDERING
+  # Pagination: departure dates tie and change on updates, cursors
+  # follow the immutable, unique primary key instead.
+  cursor_ordering = ('pk',)
   search_fields = ('departure_location', 'arrival_location')
 
-  def dispatch(self, request, *args, **kwargs):
-    """."""
-    slug_name = kwargs['slug_name']
-    self.circle = get_object_or_404(Circle, slug_name=slug_name)
-    return super(RideViewSet, self).dispatch(request, *args, **kwargs)
+  def initial(self, request, *args, **kwargs):
+    """Verify that the circle exists before checking permissions."""
+    self.circle = get_resolver(request).get_circle(kwargs['slug_name'])
+    super(RideViewSet, self).initial(request, *args, **kwargs)
 
   def get_permissions(self):
     """Assing permission based on action."""
@@ -63,6 +81,38 @@ class RideViewSet(mixins.CreateModelMixin,
     context['circle'] = self.circle
     return context
 
+  def with_relations(self, queryset):
+    """Load the relations requested through `?fields=` and `?expand=`.
+
+      Offerer and circle are joined, passengers are only prefetched
+      when expanded. Unrequested relations are left out.
+    """
+    fields, expand = get_field_trees(self.request)
+    related = [
+      path.replace('.', '__')
+      for path in ('offered_by.profile', 'offered_by', 'offered_in')
+      if is_requested(fields, path)
+    ]
+    if related:
+      queryset = queryset.select_related(*related)
+    if is_expanded(fields, expand, 'passengers'):
+      users = User.objects.all()
+      if is_requested(get_branch(fields, 'passengers'), 'profile'):
+        users = users.select_related('profile')
+      queryset = queryset.prefetch_related(Prefetch('passengers', queryset=users))
+    return queryset
+
+  @property
+  def conditional_fields(self):
+    """Return the fields validating lists, rendered driver and profile included."""
+    fields, _ = get_field_trees(self.request)
+    conditional = ['modified']
+    if is_requested(fields, 'offered_by'):
+      conditional.append('offered_by__modified')
+    if is_requested(fields, 'offered_by.profile'):
+      conditional.append('offered_by__profile__modified')
+    return conditional
+
   def get_serializer_class(self):
     """Return serializer based on action."""
     if self.action == 'create':
@@ -76,16 +126,73 @@ class RideViewSet(mixins.CreateModelMixin,
     return RideModelSerializer
 
   def get_queryset(self):
-    """Return active circle's rides."""
-    if self.action not in ['finish', 'retrieve']:
+    """Return active circle's rides.
+
+      Offerer and circle are loaded through joins and passengers
+      come from the ride's summary, so serializing a page costs a
+      fixed number of queries.
+    """
+    queryset = self.with_relations(self.circle.ride_set.all())
+    if self.action not in ['finish', 'retrieve', 'rate']:
       offset = timezone.now() + timedelta(minutes=10)
-      return self.circle.ride_set.filter(
+      return queryset.filter(
         departure_date__gte=offset,
         is_active=1,
         available_seats__gte=1
       )
-    return self.circle.ride_set.all()
+    return queryset
+
+  def get_object(self):
+    """Return the ride, falling through to the archive on reads and ratings."""
+    try:
+      return super(RideViewSet, self).get_object()
+    except Http404:
+      if self.action not in ['retrieve', 'rate']:
+        raise
+    ride = get_object_or_404(
+      self.with_relations(ArchivedRide.objects.all()),
+      offered_in=self.circle,
+      pk=self.kwargs['pk']
+    )
+    self.check_object_permissions(self.request, ride)
+    return ride
   
+  def get_object_validators(self, instance):
+    """Include the rendered driver and profile in the validators."""
+    fields, _ = get_field_trees(self.request)
+    modified = [instance.modified]
+    if instance.offered_by_id is not None and is_requested(fields, 'offered_by'):
+      modified.append(instance.offered_by.modified)
+      if is_requested(fields, 'offered_by.profile'):
+        modified.append(instance.offered_by.profile.modified)
+    last_modified = max(modified)
+    return make_etag(instance.pk, last_modified), last_modified
+
+  def get_list_validators(self):
+    """Return the validators stored with the cached page, if any.
+
+      Pages are cached per circle, query params and page until a
+      ride of the circle changes or the first one passes the
+      departure cutoff, so a cached page and its entity tag are
+      both current.
+    """
+    self.page_cache_key = rides_cache.page_key(self.circle.pk, self.request)
+    self.cached_page = cache.get(self.page_cache_key)
+    if self.cached_page is not None:
+      self.page_etag = self.cached_page['etag']
+      return self.page_etag, None
+    self.page_etag, last_modified = super(RideViewSet, self).get_list_validators()
+    return self.page_etag, last_modified
+
+  def render_list(self, request, *args, **kwargs):
+    """Return the cached page or render and cache it."""
+    if self.cached_page is not None:
+      return Response(self.cached_page['data'])
+    response = super(RideViewSet, self).render_list(request, *args, **kwargs)
+    page = {'etag': self.page_etag, 'data': response.data}
+    cache.set(self.page_cache_key, page, rides_cache.page_timeout(self.get_queryset()))
+    return response
+
   @action(detail=True, methods=['POST'])
   def join(self, request, *args, **kwargs):
     """Add requesting user to ride."""
@@ -94,7 +201,7 @@ class RideViewSet(mixins.CreateModelMixin,
     serializer = serializer_class(
       ride,
       data={ 'passenger': str(request.user) },
-      context={ 'ride': ride, 'circle': self.circle },
+      context={ 'ride': ride, 'circle': self.circle, 'request': request },
       partial=True
     ) 
     serializer.is_valid(raise_exception=True)
@@ -132,4 +239,4 @@ class RideViewSet(mixins.CreateModelMixin,
     serializer.is_valid(raise_exception=True)
     ride = serializer.save()
     data = RideModelSerializer(ride).data
-    return Response(data, status=status.HTTP_201_CREATE)
+    return Response(data, status=status.HTTP_201_CREATED)
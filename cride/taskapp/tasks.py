@@ -12,7 +12,17 @@ from celery.task.schedules import crontab
 
 # Models
 from cride.users.models import User
-from cride.rides.models import Ride
+from cride.rides.models import RideExport
+
+# Counters
+from cride.utils import counters
+
+# Sweepers
+from cride.rides.sweeper import sweep_finished_rides
+from cride.rides.archive import archive_finished_rides
+
+# Exports
+from cride.rides.exports import run_export
 
 # Utilities
 import jwt
@@ -46,15 +56,27 @@ def send_confirmation_email(user_pk):
   msg.attach_alternative(content, 'text/html')
   msg.send()
 
-@periodic_task(name='disable_finish_rides', run_every=crontab(hour=7, minute=30, day_of_week=1))
+@task(name='export_circle_rides', max_retries=3)
+def export_circle_rides(export_pk):
+  """Write the ride history export of a circle."""
+  export = RideExport.objects.select_related('circle').get(pk=export_pk)
+  run_export(export)
+  return export.exported_rides
+
+@periodic_task(name='disable_finish_rides', run_every=crontab(minute='*/1'))
 def disable_finish_rides():
-  """Disable finished rides."""
-  now = timezone.now()
-  offset = now + timedelta(minutes=20)
+  """Disable rides past their arrival date."""
+  return sweep_finished_rides()
+
+@periodic_task(name='archive_rides', run_every=crontab(minute=30))
+def archive_rides():
+  """Move old finished rides to the archive tables."""
+  return archive_finished_rides()
 
-  # Update rides that have already fisinsh
-  rides = Ride.objects.filter(arrival_date__gte=now, arrival_date__lte=offset, is_active=True)
-  rides.update(is_active=False)
+@periodic_task(name='flush_counters', run_every=crontab(minute='*/1'))
+def flush_counters():
+  """Write pending counter increments to the database."""
+  return counters.flush()
 
 @periodic_task(name='list_user', run_every=crontab(minute='*/1'))
 def list_user():
@@ -6,13 +6,17 @@ from rest_framework import serializers
 # Models
 from cride.users.models import Profile
 
-class ProfileModelSerializer(serializers.ModelSerializer):
+# Utilities
+from cride.utils.counters import PendingCountersMixin, PendingCountersListSerializer
+
+class ProfileModelSerializer(PendingCountersMixin, serializers.ModelSerializer):
   """Profile model serializer."""
   
   class Meta:
     """Meta class."""
 
     model = Profile
+    list_serializer_class = PendingCountersListSerializer
     fields = (
       'picture',
       'biography',
@@ -23,8 +23,10 @@ from datetime import timedelta
 
 # Serializers
 from cride.users.serializers.profile import ProfileModelSerializer
+from cride.utils.counters import PendingCountersListSerializer
+from cride.utils.serializers import DynamicFieldsMixin
 
-class UserModelSerializer(serializers.ModelSerializer):
+class UserModelSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
   """User model serializer."""
 
   profile = ProfileModelSerializer(read_only=True)
@@ -32,6 +34,7 @@ class UserModelSerializer(serializers.ModelSerializer):
   class Meta:
     """Meta class."""
     model = User
+    list_serializer_class = PendingCountersListSerializer
     fields = (
       'username',
       'first_name',
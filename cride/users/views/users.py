@@ -27,18 +27,23 @@ from cride.circles.serializers import CircleModelSerializer
 from cride.users.models import User
 from cride.circles.models import Circle
 
+# Utilities
+from django.db.models import Count, Max
+from cride.utils.views import ConditionalRetrieveMixin, make_etag
+
 class UserLoginAPIView(TokenObtainPairView):
   """User login API view."""
   serializer_class = UserLoginSerializer
 
-class UserViewSet(mixins.RetrieveModelMixin, 
+class UserViewSet(ConditionalRetrieveMixin,
+                  mixins.RetrieveModelMixin, 
                   mixins.UpdateModelMixin, 
                   viewsets.GenericViewSet):
   """User view set.
     Handle sign up, login and account verification
   """
 
-  queryset = User.objects.filter(is_active=True, is_client=True)
+  queryset = User.objects.filter(is_active=True, is_client=True).select_related('profile')
   serializer_class = UserModelSerializer
   lookup_field = 'username'
 
@@ -86,16 +91,30 @@ class UserViewSet(mixins.RetrieveModelMixin,
     data = UserModelSerializer(user).data
     return Response(data)
 
-  def retrieve(self, request, *args, **kwargs):
-    """Add extra data to the response."""
-    response = super(UserViewSet, self).retrieve(request, *args, **kwargs)
-    circles = Circle.objects.filter(
-      members=request.user,
+  def get_user_circles(self):
+    """Return the circles the requesting user is an active member of."""
+    return Circle.objects.filter(
+      members=self.request.user,
       membership__is_active=True
     )
+
+  def get_object_validators(self, instance):
+    """Include the profile and the user's circles in the validators."""
+    circles = self.get_user_circles().aggregate(
+      count=Count('pk'),
+      circle=Max('modified'),
+      membership=Max('membership__modified')
+    )
+    dates = [instance.modified, instance.profile.modified, circles['circle'], circles['membership']]
+    last_modified = max(date for date in dates if date is not None)
+    return make_etag(instance.pk, circles['count'], last_modified), last_modified
+
+  def render_object(self, instance):
+    """Add extra data to the response."""
+    response = super(UserViewSet, self).render_object(instance)
     data = {
       'user': response.data,
-      'circles': CircleModelSerializer(circles, many=True).data
+      'circles': CircleModelSerializer(self.get_user_circles(), many=True).data
     }
     response.data = data
     return response
\ No newline at end of file
@@ -0,0 +1,243 @@
+"""Write-behind counters.
+
+Hot denormalized counters (circle, membership and profile ride stats)
+are not written to their rows on every ride creation or join. Their
+increments are recorded in a counters backend and periodically flushed
+to the database in batches by the `flush_counters` task. Until then,
+serializers add the pending deltas to the values read from the rows,
+fetched once for every object of a list.
+"""
+
+# Django
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+# Django REST Framework
+from rest_framework import serializers
+
+# Utilities
+from collections import defaultdict
+from functools import lru_cache
+import threading
+
+import redis
+
+
+class LocalCounters:
+  """In-process counters backend.
+
+    Only suitable for tests and single process setups, pending
+    deltas are neither shared between processes nor persisted.
+  """
+
+  def __init__(self):
+    self.lock = threading.Lock()
+    self.deltas = defaultdict(lambda: defaultdict(int))
+
+  def incr(self, key, deltas):
+    """Add deltas to the counters of key."""
+    with self.lock:
+      for field, delta in deltas.items():
+        self.deltas[key][field] += delta
+
+  def get(self, key):
+    """Return the pending deltas of key."""
+    with self.lock:
+      return dict(self.deltas.get(key, {}))
+
+  def get_many(self, keys):
+    """Return the pending deltas of keys, by key."""
+    with self.lock:
+      return {key: dict(self.deltas[key]) for key in keys if key in self.deltas}
+
+  def drain(self, count):
+    """Remove and return up to count keys with their deltas."""
+    with self.lock:
+      keys = list(self.deltas)[:count]
+      return {key: dict(self.deltas.pop(key)) for key in keys}
+
+  def clear(self):
+    """Discard every pending delta."""
+    with self.lock:
+      self.deltas.clear()
+
+
+class RedisCounters:
+  """Redis counters backend.
+
+    Deltas of each object live in a hash and the keys of objects with
+    pending deltas in a set, so a flush only visits dirty objects.
+  """
+
+  prefix = 'counters'
+
+  def __init__(self):
+    self.redis = redis.Redis.from_url(settings.COUNTERS_REDIS_URL)
+    self.dirty_key = f'{self.prefix}:dirty'
+
+  def hash_key(self, key):
+    """Return the Redis hash holding the deltas of key."""
+    return f'{self.prefix}:{key}'
+
+  def incr(self, key, deltas):
+    """Add deltas to the counters of key."""
+    pipe = self.redis.pipeline()
+    for field, delta in deltas.items():
+      pipe.hincrby(self.hash_key(key), field, delta)
+    pipe.sadd(self.dirty_key, key)
+    pipe.execute()
+
+  def get(self, key):
+    """Return the pending deltas of key."""
+    values = self.redis.hgetall(self.hash_key(key))
+    return {field.decode(): int(delta) for field, delta in values.items()}
+
+  def get_many(self, keys):
+    """Return the pending deltas of keys, by key."""
+    keys = list(keys)
+    pipe = self.redis.pipeline()
+    for key in keys:
+      pipe.hgetall(self.hash_key(key))
+    return {
+      key: {field.decode(): int(delta) for field, delta in values.items()}
+      for key, values in zip(keys, pipe.execute()) if values
+    }
+
+  def drain(self, count):
+    """Remove and return up to count keys with their deltas."""
+    keys = [key.decode() for key in self.redis.spop(self.dirty_key, count) or []]
+    if not keys:
+      return {}
+    pipe = self.redis.pipeline()
+    for key in keys:
+      pipe.hgetall(self.hash_key(key))
+      pipe.delete(self.hash_key(key))
+    values = pipe.execute()[::2]
+    return {
+      key: {field.decode(): int(delta) for field, delta in deltas.items()}
+      for key, deltas in zip(keys, values) if deltas
+    }
+
+  def clear(self):
+    """Discard every pending delta."""
+    keys = self.redis.smembers(self.dirty_key)
+    self.redis.delete(self.dirty_key, *[self.hash_key(key.decode()) for key in keys])
+
+
+@lru_cache(maxsize=None)
+def get_counters():
+  """Return the configured counters backend."""
+  return import_string(settings.COUNTERS_BACKEND)()
+
+
+def make_key(model, pk):
+  """Return the counters key of a model instance."""
+  return f'{model._meta.label_lower}:{pk}'
+
+
+def incr(model, pk, **deltas):
+  """Record counter increments once the current transaction commits."""
+  key = make_key(model, pk)
+  transaction.on_commit(lambda: get_counters().incr(key, deltas))
+
+
+def pending(instance):
+  """Return the deltas of instance not yet flushed to the database."""
+  if instance.pk is None:
+    return {}
+  return get_counters().get(make_key(type(instance), instance.pk))
+
+
+def pending_many(keys):
+  """Return the deltas not yet flushed of the objects of keys, by key."""
+  keys = set(keys)
+  return get_counters().get_many(keys) if keys else {}
+
+
+def apply_pending(entries):
+  """Add pending deltas to serialized objects.
+
+    `entries` are (data, key) pairs, their deltas are fetched at once.
+  """
+  deltas = pending_many(key for _, key in entries)
+  for data, key in entries:
+    for field, delta in deltas.get(key, {}).items():
+      if field in data:
+        data[field] += delta
+
+
+def flush(batch_size=500):
+  """Write pending deltas to the database, return the rows touched.
+
+    Rows with the same deltas are updated together with a single
+    UPDATE. If writing a batch fails its deltas are put back.
+  """
+  counters = get_counters()
+  touched = 0
+  while True:
+    entries = counters.drain(batch_size)
+    groups = defaultdict(list)
+    for key, deltas in entries.items():
+      label, pk = key.rsplit(':', 1)
+      groups[(label, tuple(sorted(deltas.items())))].append(pk)
+
+    try:
+      with transaction.atomic():
+        now = timezone.now()
+        for (label, deltas), pks in groups.items():
+          model = apps.get_model(label)
+          updates = {field: F(field) + delta for field, delta in deltas}
+          model.objects.filter(pk__in=pks).update(modified=now, **updates)
+    except Exception:
+      for key, deltas in entries.items():
+        counters.incr(key, deltas)
+      raise
+
+    touched += len(entries)
+    if len(entries) < batch_size:
+      return touched
+
+
+class PendingCountersListSerializer(serializers.ListSerializer):
+  """List serializer fetching the pending deltas of a page at once.
+
+    Counted serializers anywhere below the list, nested ones
+    included, leave their data to be completed once every item is
+    serialized. Serializers whose lists may hold counted objects use
+    it as their `list_serializer_class`.
+  """
+
+  pending_counters = None
+
+  def to_representation(self, data):
+    """Serialize the items, then add their pending deltas."""
+    if self.root is not self:
+      return super(PendingCountersListSerializer, self).to_representation(data)
+    self.pending_counters = []
+    try:
+      items = super(PendingCountersListSerializer, self).to_representation(data)
+      apply_pending(self.pending_counters)
+    finally:
+      self.pending_counters = None
+    return items
+
+
+class PendingCountersMixin:
+  """Serializer mixin adding pending deltas to counter fields."""
+
+  def to_representation(self, instance):
+    """Add the deltas not yet flushed to the serialized counters."""
+    data = super(PendingCountersMixin, self).to_representation(instance)
+    if instance.pk is None:
+      return data
+    key = make_key(type(instance), instance.pk)
+    deferred = getattr(self.root, 'pending_counters', None)
+    if deferred is not None:
+      deferred.append((data, key))
+    else:
+      apply_pending([(data, key)])
+    return data
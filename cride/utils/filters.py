@@ -0,0 +1,77 @@
+"""Django REST Framework filter utilities."""
+
+# Django
+from django.contrib.postgres.search import (
+  SearchQuery,
+  SearchRank,
+  SearchVectorField,
+  TrigramSimilarity
+)
+from django.db import connections
+from django.db.models import F, Func, Q, Value
+from django.db.models.functions import Coalesce, Greatest
+
+# Django REST Framework
+from rest_framework.filters import SearchFilter
+
+
+class SearchDocument(Func):
+  """Text search vector of fields, as built by the search indexes.
+
+    Renders `to_tsvector('<config>'::regconfig, COALESCE(a, '') || ' '
+    || COALESCE(b, ''))`, the exact expression of the GIN indexes
+    created by the search migrations, so the planner can use them.
+    `SearchVector` casts every column and binds the configuration as
+    a parameter, which no index matches.
+  """
+
+  template = "to_tsvector('%(config)s'::regconfig, %(expressions)s)"
+  arg_joiner = " || ' ' || "
+  output_field = SearchVectorField()
+
+  def __init__(self, *fields, config):
+    expressions = [Coalesce(F(field), Value('')) for field in fields]
+    super(SearchDocument, self).__init__(*expressions, config=config)
+
+
+class FullTextSearchFilter(SearchFilter):
+  """Full-text and trigram search filter.
+
+    On PostgreSQL the view's `search_fields` are matched against a
+    `cride_search` text search vector (unaccented, case-insensitive)
+    or by trigram similarity, both backed by GIN indexes. Results are
+    ranked by relevance before the view's own ordering. Any other
+    database falls back to DRF's `icontains` search.
+
+    `search_fields` must list the columns in the order of the view's
+    search index.
+  """
+
+  search_config = 'cride_search'
+
+  def filter_queryset(self, request, queryset, view):
+    """Filter and rank the queryset by the search terms."""
+    search_fields = self.get_search_fields(view, request)
+    search_terms = self.get_search_terms(request)
+    vendor = connections[queryset.db].vendor
+    if not search_fields or not search_terms or vendor != 'postgresql':
+      return super(FullTextSearchFilter, self).filter_queryset(request, queryset, view)
+
+    prefixes = ''.join(self.lookup_prefixes)
+    fields = [field.lstrip(prefixes) for field in search_fields]
+    text = ' '.join(search_terms)
+
+    vector = SearchDocument(*fields, config=self.search_config)
+    query = SearchQuery(text, config=self.search_config)
+    similarities = [TrigramSimilarity(field, text) for field in fields]
+    similarity = Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+
+    conditions = Q(search_vector=query)
+    for field in fields:
+      conditions |= Q(**{f'{field}__trigram_similar': text})
+
+    ordering = queryset.query.order_by
+    return queryset.annotate(
+      search_vector=vector,
+      search_rank=SearchRank(vector, query) + similarity
+    ).filter(conditions).order_by('-search_rank', *ordering)
@@ -0,0 +1,70 @@
+"""Django REST Framework pagination utilities."""
+
+# Django REST Framework
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.settings import api_settings
+
+
+class KeysetPagination(CursorPagination):
+  """Keyset pagination.
+
+    Pages are fetched with a `WHERE` on the ordering key instead of
+    an `OFFSET` and no `COUNT(*)` is ever issued, so deep pages cost
+    the same as the first one. Only the first ordering field is used
+    as the key, so it must be unique and immutable: views declare it
+    as `cursor_ordering`, their primary key. Cursor pages ignore the
+    view's default ordering and refuse the ordering filter's
+    `?ordering=` with a 400.
+  """
+
+  page_size_query_param = 'limit'
+  max_page_size = 100
+
+  def get_ordering(self, request, queryset, view):
+    """Return the view's cursor ordering, refusing `?ordering=`."""
+    if api_settings.ORDERING_PARAM in request.query_params:
+      raise ValidationError({
+        api_settings.ORDERING_PARAM: 'Cursor pages can\'t be reordered.'
+      })
+    ordering = getattr(view, 'cursor_ordering', None)
+    if ordering is None:
+      return super(KeysetPagination, self).get_ordering(request, queryset, view)
+    if isinstance(ordering, str):
+      return (ordering,)
+    return tuple(ordering)
+
+
+class CRidePagination(LimitOffsetPagination):
+  """Comparte Ride pagination.
+
+    Limit/offset pagination by default. Requests including
+    `?pagination=cursor` (or an already issued `?cursor=`) are
+    paginated with opaque next/previous cursors instead.
+  """
+
+  mode_query_param = 'pagination'
+  keyset_class = KeysetPagination
+  keyset = None
+
+  def use_keyset(self, request):
+    """Return True if the request asked for cursor pagination."""
+    params = request.query_params
+    return (
+      self.keyset_class.cursor_query_param in params or
+      params.get(self.mode_query_param) == 'cursor'
+    )
+
+  def paginate_queryset(self, queryset, request, view=None):
+    """Delegate to the keyset paginator when requested."""
+    if self.use_keyset(request):
+      self.keyset = self.keyset_class()
+      return self.keyset.paginate_queryset(queryset, request, view)
+    self.keyset = None
+    return super(CRidePagination, self).paginate_queryset(queryset, request, view)
+
+  def get_paginated_response(self, data):
+    """Return the response of the paginator in use."""
+    if self.keyset is not None:
+      return self.keyset.get_paginated_response(data)
+    return super(CRidePagination, self).get_paginated_response(data)
@@ -0,0 +1,28 @@
+"""Django REST Framework parsers."""
+
+# Django
+from django.conf import settings
+
+# Django REST Framework
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+# Utilities
+import orjson
+
+
+class ORJSONParser(parsers.JSONParser):
+  """JSON parser backed by orjson."""
+
+  def parse(self, stream, media_type=None, parser_context=None):
+    """Parse the incoming bytestream as JSON."""
+    parser_context = parser_context or {}
+    encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+    try:
+      data = stream.read()
+      if encoding.lower().replace('-', '') != 'utf8':
+        data = data.decode(encoding)
+      return orjson.loads(data)
+    except (ValueError, UnicodeDecodeError) as exc:
+      raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,39 @@
+"""Django REST Framework renderers."""
+
+# Django REST Framework
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+# Utilities
+import orjson
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+  """JSON renderer backed by orjson.
+
+    Renders the same bytes as the default compact, unicode
+    JSONRenderer. Datetimes are passed through to DRF's encoder,
+    like Decimal and lazy strings, so they keep its format.
+    Indentation, when requested, is always two spaces.
+  """
+
+  options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+  def __init__(self):
+    self.default = encoders.JSONEncoder().default
+
+  def render(self, data, accepted_media_type=None, renderer_context=None):
+    """Render data into JSON, returning a bytestring."""
+    if data is None:
+      return b''
+
+    options = self.options
+    if self.get_indent(accepted_media_type, renderer_context or {}):
+      options |= orjson.OPT_INDENT_2
+    ret = orjson.dumps(data, default=self.default, option=options)
+
+    # Escape the line separators like JSONRenderer so the output
+    # can be embedded in JavaScript.
+    if b'\xe2\x80' in ret:
+      ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return ret
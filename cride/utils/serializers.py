@@ -0,0 +1,238 @@
+"""Django REST Framework serializer utilities."""
+
+# Django REST Framework
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+# Utilities
+from cride.utils import counters
+from functools import lru_cache
+
+
+def parse_field_tree(value):
+  """Return the tree of a comma separated list of dotted field paths.
+
+    `id,offered_by.username,offered_by.profile` becomes
+    `{'id': {}, 'offered_by': {'username': {}, 'profile': {}}}`, an
+    empty branch stands for the whole field.
+  """
+  tree = {}
+  for path in value.split(','):
+    branch = tree
+    for name in path.strip().split('.'):
+      if name:
+        branch = branch.setdefault(name, {})
+  return tree
+
+
+def get_field_trees(request):
+  """Return the (fields, expand) trees requested with `?fields=` and `?expand=`.
+
+    Sparse fieldsets only apply to reads, `fields` is None when every
+    field was requested.
+  """
+  if not isinstance(request, Request) or request.method != 'GET':
+    return None, {}
+  fields = request.query_params.get('fields')
+  expand = request.query_params.get('expand', '')
+  return (parse_field_tree(fields) if fields else None), parse_field_tree(expand)
+
+
+def get_branch(fields, name):
+  """Return the branch of fields under name, None if it's whole."""
+  if fields is None:
+    return None
+  return fields.get(name) or None
+
+
+def is_requested(fields, path):
+  """Return whether the dotted path is rendered under fields."""
+  for name in path.split('.'):
+    if fields is None:
+      return True
+    if name not in fields:
+      return False
+    fields = get_branch(fields, name)
+  return True
+
+
+def is_expanded(fields, expand, path):
+  """Return whether the dotted path is requested and expanded."""
+  if not is_requested(fields, path):
+    return False
+  for name in path.split('.'):
+    if name not in expand:
+      return False
+    expand = expand[name]
+  return True
+
+
+class DynamicFieldsMixin:
+  """Serializer mixin for sparse fieldsets and opt-in expansions.
+
+    `?fields=` lists the fields to render, nested ones through dotted
+    paths (`offered_by.username`), and `?expand=` which relations of
+    `expandable_fields` are rendered in full instead of their compact
+    form. Nested serializers using the mixin get their own branch of
+    both trees.
+  """
+
+  # Field name to a callable returning the expanded field.
+  expandable_fields = {}
+
+  def get_field_trees(self):
+    """Return the (fields, expand) trees of this serializer."""
+    trees = getattr(self, '_field_trees', None)
+    if trees is None:
+      trees = get_field_trees(self.context.get('request'))
+    return trees
+
+  def get_fields(self):
+    """Drop unrequested fields and swap in the expanded ones."""
+    fields = super(DynamicFieldsMixin, self).get_fields()
+    only, expand = self.get_field_trees()
+
+    for name, expanded in self.expandable_fields.items():
+      if name in expand:
+        fields[name] = expanded()
+    if only is not None:
+      for name in set(fields) - set(only):
+        del fields[name]
+
+    for name, field in fields.items():
+      child = getattr(field, 'child', field)
+      if isinstance(child, DynamicFieldsMixin):
+        child._field_trees = (get_branch(only, name), expand.get(name, {}))
+    return fields
+
+
+class NotCompilable(Exception):
+  """Raised by serializers the compiled mode can't reproduce."""
+
+
+class CompiledSerializer:
+  """Read-only serializer compiled to a flat function over `.values()` rows.
+
+    The (sparse) fields of a serializer are walked once to collect the
+    `.values()` paths they read and a renderer per field, so rendering
+    a row builds no field or serializer instance and renders the same
+    data the serializer would. Nested serializers read their fields
+    through joins. String related fields read the path declared in
+    the serializer's `string_sources`. Pending counters of every
+    row are fetched at once.
+  """
+
+  def __init__(self, serializer):
+    self.paths = []
+    self.render_row = self.compile(serializer, '')
+
+  def add_path(self, path):
+    """Select path in the `.values()` rows."""
+    if path not in self.paths:
+      self.paths.append(path)
+
+  def compile(self, serializer, prefix):
+    """Return the renderer of serializer for rows prefixed by prefix."""
+    model = serializer.Meta.model
+    writers = [
+      (name, self.compile_field(serializer, field, prefix))
+      for name, field in serializer.fields.items()
+      if not field.write_only
+    ]
+    counted = isinstance(serializer, counters.PendingCountersMixin)
+    pk_path = f'{prefix}pk'
+    if counted:
+      self.add_path(pk_path)
+
+    def render(row, context):
+      data = {name: write(row, context) for name, write in writers}
+      if counted:
+        context['pending'].append((data, counters.make_key(model, row[pk_path])))
+      return data
+    return render
+
+  def compile_field(self, serializer, field, prefix):
+    """Return the renderer of field for rows prefixed by prefix."""
+    unsupported = (
+      serializers.ListSerializer,
+      serializers.SerializerMethodField,
+      serializers.HiddenField,
+      ManyRelatedField,
+    )
+    if field.source == '*' or isinstance(field, unsupported):
+      raise NotCompilable(f'{type(serializer).__name__}.{field.field_name}')
+    path = prefix + field.source.replace('.', '__')
+
+    if isinstance(field, serializers.BaseSerializer):
+      render = self.compile(field, f'{path}__')
+      pk_path = f'{path}__pk'
+      self.add_path(pk_path)
+      return lambda row, context: None if row[pk_path] is None else render(row, context)
+
+    if isinstance(field, RelatedField):
+      source = getattr(serializer, 'string_sources', {}).get(field.field_name)
+      if source is None:
+        raise NotCompilable(f'{type(serializer).__name__}.{field.field_name}')
+      path = prefix + source
+      to_representation = str
+    elif isinstance(field, serializers.FileField):
+      storage = serializer.Meta.model._meta.get_field(field.source).storage
+      use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+      self.add_path(path)
+      return lambda row, context: file_representation(row[path], storage, use_url, context)
+    else:
+      to_representation = field.to_representation
+
+    self.add_path(path)
+    return lambda row, context: None if row[path] is None else to_representation(row[path])
+
+  def render_many(self, rows, request=None):
+    """Render rows as the serializer would with many=True."""
+    context = {'request': request, 'pending': []}
+    data = [self.render_row(row, context) for row in rows]
+    counters.apply_pending(context['pending'])
+    return data
+
+
+def file_representation(name, storage, use_url, context):
+  """Render a stored file name like the FileField serializer field."""
+  if not name:
+    return None
+  if not use_url:
+    return name
+  url = storage.url(name)
+  request = context['request']
+  return request.build_absolute_uri(url) if request is not None else url
+
+
+def freeze_tree(tree):
+  """Return a hashable copy of a field tree."""
+  if tree is None:
+    return None
+  return tuple(sorted((name, freeze_tree(branch)) for name, branch in tree.items()))
+
+
+def thaw_tree(tree):
+  """Return the field tree of a frozen one."""
+  if tree is None:
+    return None
+  return {name: thaw_tree(branch) for name, branch in tree}
+
+
+@lru_cache(maxsize=256)
+def compile_serializer(serializer_class, fields=None, expand=()):
+  """Return the compiled serializer for the frozen field trees, or None."""
+  serializer = serializer_class()
+  serializer._field_trees = (thaw_tree(fields), thaw_tree(expand))
+  try:
+    return CompiledSerializer(serializer)
+  except NotCompilable:
+    return None
+
+
+def get_compiled_serializer(serializer_class, request):
+  """Return the compiled serializer for the fields requested, or None."""
+  fields, expand = get_field_trees(request)
+  return compile_serializer(serializer_class, freeze_tree(fields), freeze_tree(expand))
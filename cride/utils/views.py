@@ -0,0 +1,127 @@
+"""Django REST Framework view utilities."""
+
+# Django
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+# Django REST Framework
+from rest_framework.response import Response
+
+# Utilities
+from cride.utils.serializers import get_compiled_serializer
+
+
+def make_etag(*parts):
+  """Return an entity tag from its parts, datetimes as microsecond stamps."""
+  values = []
+  for part in parts:
+    if hasattr(part, 'timestamp'):
+      part = int(part.timestamp() * 1000000)
+    values.append(str(part if part is not None else 0))
+  return quote_etag('-'.join(values))
+
+
+def conditional_response(request, etag, last_modified, render):
+  """Answer 304 if the request validators match, else render.
+
+    `render` is only called when the client copy is stale, so
+    unchanged resources are never serialized.
+  """
+  timestamp = int(last_modified.timestamp()) if last_modified else None
+  response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+  if response is not None:
+    return response
+
+  response = render()
+  if response.status_code == 200:
+    response['ETag'] = etag
+    if timestamp is not None:
+      response['Last-Modified'] = http_date(timestamp)
+  return response
+
+
+class ConditionalListMixin:
+  """Conditional GET for list actions.
+
+    The entity tag is built from the row count and the latest value
+    of each `conditional_fields` (related `modified` fields of nested
+    objects included) over the filtered queryset. No Last-Modified is
+    sent because rows leaving the list don't bump any `modified`.
+  """
+
+  conditional_fields = ('modified',)
+
+  def get_list_validators(self):
+    """Return the (etag, last_modified) validators of the list."""
+    queryset = self.filter_queryset(self.get_queryset())
+    aggregates = {
+      f'last_{i}': Max(field) for i, field in enumerate(self.conditional_fields)
+    }
+    stats = queryset.order_by().aggregate(count=Count('pk'), **aggregates)
+    return make_etag(stats['count'], *(stats[key] for key in aggregates)), None
+
+  def render_list(self, request, *args, **kwargs):
+    """Return the list response."""
+    return super(ConditionalListMixin, self).list(request, *args, **kwargs)
+
+  def list(self, request, *args, **kwargs):
+    """List objects unless the client copy is fresh."""
+    etag, last_modified = self.get_list_validators()
+    return conditional_response(
+      request, etag, last_modified,
+      lambda: self.render_list(request, *args, **kwargs)
+    )
+
+
+class ConditionalRetrieveMixin:
+  """Conditional GET for retrieve actions.
+
+    Validators come from the object's `modified`, views whose
+    responses embed other rows may extend them.
+  """
+
+  def get_object_validators(self, instance):
+    """Return the (etag, last_modified) validators of instance."""
+    return make_etag(instance.pk, instance.modified), instance.modified
+
+  def render_object(self, instance):
+    """Return the retrieve response."""
+    return Response(self.get_serializer(instance).data)
+
+  def retrieve(self, request, *args, **kwargs):
+    """Retrieve the object unless the client copy is fresh."""
+    instance = self.get_object()
+    etag, last_modified = self.get_object_validators(instance)
+    return conditional_response(
+      request, etag, last_modified,
+      lambda: self.render_object(instance)
+    )
+
+
+class CompiledListMixin:
+  """List pages rendered by the compiled serializer over `.values()` rows.
+
+    Requests whose fields the compiled mode can't reproduce, like
+    expanded many relations, fall back to the regular serializer.
+  """
+
+  def list(self, request, *args, **kwargs):
+    """List objects through the compiled serializer when possible."""
+    compiled = get_compiled_serializer(self.get_serializer_class(), request)
+    if compiled is None:
+      return super(CompiledListMixin, self).list(request, *args, **kwargs)
+
+    queryset = self.filter_queryset(self.get_queryset())
+    # Paginators read the ordering fields from the rows.
+    ordering = (*queryset.query.order_by, *getattr(self, 'cursor_ordering', ()))
+    paths = list(compiled.paths)
+    for name in ordering:
+      if isinstance(name, str) and name.lstrip('-') not in paths:
+        paths.append(name.lstrip('-'))
+    rows = queryset.values(*paths)
+
+    page = self.paginate_queryset(rows)
+    if page is not None:
+      return self.get_paginated_response(compiled.render_many(page, request))
+    return Response(compiled.render_many(rows, request))